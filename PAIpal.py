@@ -1,36 +1,49 @@
+from paipal_startup import STARTUP  # First, so the startup report covers the imports below
 import tkinter as tk
 from tkinter import filedialog, messagebox
+import json
 import os
 import sys
 import threading
 import time
-try:
-    from PIL import Image, ImageTk
-    PIL_AVAILABLE = True
-except ImportError:
-    PIL_AVAILABLE = False
-try:
-    import winsound
-    import wave
-    AUDIO_AVAILABLE = True
-except ImportError:
-    AUDIO_AVAILABLE = False
-
-# [AI-NOTE] Helper to get executable path for browse dialogs and working directories
-def get_base_path():
-    if getattr(sys, 'frozen', False):
-        return os.path.dirname(sys.executable)  # Folder where .exe is placed
-    return os.path.dirname(os.path.abspath(__file__))
-
-# [AI-NOTE] Helper to get bundled resource path (for icon, etc.)
-def get_resource_path():
-    if getattr(sys, 'frozen', False):
-        return sys._MEIPASS  # PyInstaller temp folder for bundled files
-    return os.path.dirname(os.path.abspath(__file__))
+from collections import OrderedDict
+
+from paipal_assets import AssetIndex, AssetWatcher
+from paipal_audio import AudioPlayer, PcmCache, PeakCache, WavInfoCache, get_audio_backend
+from paipal_commands import (Op, format_lines, format_voice_line, normalize, parse, parse_lines, parse_voice_line,
+                             serialize)
+from paipal_history import DELETE, EDIT, INSERT, MOVE, EditHistory
+from paipal_journal import Buffer, EditJournal
+from paipal_paths import get_base_path, get_cache_dir, get_resource_path
+from paipal_phrases import PhraseIndex
+from paipal_playback import DeadlineScheduler, build_timeline
+from paipal_search import ListSearch
+from paipal_storage import WriteQueue, atomic_write, content_digest
+from paipal_timing import TimingModel, clip_length_ms, describe
+from paipal_thumbs import PIL_AVAILABLE, ThumbnailStore, render_preview, render_thumbnail
+STARTUP.mark("imports")
 
 # [AI-NOTE] Main Application Class
 class App:
-    def __init__(self, root):
+    # Budget for shared row thumbnails (see ThumbnailCache)
+    THUMB_CACHE_ENTRIES = 2000
+    THUMB_CACHE_BYTES = 8 * 1024 * 1024
+    # Budget for 300px hover previews
+    PREVIEW_CACHE_ENTRIES = 64
+    PREVIEW_CACHE_BYTES = 24 * 1024 * 1024
+    # Budget for decoded audio clips kept for instant replay (see PcmCache)
+    PCM_CACHE_BYTES = 64 * 1024 * 1024
+    # Waveform mini-thumbnails next to PLAY_AUDIO buttons (one column per peak)
+    WAVEFORM_WIDTH = 48
+    WAVEFORM_HEIGHT = 20
+    WAVEFORM_CACHE_ENTRIES = 1000
+    WAVEFORM_CACHE_BYTES = 4 * 1024 * 1024  # About 1000 waveforms at 48x20
+    # Undo log size per list (see EditHistory); oldest steps are dropped first
+    HISTORY_BYTES = 2 * 1024 * 1024
+    # Edits are fsynced to the session journal this long after a burst
+    JOURNAL_SYNC_MS = 500
+    
+    def __init__(self, root, resume=True):
         self.root = root
         self.root.title("PAIpal")
         self.root.geometry("700x750")
@@ -55,28 +68,456 @@ class App:
         self.root.configure(bg=self.bg_dark)
         
         # [AI-NOTE] Application State
-        self.commands = [] # List of strings
+        self.commands = [] # List of Command records (see paipal_commands)
         self.filepath = None # Current file path if editing
         self.currently_playing = None # Track which audio button is playing
-        self.audio_start_time = None # Track when audio started
-        self.audio_duration = None # Track audio duration
-        self.preview_window = None # Track hover preview window
+        self.pcm_cache = PcmCache(max_bytes=self.PCM_CACHE_BYTES) # Clips in memory for instant replay
+        self.audio_player = None # AudioPlayer, built by get_audio_player() when audio is first needed
+        self.wav_info = WavInfoCache() # WAV headers (frames, rate) per file and mtime
+        self.preview_window = None # Pooled hover preview window (withdrawn when hidden)
+        self.player = None # AnimationPlayer window, created by the Preview button
+        self.preview_target = None # Image path the pointer is currently hovering
+        self.assets = AssetIndex(get_base_path()) # Listing of animations/ and audio/
+        self.asset_watcher = None # Keeps self.assets and row previews in sync with the folders
+        self.cmd_list_widget = None
+        self.thumb_store = ThumbnailStore() # Persistent thumbnails in .paipal-cache/
+        self.thumb_cache = ThumbnailCache(max_entries=self.THUMB_CACHE_ENTRIES, max_bytes=self.THUMB_CACHE_BYTES,
+                                          store=self.thumb_store, root=self.root)
+        self.thumb_cache.on_dirty = self.schedule_cache_flush
+        self.preview_cache = ThumbnailCache(max_entries=self.PREVIEW_CACHE_ENTRIES, max_bytes=self.PREVIEW_CACHE_BYTES,
+                                            root=self.root, workers=1, render=render_preview)
+        self.peak_cache = PeakCache() # Waveform peaks per clip and mtime
+        self.write_queue = WriteQueue() # Atomic saves; toggle clicks are written off the Tk thread
+        self.waveform_cache = ThumbnailCache(max_entries=self.WAVEFORM_CACHE_ENTRIES, max_bytes=self.WAVEFORM_CACHE_BYTES,
+                                             root=self.root, workers=2, render=self.compute_waveform,
+                                             make_photo=self.render_waveform)
+        self.cache_flush_pending = False
+        # Runtime/gap/overlap analysis of self.commands, kept in step with every list edit
+        self.timing = TimingModel(lambda arg: clip_length_ms(self.assets, self.wav_info, arg))
+        self.timing_update_pending = False
+        self.timing_label = None
+        
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.bind("<Control-z>", self.undo)
+        self.root.bind("<Control-y>", self.redo)
+        self.root.bind("<Control-Z>", self.redo)  # Ctrl+Shift+Z
         
         # Voice commands state
         self.voice_commands = [] # List of tuples: (text, filename)
         self.voice_commands_visible = False
         self.voice_panel = None
+        self.voice_list_widget = None
         
         # Text commands state
         self.text_commands_visible = True
         self.text_panel = None
         
+        # Crash recovery / session resume (see paipal_journal)
+        self.journal = EditJournal()
+        self.journal_buffers = {} # "commands"/"voice" -> Buffer (path, digest, dirty, scroll)
+        self.journal_sync_pending = False
+        self.screen = None # "start" or "editor"
+        
+        # Work that can wait until the start screen is on screen (see when_painted)
+        self.painted = False
+        self.paint_callbacks = []
+        self.root.bind("<Expose>", self.on_first_expose, add="+")
+        STARTUP.mark("app state")
+        
         self.show_start_screen()
+        STARTUP.mark("start screen")
+        if resume:
+            # Reading the journal (and maybe reopening the editor) waits for the first paint
+            self.when_painted(self.resume_session)
+    
+    def when_painted(self, callback):
+        """Run callback once the first screen has been drawn (right away if it has)"""
+        if self.painted:
+            callback()
+        else:
+            self.paint_callbacks.append(callback)
+    
+    def on_first_expose(self, event):
+        self.root.unbind("<Expose>")
+        # Tk redraws exposed widgets in idle handlers queued ahead of this one
+        self.root.after_idle(self.on_first_paint)
+    
+    def on_first_paint(self):
+        if self.painted:
+            return
+        self.painted = True
+        STARTUP.mark("first paint")
+        callbacks, self.paint_callbacks = self.paint_callbacks, []
+        for callback in callbacks:
+            callback()
+    
+    def startup_report(self):
+        """--startup-report: save and print the phase times, then quit"""
+        report = STARTUP.report()
+        text = json.dumps(report, indent=2)
+        try:
+            os.makedirs(get_cache_dir(), exist_ok=True)
+            atomic_write(get_cache_dir("startup.json"), text, skip_unchanged=False)
+        except OSError:
+            pass
+        if sys.stdout is not None:  # None in the windowed .exe
+            print(text)
+        self.on_close()
+
+    def schedule_cache_flush(self):
+        """Write the thumbnail index shortly after a burst of new thumbnails"""
+        if not self.cache_flush_pending:
+            self.cache_flush_pending = True
+            self.root.after(2000, self.flush_caches)
+    
+    def flush_caches(self):
+        self.cache_flush_pending = False
+        try:
+            self.thumb_store.flush()
+        except OSError:
+            pass  # Cache is best-effort; thumbnails are rebuilt next time
+    
+    # [AI-NOTE] Edit journal: list edits are logged as they happen so unsaved work
+    # survives a crash, and the next launch can reopen the same file and scroll spot
+    def read_command_file(self, path):
+        """(commands, digest) for an animation file as the editor opens it"""
+        with open(path, "r") as f:
+            text = f.read()
+        return parse_lines(text.strip()), content_digest(text)
+    
+    def read_voice_file(self, path):
+        """(entries, digest) for commands.txt; blank lines are skipped"""
+        with open(path, "r") as f:
+            text = f.read()
+        # Format: "text (filename.txt)"
+        entries = [entry for entry in map(parse_voice_line, text.split("\n")) if entry is not None]
+        return entries, content_digest(text)
+    
+    def journal_encode(self, name, item):
+        return serialize(item) if name == "commands" else list(item)
+    
+    def journal_decode(self, name, item):
+        return parse(item) if name == "commands" else tuple(item)
+    
+    def journal_items(self, name):
+        items = self.commands if name == "commands" else self.voice_commands
+        return [self.journal_encode(name, item) for item in items]
+    
+    def load_journal_file(self, name, path, digest):
+        """Replay hook: a file's encoded items, or None if it changed since it was opened"""
+        read = self.read_command_file if name == "commands" else self.read_voice_file
+        try:
+            items, current = read(path)
+        except (OSError, UnicodeDecodeError):
+            return None
+        if current != digest:
+            return None
+        return [self.journal_encode(name, item) for item in items]
+    
+    def journal_open(self, name, path=None, digest=None):
+        """A list was loaded from path (or started empty) and has no edits yet"""
+        buffer = self.journal_buffers[name] = Buffer(path, digest)
+        self.journal.append(buffer.record(name, None if path else self.journal_items(name)))
+        self.schedule_journal_sync()
+    
+    def list_edited(self, widget, op, index, target=None, item=None):
+        """Called by the list widgets for every insert/delete/move/edit, undo included"""
+        if op == EDIT and widget.items[index] == item:
+            return  # Not a change, so not unsaved work either
+        if widget is self.cmd_list_widget:
+            self.journal_edit("commands", op, index, target, item)
+            self.timing.apply(op, index, target, item)
+            self.schedule_timing_update()
+        elif widget is self.voice_list_widget:
+            self.journal_edit("voice", op, index, target, item)
+    
+    def journal_edit(self, name, op, index, target=None, item=None):
+        buffer = self.journal_buffers.get(name)
+        if buffer is None:
+            return
+        buffer.dirty = True
+        record = {"op": op, "buf": name, "i": index}
+        if op == MOVE:
+            record["j"] = target
+        elif op != DELETE:
+            record["item"] = self.journal_encode(name, item)
+        self.journal.append(record)
+        self.schedule_journal_sync()
+    
+    def journal_saved(self, name, path, text, exact=True):
+        """The list was written to path; exact=False if the file leaves some items out"""
+        buffer = self.journal_buffers.setdefault(name, Buffer())
+        buffer.path, buffer.digest, buffer.dirty, buffer.exact = path, content_digest(text), False, exact
+        if self.journal.file is not None:
+            # A snapshot opens the buffer from the file as saved, so replay
+            # no longer depends on the file it was first opened from
+            self.compact_journal()
+    
+    def journal_scroll(self, name, first):
+        buffer = self.journal_buffers.get(name)
+        y = round(float(first), 4)
+        if buffer is not None and buffer.scroll != y:
+            buffer.scroll = y
+            self.journal.append({"op": "scroll", "buf": name, "y": y})
+            self.schedule_journal_sync()
+    
+    def session_state(self):
+        return {"screen": self.screen, "text": self.text_commands_visible, "voice": self.voice_commands_visible}
+    
+    def journal_session(self):
+        self.journal.append(dict(self.session_state(), op="session"))
+        self.schedule_journal_sync()
+    
+    def schedule_journal_sync(self):
+        """fsync the journal shortly after a burst of edits instead of once per edit"""
+        if not self.journal_sync_pending and self.journal.file is not None:
+            self.journal_sync_pending = True
+            self.root.after(self.JOURNAL_SYNC_MS, self.sync_journal)
+    
+    def sync_journal(self):
+        self.journal_sync_pending = False
+        if self.journal.needs_compaction:
+            self.compact_journal()
+        else:
+            self.journal.sync()
+    
+    def compact_journal(self):
+        buffers = {}
+        for name, buffer in self.journal_buffers.items():
+            items = self.journal_items(name) if buffer.stored else None
+            buffers[name] = Buffer(buffer.path, buffer.digest, items, buffer.dirty, buffer.exact, buffer.scroll)
+        self.journal.compact(buffers, self.session_state())
+    
+    def resume_session(self):
+        """Offer to restore unsaved lists from the last run, or reopen its editor"""
+        buffers, session = self.journal.replay(self.load_journal_file)
+        # Unsaved edits whose base file changed on disk can't be replayed safely
+        buffers = {name: buffer for name, buffer in buffers.items() if buffer.items is not None or not buffer.dirty}
+        unsaved = [name for name, buffer in buffers.items() if buffer.dirty]
+        resume = session.get("screen") == "editor"
+        if unsaved:
+            titles = " and ".join(self.buffer_title(name, buffers[name]) for name in unsaved)
+            resume = messagebox.askyesno(
+                "Restore Unsaved Work",
+                f"PAIpal was closed with unsaved changes to {titles}.\n\nDo you want to restore them?"
+            )
+        if resume:
+            self.restore_session(buffers, session)
+        self.compact_journal()  # Start this run's journal from the current state
+    
+    def buffer_title(self, name, buffer):
+        if name == "voice":
+            return "the voice commands"
+        return os.path.basename(buffer.path) if buffer.path else "a new animation file"
+    
+    def restore_buffer(self, name, buffer):
+        """Items for a replayed buffer (registering it with the journal), or None if it is gone"""
+        if buffer.items is not None and buffer.stored:
+            items = [self.journal_decode(name, item) for item in buffer.items]
+        elif buffer.path:
+            read = self.read_command_file if name == "commands" else self.read_voice_file
+            try:
+                items, digest = read(buffer.path)
+            except (OSError, UnicodeDecodeError):
+                return None
+            buffer = Buffer(buffer.path, digest, scroll=buffer.scroll)  # Clean: take the file as it is now
+        else:
+            return None
+        self.journal_buffers[name] = Buffer(buffer.path, buffer.digest, None, buffer.dirty, buffer.exact, buffer.scroll)
+        return items
+    
+    def restore_session(self, buffers, session):
+        scrolls = {name: buffer.scroll for name, buffer in buffers.items()}
+        commands = buffers.get("commands")
+        items = self.restore_buffer("commands", commands) if commands else None
+        if items is not None:
+            self.commands, self.filepath = items, commands.path
+        else:
+            self.commands, self.filepath = [], None
+            self.journal_open("commands")
+        self.show_editor()
+        if not session.get("text", True):
+            self.toggle_text_commands()
+        voice = buffers.get("voice")
+        if session.get("voice") or (voice and voice.dirty):
+            entries = self.restore_buffer("voice", voice) if voice else None
+            if entries is not None:
+                self.voice_commands = entries
+            self.toggle_voice_commands(reload=entries is None)
+        # Rows are laid out by then, so the scroll region is final
+        self.root.after(100, lambda: self.restore_scroll(scrolls))
+    
+    def restore_scroll(self, scrolls):
+        for name, widget in (("commands", self.cmd_list_widget), ("voice", self.voice_list_widget)):
+            try:
+                if scrolls.get(name) and widget is not None and widget.winfo_exists():
+                    widget.canvas.yview_moveto(scrolls[name])
+            except tk.TclError:
+                pass
+    
+    def start_asset_watcher(self):
+        if self.asset_watcher is None:
+            folders = {folder: self.assets.folder_path(folder) for folder in self.assets.folders}
+            self.asset_watcher = AssetWatcher(folders, self.marshal_asset_changes)
+            self.asset_watcher.start()
+    
+    def marshal_asset_changes(self, changes):
+        # Called on the watcher thread with one coalesced batch
+        try:
+            self.root.after(0, lambda: self.on_assets_changed(changes))
+        except (RuntimeError, tk.TclError):
+            pass  # Window already closed
+    
+    def on_assets_changed(self, changes):
+        """Apply a batch of added/replaced/removed asset files"""
+        for folder, names in changes.items():
+            for name in names:
+                self.assets.update(folder, name)
+        try:
+            if self.cmd_list_widget and self.cmd_list_widget.winfo_exists():
+                self.cmd_list_widget.refresh_assets(changes)
+        except tk.TclError:
+            pass
+        if "audio" in changes:
+            self.timing.forget_clips()  # Clip lengths may have changed
+            self.schedule_timing_update()
+    
+    def edit_lists(self):
+        """List widgets currently on screen"""
+        lists = []
+        for widget in (self.cmd_list_widget, self.voice_list_widget):
+            try:
+                if widget is not None and widget.winfo_exists():
+                    lists.append(widget)
+            except tk.TclError:
+                pass
+        return lists
+    
+    def typing_outside_lists(self):
+        """Whether focus is in an Entry that isn't a list row (search box, argument or file name)"""
+        try:
+            widget = self.root.focus_get()
+        except (KeyError, tk.TclError):
+            return False  # Focus is in a widget tkinter doesn't know, such as a dialog
+        if not isinstance(widget, tk.Entry):
+            return False
+        lists = self.edit_lists()
+        while widget is not None:
+            if widget in lists:
+                return False
+            widget = widget.master
+        return True
+    
+    def undo(self, event=None):
+        """Undo the newest change in either list"""
+        if self.typing_outside_lists():
+            return None  # The shortcut belongs to the field being typed in
+        lists = [w for w in self.edit_lists() if w.history.undo_stack]
+        if lists:
+            widget = max(lists, key=lambda w: w.history.last_seq(w.history.undo_stack))
+            widget.history.undo(widget)
+        return "break"
+    
+    def redo(self, event=None):
+        if self.typing_outside_lists():
+            return None
+        lists = [w for w in self.edit_lists() if w.history.redo_stack]
+        if lists:
+            # The most recently undone step is the oldest sequence number on top of a redo stack
+            widget = min(lists, key=lambda w: w.history.last_seq(w.history.redo_stack))
+            widget.history.redo(widget)
+        return "break"
+    
+    def index_for_search(self, search, items):
+        """Build a list's search index on a worker thread (about 0.4 s at 20k rows)"""
+        generation, snapshot = search.prepare(items)
+        
+        def run():
+            built = search.make_index(snapshot)
+            try:
+                self.root.after(0, lambda: search.install(generation, built))
+            except (RuntimeError, tk.TclError):
+                pass  # Window already closed
+        threading.Thread(target=run, name="search-index", daemon=True).start()
+    
+    def make_search_box(self, parent, get_list):
+        """Search entry that filters the list widget returned by get_list()"""
+        box = tk.Frame(parent, bg=self.bg_dark)
+        tk.Label(box, text="Search:", bg=self.bg_dark, fg=self.fg_gray).pack(side=tk.LEFT)
+        entry = tk.Entry(box, width=20, bg=self.bg_input, fg=self.fg_light, insertbackground=self.fg_light)
+        entry.pack(side=tk.LEFT, padx=5)
+        
+        def on_key(event):
+            if event.keysym == "Escape":
+                entry.delete(0, tk.END)
+            if get_list():
+                get_list().set_query(entry.get())
+        entry.bind("<KeyRelease>", on_key)
+        return box
+    
+    def preview_animation(self):
+        """Play the command list in the preview window"""
+        if self.player is None or not self.player.winfo_exists():
+            self.player = AnimationPlayer(self)
+        self.player.load(self.commands)
+        self.player.lift()
+        self.player.play()
+    
+    def get_preview_window(self):
+        """Return the shared hover preview window, creating it on first use"""
+        if self.preview_window is None or not self.preview_window.winfo_exists():
+            preview = tk.Toplevel(self.root)
+            preview.overrideredirect(True)  # No window decorations
+            preview.attributes('-topmost', True)
+            preview.withdraw()
+            preview.label = tk.Label(preview, bg=self.bg_dark, bd=2, relief=tk.RAISED)
+            preview.label.pack()
+            self.preview_window = preview
+        return self.preview_window
+    
+    def get_audio_player(self):
+        """Return the AudioPlayer, picking the backend on first use (the pipe backend searches PATH)"""
+        if self.audio_player is None:
+            # winsound on Windows, a PCM pipe to aplay/pacat on Linux; PAIPAL_AUDIO_BACKEND overrides
+            self.audio_player = AudioPlayer(get_audio_backend(), self.pcm_cache) # Reports the real end of each clip
+        return self.audio_player
+    
+    def compute_waveform(self, path, height):
+        # Runs on a waveform_cache worker thread
+        return self.peak_cache.get(path, self.WAVEFORM_WIDTH)
+    
+    def render_waveform(self, peaks):
+        """Draw peaks as a mirrored bar graph with a single PhotoImage.put call"""
+        height = self.WAVEFORM_HEIGHT
+        middle = height / 2
+        bars = [max(0.5, peak * middle) for peak in peaks]
+        rows = []
+        for y in range(height):
+            distance = abs(y + 0.5 - middle)
+            rows.append("{" + " ".join(self.accent if distance <= bar else self.bg_input for bar in bars) + "}")
+        photo = tk.PhotoImage(width=len(peaks), height=height)
+        photo.put(" ".join(rows))
+        return photo
+    
+    def on_close(self):
+        if self.asset_watcher:
+            self.asset_watcher.stop()
+        self.thumb_cache.shutdown()
+        self.preview_cache.shutdown()
+        self.waveform_cache.shutdown()
+        self.flush_caches()
+        self.write_queue.flush(timeout=5)
+        if self.journal.file is not None:
+            self.compact_journal()  # Next launch replays a single snapshot
+            self.journal.close()
+        self.root.destroy()
 
     def show_start_screen(self):
         # [AI-NOTE] Clears window and shows start screen
         for widget in self.root.winfo_children():
             widget.destroy()
+        self.screen = "start"
+        self.journal_session()
         
         # [AI-NOTE] Toggle buttons in top left
         toggle_container = tk.Frame(self.root, bg=self.bg_dark)
@@ -108,6 +549,7 @@ class App:
             invert_display=True
         )
         self.anim_type_toggle.pack(pady=5)
+        self.load_toggles([self.custom_anim_toggle, self.custom_cmds_toggle, self.anim_type_toggle])
             
         frame = tk.Frame(self.root, bg=self.bg_dark)
         frame.pack(expand=True)
@@ -122,9 +564,25 @@ class App:
         tk.Button(frame, text="Edit Voice Commands", command=self.edit_voice_commands, width=25, height=2,
                  bg=self.bg_secondary, fg=self.fg_light, activebackground=self.accent).pack(pady=10)
 
+    def load_toggles(self, toggles):
+        """Read the toggle files on a worker thread so they don't hold up the start screen"""
+        def run():
+            for toggle in toggles:
+                toggle.load_state()
+            try:
+                self.root.after(0, show)
+            except (RuntimeError, tk.TclError):
+                pass  # Window already closed
+        
+        def show():
+            for toggle in toggles:
+                toggle.state_loaded()
+        threading.Thread(target=run, name="load-toggles", daemon=True).start()
+
     def new_file(self):
         self.commands = []
         self.filepath = None
+        self.journal_open("commands")
         self.show_editor()
 
     def edit_file(self):
@@ -133,13 +591,9 @@ class App:
         path = filedialog.askopenfilename(initialdir=animations_dir, filetypes=[("Text Files", "*.txt")])
         if path:
             try:
-                with open(path, "r") as f:
-                    content = f.read().strip()
-                    if content:
-                        self.commands = content.split("\n")
-                    else:
-                        self.commands = []
+                self.commands, digest = self.read_command_file(path)
                 self.filepath = path
+                self.journal_open("commands", path, digest)
                 self.show_editor()
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to load file: {e}")
@@ -148,6 +602,7 @@ class App:
         """Open editor with voice commands shown and text commands hidden"""
         self.commands = []
         self.filepath = None
+        self.journal_open("commands")
         self.show_editor()
         # After showing editor, hide text commands and show voice commands
         self.toggle_text_commands()  # Hide text commands
@@ -157,6 +612,12 @@ class App:
         # [AI-NOTE] Main Editor Interface
         for widget in self.root.winfo_children():
             widget.destroy()
+        self.screen = "editor"
+        self.journal_session()
+        
+        # One directory listing per asset folder instead of a stat per row
+        self.assets.scan()
+        self.start_asset_watcher()
 
         # [AI-NOTE] Top bar with toggle buttons
         top_bar = tk.Frame(self.root, bg=self.bg_dark, pady=5)
@@ -262,27 +723,34 @@ class App:
         list_frame_container = tk.Frame(self.text_panel, bg=self.bg_dark)
         list_frame_container.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
         
-        tk.Label(list_frame_container, text="Command List (Drag to reorder):", bg=self.bg_dark, fg=self.fg_light).pack(anchor=tk.W)
+        list_header = tk.Frame(list_frame_container, bg=self.bg_dark)
+        list_header.pack(fill=tk.X)
+        tk.Label(list_header, text="Command List (Drag to reorder):", bg=self.bg_dark, fg=self.fg_light).pack(side=tk.LEFT)
+        self.make_search_box(list_header, lambda: self.cmd_list_widget).pack(side=tk.RIGHT)
+        
+        # Runtime summary; hover for gaps, overlapping audio and missing clips
+        self.timing_label = tk.Label(list_frame_container, text="", bg=self.bg_dark, fg=self.fg_gray,
+                                     font=("Arial", 9), anchor="w")
+        self.timing_label.pack(fill=tk.X)
+        self.timing_label.bind("<Enter>", self.show_timing_tooltip)
+        self.timing_label.bind("<Leave>", lambda e: self.hide_issue_tooltip())
         
         self.cmd_list_widget = DraggableListFrame(list_frame_container, self.commands, self.on_list_update, self)
         self.cmd_list_widget.pack(fill=tk.BOTH, expand=True)
+        self.timing.reset(self.commands)
+        self.update_timing()
 
         # [AI-NOTE] Bottom Section: Actions
         bottom_frame = tk.Frame(self.text_panel, pady=10, bg=self.bg_dark)
         bottom_frame.pack(fill=tk.X)
         
         tk.Button(bottom_frame, text="Back to Menu", command=self.show_start_screen, bg=self.bg_secondary, fg=self.fg_light).pack(side=tk.LEFT, padx=20)
+        tk.Button(bottom_frame, text="▶ Preview", command=self.preview_animation, bg=self.bg_secondary, fg=self.fg_light,
+                  activebackground=self.accent).pack(side=tk.RIGHT, padx=20)
 
     def browse_file(self, entry_widget, folder_name, cmd_callback=None):
-        base_path = get_base_path()
-        initial_dir = os.path.join(base_path, folder_name)
-        
         # If directory doesn't exist, try creating it or fallback to current dir
-        if not os.path.exists(initial_dir):
-            try:
-                os.makedirs(initial_dir)
-            except:
-                initial_dir = base_path
+        initial_dir = self.assets.ensure_folder(folder_name)
 
         filetypes = [("All Files", "*.*")]
         if folder_name == "audio":
@@ -294,67 +762,60 @@ class App:
             entry_widget.delete(0, tk.END)
             entry_widget.insert(0, filename)
             
+            # The picked file may be newer than the last scan
+            if os.path.normcase(os.path.dirname(os.path.abspath(filepath))) == os.path.normcase(self.assets.folder_path(folder_name)):
+                self.assets.update(folder_name, filename)
+            
             # Automatically trigger the command addition after browsing
             if cmd_callback:
                 cmd_callback(entry_widget)
 
     def add_command(self, cmd_type, entry_widget=None):
-        if cmd_type == "BLANK":
-            self.commands.append("") # Empty string for blank line
-            self.cmd_list_widget.refresh(self.commands)
+        val = entry_widget.get() if entry_widget else ""
+        try:
+            # Same rules as the headless tools (.wav/audio/ for PLAY_AUDIO, no .png for SHOW/HIDE)
+            command = normalize(Op[cmd_type], val)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
             return
-
-        val = ""
+        
         if entry_widget:
-            val = entry_widget.get().strip()
-            
-            # Validation
-            if cmd_type == "WAIT":
-                if not val.isdigit():
-                    messagebox.showerror("Error", "WAIT requires an integer value.")
-                    return
-            elif cmd_type == "OPEN_URL":
-                if not val:
-                    messagebox.showerror("Error", "URL cannot be empty.")
-                    return
-            elif cmd_type == "PLAY_AUDIO":
-                if not val:
-                    messagebox.showerror("Error", "Filename cannot be empty.")
-                    return
-                # Ensure .wav extension logic
-                if not val.lower().endswith(".wav"):
-                     val += ".wav"
-                # Ensure audio/ prefix logic
-                if not val.startswith("audio/"):
-                     val = f"audio/{val}"
-                
-                # Check if user accidentally typed audio/audio/
-                # (Simple safeguard, but trusting user input mostly)
-            elif cmd_type in ["SHOW", "HIDE"]:
-                # Remove .png extension if present (keep only base name)
-                if val.lower().endswith(".png"):
-                    val = val[:-4]
-            
-            # For SHOW and HIDE, relax validation to allow strings/filenames
-            # as per new requirements.
-
-            if cmd_type == "PLAY_AUDIO":
-                 cmd_str = f"PLAY_AUDIO {val}"
-            elif cmd_type in ["SHOW", "HIDE", "WAIT", "OPEN_URL"]:
-                 cmd_str = f"{cmd_type} {val}"
-            
             entry_widget.delete(0, tk.END)
-        else:
-            cmd_str = cmd_type
-
-        self.commands.append(cmd_str)
-        self.cmd_list_widget.refresh(self.commands)
+        self.cmd_list_widget.append_item(command)
 
     def on_list_update(self, new_commands):
         self.commands = new_commands
+    
+    def schedule_timing_update(self):
+        """Refresh the runtime summary once a burst of edits settles"""
+        if not self.timing_update_pending:
+            self.timing_update_pending = True
+            self.root.after(50, self.update_timing)
+    
+    def update_timing(self):
+        self.timing_update_pending = False
+        try:
+            if self.timing_label is None or not self.timing_label.winfo_exists():
+                return
+        except tk.TclError:
+            return
+        report = self.timing.report()
+        parts = [f"Runtime {report['duration_ms'] / 1000:.2f} s"]
+        if report["audio_end_ms"] > report["duration_ms"]:
+            parts.append(f"audio ends at {report['audio_end_ms'] / 1000:.2f} s")
+        for key, label in (("gaps", "silent gap"), ("overlaps", "audio overlap"), ("missing", "missing clip")):
+            if report[key]:
+                parts.append(f"{len(report[key])} {label}{'s' if len(report[key]) != 1 else ''}")
+        warn = report["overlaps"] or report["missing"]
+        self.timing_label.config(text=" · ".join(parts), fg="#ffaa00" if warn else self.fg_gray)
+    
+    def show_timing_tooltip(self, event):
+        findings = describe(self.timing.report())
+        if findings:
+            self.show_issue_tooltip(event, findings)
 
-    def play_audio(self, audio_path, play_button):
-        if not AUDIO_AVAILABLE:
+    def play_audio(self, audio_path, play_button, stat=None):
+        if not self.get_audio_player().available:
             messagebox.showerror("Error", "Audio playback not available on this system.")
             return
         
@@ -369,30 +830,24 @@ class App:
         
         # Play new audio
         try:
-            if not os.path.exists(audio_path):
-                messagebox.showerror("Error", f"Audio file not found: {audio_path}")
-                return
+            # stat normally comes from the asset index, so a replay never touches the disk
+            if stat is None:
+                try:
+                    stat = os.stat(audio_path)
+                except OSError:
+                    messagebox.showerror("Error", f"Audio file not found: {audio_path}")
+                    return
             
-            # Get audio duration
-            try:
-                with wave.open(audio_path, 'r') as wav_file:
-                    frames = wav_file.getnframes()
-                    rate = wav_file.getframerate()
-                    duration = frames / float(rate)
-                    self.audio_duration = duration
-            except:
-                # If we can't get duration, estimate 5 seconds
-                self.audio_duration = 5.0
+            # Header is cached, so replays don't reopen the file just to check it
+            if self.wav_info.get(audio_path, stat) is None:
+                messagebox.showerror("Error", f"Not a readable WAV file: {audio_path}")
+                return
             
-            # Play audio asynchronously (non-blocking)
-            winsound.PlaySound(audio_path, winsound.SND_FILENAME | winsound.SND_ASYNC)
+            # Plays from the PCM cache on a worker thread; the callback fires when the clip really ends
+            self.get_audio_player().play(audio_path, lambda error: self.marshal_audio_done(play_button, error), stat)
             
             play_button.config(text="⏸")
             self.currently_playing = play_button
-            self.audio_start_time = time.time()
-            
-            # Check periodically if audio is still playing
-            self.check_audio_status(play_button)
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to play audio: {e}")
@@ -403,46 +858,32 @@ class App:
         """Stop currently playing audio"""
         if self.currently_playing:
             # Stop any playing sound immediately
-            winsound.PlaySound(None, winsound.SND_PURGE)
-            self.currently_playing.config(text="▶")
+            self.audio_player.stop()
+            try:
+                self.currently_playing.config(text="▶")
+            except tk.TclError:
+                pass  # Button was destroyed
             self.currently_playing = None
-            self.audio_start_time = None
-            self.audio_duration = None
     
-    def check_audio_status(self, play_button):
-        """Check if audio is still playing based on elapsed time"""
+    def marshal_audio_done(self, play_button, error):
+        # Called on the audio thread
+        try:
+            self.root.after(0, lambda: self.on_audio_done(play_button, error))
+        except (RuntimeError, tk.TclError):
+            pass  # Window already closed
+    
+    def on_audio_done(self, play_button, error):
+        """Reset the play button once its clip has finished"""
         if self.currently_playing != play_button:
             # Button was stopped or another audio started
             return
-        
-        # Check if button still exists (might have been destroyed by drag/reorder)
         try:
-            play_button.winfo_exists()
-        except:
-            # Button was destroyed, stop tracking it
-            self.currently_playing = None
-            self.audio_start_time = None
-            self.audio_duration = None
-            return
-        
-        # Check if enough time has passed for audio to finish
-        if self.audio_start_time and self.audio_duration:
-            elapsed = time.time() - self.audio_start_time
-            if elapsed >= self.audio_duration:
-                # Audio should be finished
-                if self.currently_playing == play_button:
-                    try:
-                        play_button.config(text="▶")
-                    except:
-                        pass  # Button was destroyed
-                    self.currently_playing = None
-                    self.audio_start_time = None
-                    self.audio_duration = None
-                return
-        
-        # Schedule next check in 100ms
-        if self.currently_playing == play_button:
-            self.root.after(100, lambda: self.check_audio_status(play_button))
+            play_button.config(text="▶")
+        except tk.TclError:
+            pass  # Button was destroyed
+        self.currently_playing = None
+        if error is not None:
+            messagebox.showerror("Error", f"Failed to play audio: {error}")
 
     def save_file(self):
         if not self.commands:
@@ -489,8 +930,9 @@ class App:
         
         if path:
             try:
-                with open(path, "w") as f:
-                    f.write("\n".join(self.commands))
+                text = format_lines(self.commands)
+                self.write_queue.write(path, text)
+                self.journal_saved("commands", path, text)
                 messagebox.showinfo("Success", "File saved successfully!")
                 self.filepath = path
             except Exception as e:
@@ -509,22 +951,25 @@ class App:
         
         # Adjust window size
         self.update_window_size()
+        self.journal_session()
     
-    def toggle_voice_commands(self):
+    def toggle_voice_commands(self, reload=True):
         """Toggle the voice commands panel visibility"""
         self.voice_commands_visible = not self.voice_commands_visible
         
         if self.voice_commands_visible:
             self.voice_toggle_btn.config(text="Hide Voice Commands")
-            self.show_voice_panel()
+            self.show_voice_panel(reload)
         else:
             self.voice_toggle_btn.config(text="Edit Voice Commands")
             if self.voice_panel:
                 self.voice_panel.destroy()
                 self.voice_panel = None
+                self.voice_list_widget = None
         
         # Adjust window size
         self.update_window_size()
+        self.journal_session()
     
     def update_window_size(self):
         """Update window size based on visible panels"""
@@ -561,21 +1006,10 @@ class App:
         # Load commands
         self.voice_commands = []
         try:
-            with open(commands_file, "r") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    # Parse format: "text (filename.txt)"
-                    if "(" in line and line.endswith(")"):
-                        last_paren = line.rfind("(")
-                        text_part = line[:last_paren].strip()
-                        filename_part = line[last_paren+1:-1].strip()
-                        self.voice_commands.append((text_part, filename_part))
-                    else:
-                        # Malformed line, add with empty filename
-                        self.voice_commands.append((line, ""))
+            self.voice_commands, digest = self.read_voice_file(commands_file)
+            self.journal_open("voice", commands_file, digest)
         except Exception as e:
+            self.journal_open("voice")
             messagebox.showerror("Error", f"Failed to load voice commands: {e}")
     
     def save_voice_commands(self):
@@ -601,12 +1035,18 @@ class App:
             if not response:
                 return
         
+        # Pick up edits still sitting in a focused entry
+        if self.voice_list_widget:
+            self.voice_list_widget.commit_rows()
+        
         # Save commands
         try:
-            with open(commands_file, "w") as f:
-                for text, filename in self.voice_commands:
-                    if text or filename:  # Don't save completely empty lines
-                        f.write(f"{text} ({filename})\n")
+            lines = [format_voice_line(text, filename) + "\n"
+                     for text, filename in self.voice_commands
+                     if text or filename]  # Don't save completely empty lines
+            text = "".join(lines)
+            self.write_queue.write(commands_file, text)
+            self.journal_saved("voice", commands_file, text, exact=len(lines) == len(self.voice_commands))
             messagebox.showinfo("Success", "Voice commands saved successfully!")
             # Warn user about PAIcom restart requirement
             messagebox.showwarning("Restart Required", 
@@ -614,9 +1054,10 @@ class App:
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save voice commands: {e}")
     
-    def show_voice_panel(self):
-        """Create and show the voice commands panel"""
-        self.load_voice_commands()
+    def show_voice_panel(self, reload=True):
+        """Create and show the voice commands panel (reload=False keeps self.voice_commands)"""
+        if reload:
+            self.load_voice_commands()
         
         # Create right panel
         self.voice_panel = tk.Frame(self.root, bg=self.bg_dark, width=700)
@@ -630,6 +1071,7 @@ class App:
                  bg=self.accent, fg=self.fg_light).pack(side=tk.LEFT, padx=5)
         tk.Button(voice_top_frame, text="Add Line", command=self.add_voice_line,
                  bg=self.bg_secondary, fg=self.fg_light).pack(side=tk.LEFT, padx=5)
+        self.make_search_box(voice_top_frame, lambda: self.voice_list_widget).pack(side=tk.RIGHT)
         
         # List container
         voice_list_container = tk.Frame(self.voice_panel, bg=self.bg_dark)
@@ -689,8 +1131,7 @@ class App:
     
     def add_voice_line(self):
         """Add a blank voice command line at the top"""
-        self.voice_commands.insert(0, ("", ""))
-        self.voice_list_widget.refresh(self.voice_commands)
+        self.voice_list_widget.insert_item(0, ("", ""))
     
     def on_voice_update(self, new_voice_commands):
         """Called when voice commands are updated"""
@@ -752,196 +1193,742 @@ class App:
         if hasattr(self, 'blank_line_tooltip'):
             self.blank_line_tooltip.destroy()
             del self.blank_line_tooltip
+    
+    def show_issue_tooltip(self, event, issues):
+        """Show why a voice command line is flagged"""
+        self.hide_issue_tooltip()
+        self.issue_tooltip = tk.Toplevel(self.root)
+        self.issue_tooltip.wm_overrideredirect(True)
+        self.issue_tooltip.wm_geometry(f"+{event.x_root+10}+{event.y_root+10}")
+        
+        label = tk.Label(self.issue_tooltip,
+                        text="\n".join(message for _, message in issues),
+                        background="#ffffcc", foreground="#000000",
+                        relief=tk.SOLID, borderwidth=1, padx=8, pady=5,
+                        font=("Arial", 9), justify=tk.LEFT)
+        label.pack()
+    
+    def hide_issue_tooltip(self):
+        """Hide the voice command issue tooltip"""
+        if hasattr(self, 'issue_tooltip'):
+            self.issue_tooltip.destroy()
+            del self.issue_tooltip
+
+
+# [AI-NOTE] Bounded LRU cache of row thumbnails. Entries are keyed by path,
+# mtime, file size and thumbnail height, so an edited image is decoded again
+# while every row showing the same frame shares a single PhotoImage.
+class ThumbnailCache:
+    def __init__(self, max_entries=2000, max_bytes=8 * 1024 * 1024, store=None, root=None, workers=4,
+                 render=render_thumbnail, make_photo=None):
+        self.render = render  # render(path, size) -> PIL image, run when nothing is cached
+        self.make_photo = make_photo  # Turns a render result into a PhotoImage on the Tk thread
+        self.store = store  # Optional ThumbnailStore consulted before decoding the source
+        self.on_dirty = None  # Called when the store has unsaved index changes
+        self.root = root  # Tk root that background results are marshaled back to
+        self.workers = workers  # Decode threads, started by the first request()
+        self.executor = None
+        self.pending = {}  # key -> Future decoding that thumbnail
+        self.waiters = {}  # key -> [ThumbnailRequest] wanting it
+        self.placeholders = {}  # height -> blank PhotoImage shown while decoding
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes  # Estimated as width * height * 4 per thumbnail
+        self.entries = OrderedDict()  # key -> (PhotoImage, size in bytes), oldest first
+        self.latest = {}  # (path, height) -> newest key, to drop superseded versions
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, path, height):
+        """Return a cached PhotoImage for path scaled to height, decoding on a miss"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        key = (path, stat.st_mtime_ns, stat.st_size, height)
+        
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry[0]
+        
+        self.misses += 1
+        return self.store_decoded(key, self.decode(path, height, stat))
+    
+    def request(self, path, height, callback, stat=None):
+        """Get a thumbnail without blocking the Tk thread.
+        
+        Returns (photo, None) on a cache hit. On a miss returns (None, request):
+        the image is decoded on a worker thread and callback(photo) runs later
+        on the Tk thread unless request.cancel() was called first; photo is
+        None if the image could not be decoded. Pass stat
+        (e.g. from the asset index) to skip the os.stat call.
+        """
+        stat = stat or os.stat(path)
+        key = (path, stat.st_mtime_ns, stat.st_size, height)
+        
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry[0], None
+        
+        request = ThumbnailRequest(self, key, callback)
+        self.waiters.setdefault(key, []).append(request)
+        if key not in self.pending:
+            # Rows showing the same frame share one decode
+            self.misses += 1
+            if self.executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+                self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="thumbs")
+            future = self.executor.submit(self.decode, path, height, stat)
+            self.pending[key] = future
+            future.add_done_callback(lambda f, k=key: self.marshal(k, f))
+        return None, request
+    
+    def decode(self, path, height, stat):
+        """Produce the PIL thumbnail (safe to run off the Tk thread)"""
+        if self.store:
+            return self.store.load(path, height, stat)
+        return self.render(path, height)
+    
+    def marshal(self, key, future):
+        # Runs on the worker thread; PhotoImages may only be created on the Tk thread
+        try:
+            self.root.after(0, lambda: self.finish(key, future))
+        except (RuntimeError, tk.TclError):
+            pass  # Window already closed
+    
+    def finish(self, key, future):
+        if self.pending.get(key) is not future:
+            return  # Cancelled and requested again: the waiters belong to the newer decode
+        del self.pending[key]
+        waiters = self.waiters.pop(key, [])
+        if future.cancelled() or future.exception() is not None:
+            photo = None  # Could not be decoded: callers keep their placeholder
+        elif key in self.entries:
+            photo = self.entries[key][0]  # Decoded meanwhile by a blocking get()
+        else:
+            photo = self.store_decoded(key, future.result())
+        for request in waiters:
+            if not request.cancelled:
+                request.callback(photo)
+    
+    def store_decoded(self, key, decoded):
+        if self.store and self.store.dirty and self.on_dirty:
+            self.on_dirty()
+        if self.make_photo:
+            photo = self.make_photo(decoded)
+        else:
+            from PIL import ImageTk
+            photo = ImageTk.PhotoImage(decoded)
+        self.put(key, photo, photo.width() * photo.height() * 4)
+        return photo
+    
+    def forget_request(self, request):
+        """Drop a cancelled request, cancelling the decode if nobody else wants it"""
+        waiters = self.waiters.get(request.key)
+        if waiters and request in waiters:
+            waiters.remove(request)
+        if not waiters:
+            self.waiters.pop(request.key, None)
+            future = self.pending.get(request.key)
+            if future is not None and future.cancel():
+                del self.pending[request.key]
+    
+    def placeholder(self, height):
+        """Blank square shown in place of a thumbnail that is still decoding"""
+        photo = self.placeholders.get(height)
+        if photo is None:
+            photo = tk.PhotoImage(width=height, height=height)
+            photo.put("#555555", to=(0, 0, height, height))
+            self.placeholders[height] = photo
+        return photo
+    
+    def shutdown(self):
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+    
+    def put(self, key, photo, nbytes):
+        # An older mtime/size of the same file can never be requested again
+        superseded = self.latest.get((key[0], key[3]))
+        if superseded is not None and superseded != key and superseded in self.entries:
+            self.discard(superseded)
+        self.latest[(key[0], key[3])] = key
+        
+        replaced = self.entries.pop(key, None)
+        if replaced is not None:
+            self.total_bytes -= replaced[1]  # Re-put: count the image once
+        self.entries[key] = (photo, nbytes)
+        self.total_bytes += nbytes
+        while self.entries and (len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes):
+            oldest = next(iter(self.entries))
+            if oldest == key:
+                break  # Always keep the image that was just requested
+            self.discard(oldest)
+            self.evictions += 1
+    
+    def discard(self, key):
+        photo, nbytes = self.entries.pop(key)
+        self.total_bytes -= nbytes
+        if self.latest.get((key[0], key[3])) == key:
+            del self.latest[(key[0], key[3])]
+    
+    def clear(self):
+        self.entries.clear()
+        self.latest.clear()
+        self.total_bytes = 0
+    
+    def stats(self):
+        """Counters for tuning the budget"""
+        return {
+            "entries": len(self.entries),
+            "bytes": self.total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+# [AI-NOTE] Handle for one row waiting on a background thumbnail decode
+class ThumbnailRequest:
+    __slots__ = ("cache", "key", "callback", "cancelled")
+    
+    def __init__(self, cache, key, callback):
+        self.cache = cache
+        self.key = key
+        self.callback = callback
+        self.cancelled = False
+    
+    def cancel(self):
+        if not self.cancelled:
+            self.cancelled = True
+            self.cache.forget_request(self)
+
+
+# [AI-NOTE] Recycles a small pool of row widgets across a canvas viewport.
+# Rows are placed as canvas windows at index * row_height, and only the rows
+# inside the visible area are bound to items, so the widget count depends on
+# the window height rather than the list length.
+class VirtualRowPool:
+    def __init__(self, canvas, row_height, make_row, bind_row):
+        self.canvas = canvas
+        self.row_height = row_height
+        self.make_row = make_row  # make_row(parent) -> row widget
+        self.bind_row = bind_row  # bind_row(row, index) -> shows items[index] in row
+        self.rows = []  # Pooled row widgets
+        self.windows = []  # Canvas window ids, parallel to rows
+        self.count = 0
+        self.view = None  # Item indices to show (a search filter), or None for all items
+        
+        self.canvas.bind("<Configure>", self.on_configure)
+    
+    def set_count(self, count):
+        """Resize the scroll region for count rows and redraw the viewport.
+        
+        Drops any view, since item indices may have shifted; owners that
+        filter call set_view again afterwards.
+        """
+        self.count = count
+        self.view = None
+        self.canvas.configure(scrollregion=(0, 0, self.canvas.winfo_width(), count * self.row_height))
+        self.render()
+    
+    def set_view(self, view):
+        """Show only the given item indices (in order), or every item for None"""
+        if view is not None or self.view is not None:
+            self.view = view
+            self.invalidate()
+            self.canvas.configure(scrollregion=(0, 0, self.canvas.winfo_width(), self.shown() * self.row_height))
+            self.render()
+    
+    def shown(self):
+        return self.count if self.view is None else len(self.view)
+    
+    def invalidate(self):
+        """Force every visible row to be rebound on the next render"""
+        for row in self.rows:
+            row.index = None
+    
+    def on_configure(self, event):
+        for window in self.windows:
+            self.canvas.itemconfigure(window, width=event.width)
+        self.canvas.configure(scrollregion=(0, 0, event.width, self.shown() * self.row_height))
+        self.render()
+    
+    def visible_range(self):
+        """Return (first, last) row positions covered by the viewport"""
+        first = max(0, int(self.canvas.canvasy(0)) // self.row_height)
+        height = max(self.canvas.winfo_height(), self.row_height)
+        last = min(self.shown(), first + height // self.row_height + 2)
+        return first, last
+    
+    def render(self):
+        """Bind pooled rows to the items currently in view"""
+        first, last = self.visible_range()
+        
+        # Grow the pool until it can cover the viewport
+        while len(self.rows) < last - first:
+            row = self.make_row(self.canvas)
+            row.index = None
+            window = self.canvas.create_window(0, -self.row_height * 2, window=row, anchor="nw",
+                                               width=self.canvas.winfo_width(), height=self.row_height)
+            self.rows.append(row)
+            self.windows.append(window)
+        
+        if not self.rows:
+            return
+        
+        # Each position always maps to the same slot, so scrolling by one row
+        # only rebinds the single row that scrolled into view
+        pool_size = len(self.rows)
+        used = set()
+        for position in range(first, last):
+            index = position if self.view is None else self.view[position]
+            slot = position % pool_size
+            used.add(slot)
+            row = self.rows[slot]
+            if row.index != index:
+                self.bind_row(row, index)
+                row.index = index
+                self.canvas.coords(self.windows[slot], 0, position * self.row_height)
+        
+        # Park unused rows above the scroll region where they can't be seen
+        for slot, row in enumerate(self.rows):
+            if slot not in used and row.index is not None:
+                row.index = None
+                self.canvas.coords(self.windows[slot], 0, -self.row_height * 2)
+    
+    def index_at(self, y_root):
+        """Return the item index under a screen y coordinate, or -1"""
+        y = self.canvas.canvasy(y_root - self.canvas.winfo_rooty())
+        position = int(y // self.row_height)
+        if 0 <= position < self.shown():
+            return position if self.view is None else self.view[position]
+        return -1
+    
+    def destroy(self):
+        self.canvas.unbind("<Configure>")
+        for window in self.windows:
+            self.canvas.delete(window)
+        for row in self.rows:
+            row.destroy()
+        self.rows = []
+        self.windows = []
 
 
 # [AI-NOTE] Custom Widget for Drag-and-Drop List
 class DraggableListFrame(tk.Frame):
-    def __init__(self, parent, items, update_callback, app):
+    JOURNAL_NAME = "commands"  # Buffer name for App.journal_edit
+    VIRTUAL_THRESHOLD = 200  # Lists at least this long only build widgets for visible rows
+    ROW_HEIGHT = 30
+    
+    def __init__(self, parent, items, update_callback, app, virtual=None):
         super().__init__(parent, bg=app.bg_dark)
         self.items = items
         self.update_callback = update_callback
         self.app = app
+        self.virtual = virtual  # True/False to force a mode, None to pick by list length
+        self.pool = None  # VirtualRowPool while in virtualized mode
+        self.rows = []  # Row widgets in item order (non-virtualized mode only)
+        self.search = ListSearch(str)  # Filter typed into the panel's search box
+        self.history = EditHistory(max_bytes=app.HISTORY_BYTES)  # Ctrl+Z / Ctrl+Y
+        self.drag_start_index = None
         
         # Scrollable Canvas Setup
         self.canvas = tk.Canvas(self, bg=app.bg_dark, highlightthickness=0)
         self.scrollbar = tk.Scrollbar(self, orient="vertical", command=self.canvas.yview, bg=app.bg_secondary)
         self.scrollable_frame = tk.Frame(self.canvas, bg=app.bg_dark)
 
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-        )
+        self.scrollable_frame.bind("<Configure>", self.on_frame_configure)
 
-        self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        self.frame_window = self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
+        self.canvas.configure(yscrollcommand=self.on_canvas_scroll)
 
         self.canvas.pack(side="left", fill="both", expand=True)
         self.scrollbar.pack(side="right", fill="y")
         
         self.refresh(self.items)
 
+    def on_frame_configure(self, event):
+        # In virtualized mode the scroll region is owned by the row pool
+        if not self.pool:
+            self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+
+    def on_canvas_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self.app.journal_scroll(self.JOURNAL_NAME, first)
+        if self.pool:
+            self.pool.render()
+
+    def use_virtual(self, items):
+        if self.virtual is not None:
+            return self.virtual
+        return len(items) >= self.VIRTUAL_THRESHOLD
+
     def refresh(self, items):
+        if items is not self.items:
+            self.history.clear()  # A different list: old steps no longer apply
         self.items = items
+        self.app.index_for_search(self.search, items)
         
         # Stop any playing audio before destroying widgets
         if self.app.currently_playing:
             self.app.stop_audio()
         
         # Clear existing
+        self.cancel_thumbnails()
         for widget in self.scrollable_frame.winfo_children():
             widget.destroy()
-            
-        # Rebuild
-        for idx, item in enumerate(self.items):
-            self.create_row(idx, item)
+        self.rows = []
+        
+        if self.use_virtual(self.items):
+            if not self.pool:
+                self.pool = VirtualRowPool(self.canvas, self.ROW_HEIGHT, self.make_row, self.bind_row)
+            self.pool.invalidate()
+            self.pool.set_count(len(self.items))
+        else:
+            if self.pool:
+                self.pool.destroy()
+                self.pool = None
+            # Rebuild
+            for idx, item in enumerate(self.items):
+                self.create_row(idx, item)
+        if self.search.query:
+            self.apply_filter()
             
         self.update_callback(self.items)
 
     def create_row(self, idx, text):
-        row = tk.Frame(self.scrollable_frame, bd=1, relief=tk.RAISED, bg=self.app.bg_secondary)
-        row.pack(fill=tk.X, pady=1, anchor="n")
-        
-        display_text = text if text != "" else "_______________"
+        row = self.make_row(self.scrollable_frame)
+        if self.search.query:
+            pass  # apply_filter() packs it if it matches
+        elif idx < len(self.rows):
+            row.pack(fill=tk.X, pady=1, anchor="n", before=self.rows[idx])
+        else:
+            row.pack(fill=tk.X, pady=1, anchor="n")
+        self.bind_row(row, idx)
+        self.rows.insert(idx, row)
+        return row
+
+    # -- Incremental Edits --
+    # These touch only the affected row; refresh() is the fallback for bulk changes
+    def insert_item(self, index, item, record=True):
+        """Insert one item and build only its row"""
+        self.items.insert(index, item)
+        self.search.insert(index, item)
+        if record:
+            self.history.record(INSERT, index, new=item)
+        self.app.list_edited(self, INSERT, index, item=item)
+        if self.needs_mode_switch():
+            self.refresh(self.items)
+            return
+        if self.pool:
+            self.pool.invalidate()
+            self.pool.set_count(len(self.items))
+        else:
+            self.create_row(index, item)
+        if self.search.query:
+            self.apply_filter()
+        self.update_callback(self.items)
+
+    def append_item(self, item):
+        self.insert_item(len(self.items), item)
+
+    def remove_item(self, index, record=True):
+        """Remove one item and destroy only its row"""
+        item = self.items.pop(index)
+        self.search.remove(index)
+        if record:
+            self.history.record(DELETE, index, old=item)
+        self.app.list_edited(self, DELETE, index)
+        if self.needs_mode_switch():
+            self.refresh(self.items)
+            return
+        if self.pool:
+            self.pool.invalidate()
+            self.pool.set_count(len(self.items))
+        else:
+            row = self.rows.pop(index)
+            self.release_accessory(row)
+            row.destroy()
+        if self.search.query:
+            self.apply_filter()
+        self.update_callback(self.items)
+
+    def move_item(self, src, dst, record=True):
+        """Move one item, repacking its existing row instead of rebuilding"""
+        item = self.items.pop(src)
+        self.items.insert(dst, item)
+        self.search.move(src, dst)
+        if record:
+            self.history.record(MOVE, src, dst)
+        self.app.list_edited(self, MOVE, src, dst)
+        if self.pool:
+            self.pool.invalidate()
+            self.pool.render()
+        else:
+            row = self.rows.pop(src)
+            self.rows.insert(dst, row)
+            if self.search.query:
+                pass  # Repacked below
+            elif dst + 1 < len(self.rows):
+                row.pack_configure(before=self.rows[dst + 1])
+            elif dst > 0:
+                row.pack_configure(after=self.rows[dst - 1])
+        if self.search.query:
+            self.apply_filter()
+        self.update_callback(self.items)
+
+    def needs_mode_switch(self):
+        return self.use_virtual(self.items) != (self.pool is not None)
+
+    def set_query(self, query):
+        """Filter the list to items containing query (empty shows everything)"""
+        query = query.strip()
+        if query == self.search.query:
+            return
+        self.search.query = query
+        self.canvas.yview_moveto(0)
+        self.apply_filter()
+
+    def apply_filter(self):
+        """Show only matching rows, reusing the existing row widgets"""
+        view = self.search.view(self.items)
+        if self.pool:
+            self.pool.set_view(view)
+            return
+        shown = None if view is None else set(view)
+        for row in self.rows:
+            row.pack_forget()
+        for idx, row in enumerate(self.rows):
+            if shown is None or idx in shown:
+                row.pack(fill=tk.X, pady=1, anchor="n")
+
+    def row_index(self, row):
+        """Current item index shown by row"""
+        if self.pool:
+            return row.index
+        return self.rows.index(row)
+
+    def make_row(self, parent):
+        """Build an empty row; bind_row fills it in for a specific item"""
+        row = tk.Frame(parent, bd=1, relief=tk.RAISED, bg=self.app.bg_secondary)
+        row.index = None
+        row.item = None
+        row.accessory = None  # Thumbnail label or play button for the current item
+        row.thumb_request = None  # Pending background thumbnail decode
+        row.play_btn = None  # Play button inside the accessory of PLAY_AUDIO rows
         
         # Delete Button (add first so it's on the right)
-        del_btn = tk.Button(row, text="Delete", fg="#ff4444", bg=self.app.bg_input, 
-                           activebackground="#cc0000", command=lambda i=idx: self.delete_item(i))
-        del_btn.pack(side=tk.RIGHT)
-        
-        # Check if this is a SHOW/HIDE command for image preview
-        if text.startswith("SHOW ") or text.startswith("HIDE "):
-            parts = text.split(" ", 1)
-            if len(parts) > 1:
-                image_name = parts[1].strip()
-                self.add_image_preview(row, image_name)
-        
-        # Check if this is a PLAY_AUDIO command for play button
-        elif text.startswith("PLAY_AUDIO "):
-            parts = text.split(" ", 1)
-            if len(parts) > 1:
-                audio_path_in_cmd = parts[1].strip()
-                self.add_play_button(row, audio_path_in_cmd)
+        row.del_btn = tk.Button(row, text="Delete", fg="#ff4444", bg=self.app.bg_input, 
+                               activebackground="#cc0000", command=lambda r=row: self.delete_item(self.row_index(r)))
+        row.del_btn.pack(side=tk.RIGHT)
         
         # Drag Handle / Label
-        lbl = tk.Label(row, text=f" {display_text}", anchor="w", cursor="hand2", width=40, 
-                      bg=self.app.bg_secondary, fg=self.app.fg_light)
-        lbl.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        row.label = tk.Label(row, text="", anchor="w", cursor="hand2", width=40, 
+                            bg=self.app.bg_secondary, fg=self.app.fg_light)
+        row.label.pack(side=tk.LEFT, fill=tk.X, expand=True)
         
         # Drag Events
-        lbl.bind("<Button-1>", lambda e, i=idx: self.start_drag(e, i))
-        lbl.bind("<B1-Motion>", self.do_drag)
-        lbl.bind("<ButtonRelease-1>", self.stop_drag)
+        row.label.bind("<Button-1>", lambda e, r=row: self.start_drag(e, self.row_index(r)))
+        row.label.bind("<B1-Motion>", self.do_drag)
+        row.label.bind("<ButtonRelease-1>", self.stop_drag)
+        return row
+
+    def bind_row(self, row, idx):
+        """Show items[idx] in row, rebuilding the preview only if the command changed"""
+        command = self.items[idx]
+        if row.item is not None and row.item == command:
+            return
+        row.item = command
+        
+        display_text = str(command) if command.op != Op.BLANK else "_______________"
+        row.label.config(text=f" {display_text}")
+        
+        # Drop the previous item's thumbnail/play button
+        self.release_accessory(row)
+        
+        # SHOW/HIDE get an image preview, PLAY_AUDIO a play button
+        if command.op in (Op.SHOW, Op.HIDE):
+            self.add_image_preview(row, command.arg)
+        elif command.op == Op.PLAY_AUDIO:
+            self.add_play_button(row, command.arg)
+
+    def refresh_assets(self, changes):
+        """Rebind only the rows whose frame or audio clip changed on disk"""
+        changed = {(folder, AssetIndex.stem_key(folder, name))
+                   for folder, names in changes.items() for name in names}
+        if self.pool:
+            # Off-screen items are bound fresh when they scroll into view, but a
+            # parked row keeps its old item and would skip the rebuild if it
+            # were reused for the same command
+            for row in self.pool.rows:
+                if row.index is None and row.item is not None and self.asset_ref(row.item) in changed:
+                    row.item = None
+            rows = [(row, row.index) for row in self.pool.rows if row.index is not None]
+        else:
+            rows = [(row, idx) for idx, row in enumerate(self.rows)]
+        for row, idx in rows:
+            if self.asset_ref(self.items[idx]) in changed:
+                row.item = None  # Force bind_row to rebuild the preview
+                self.bind_row(row, idx)
+
+    def asset_ref(self, command):
+        """(folder, stem key) of the asset a command refers to, or None"""
+        if command.op in (Op.SHOW, Op.HIDE):
+            return ("animations", AssetIndex.stem_key("animations", command.arg))
+        if command.op == Op.PLAY_AUDIO:
+            name = command.arg.replace("\\", "/")
+            if name.startswith("audio/"):
+                name = name[len("audio/"):]
+            return ("audio", AssetIndex.stem_key("audio", name))
+        return None
+
+    def release_accessory(self, row):
+        """Destroy a row's thumbnail/play button and cancel its pending decode"""
+        if row.thumb_request:
+            row.thumb_request.cancel()
+            row.thumb_request = None
+        if row.accessory:
+            if row.play_btn is not None and row.play_btn is self.app.currently_playing:
+                self.app.stop_audio()
+            row.accessory.destroy()
+            row.accessory = None
+            row.play_btn = None
+
+    def cancel_thumbnails(self):
+        rows = self.pool.rows if self.pool else self.rows
+        for row in rows:
+            if row.thumb_request:
+                row.thumb_request.cancel()
+                row.thumb_request = None
 
     def delete_item(self, index):
-        if 0 <= index < len(self.items):
-            self.items.pop(index)
-            self.refresh(self.items)
+        if index is not None and 0 <= index < len(self.items):
+            self.remove_item(index)
     
     def add_image_preview(self, row, image_name):
         if not PIL_AVAILABLE:
             return
         
-        # Try to find the image file
-        base_path = get_base_path()
-        
-        # Try with and without .png extension
-        possible_paths = [
-            os.path.join(base_path, "animations", image_name),
-            os.path.join(base_path, "animations", f"{image_name}.png"),
-        ]
-        
-        image_path = None
-        for path in possible_paths:
-            if os.path.exists(path):
-                image_path = path
-                break
-        
-        if not image_path:
+        # Find the image file (with or without .png extension) in the asset index
+        entry = self.app.assets.resolve_image(image_name)
+        if not entry:
             return
+        image_path = entry.path
         
         try:
-            # Load and create thumbnail
-            img = Image.open(image_path)
-            
-            # Calculate thumbnail size (height of ~20px to match button)
-            thumb_height = 20
-            aspect_ratio = img.width / img.height
-            thumb_width = int(thumb_height * aspect_ratio)
-            
-            img_thumb = img.resize((thumb_width, thumb_height), Image.Resampling.LANCZOS)
-            photo_thumb = ImageTk.PhotoImage(img_thumb)
+            # Thumbnail height of ~20px to match button; identical images share one PhotoImage.
+            # Uncached thumbnails decode in the background behind a placeholder.
+            photo_thumb, request = self.app.thumb_cache.request(
+                image_path, 20, lambda photo, r=row: self.apply_thumbnail(r, r.accessory, photo), entry.stat)
             
             # Create thumbnail label
-            thumb_label = tk.Label(row, image=photo_thumb, bg=self.app.bg_secondary, cursor="hand2")
+            thumb_label = tk.Label(row, image=photo_thumb or self.app.thumb_cache.placeholder(20),
+                                  bg=self.app.bg_secondary, cursor="hand2")
             thumb_label.image = photo_thumb  # Keep reference
-            thumb_label.pack(side=tk.LEFT, padx=5)
+            thumb_label.pack(side=tk.LEFT, padx=5, before=row.label)
+            row.accessory = thumb_label
+            row.thumb_request = request
             
             # Bind hover events for larger preview
-            thumb_label.bind("<Enter>", lambda e: self.show_large_preview(e, image_path))
+            thumb_label.bind("<Enter>", lambda e: self.show_large_preview(e, image_path, entry.stat))
             thumb_label.bind("<Leave>", lambda e: self.hide_large_preview())
             
         except Exception as e:
             pass  # Silently fail if image can't be loaded
     
-    def show_large_preview(self, event, image_path):
-        if not PIL_AVAILABLE or self.app.preview_window:
+    def apply_thumbnail(self, row, label, photo):
+        """Swap the placeholder for a decoded thumbnail if the row still shows it"""
+        row.thumb_request = None
+        if photo is None:
+            return  # Unreadable image: leave the placeholder
+        try:
+            if label is not None and label.winfo_exists():
+                label.config(image=photo)
+                label.image = photo
+        except tk.TclError:
+            pass  # Row was destroyed with the editor
+    
+    def show_large_preview(self, event, image_path, stat=None):
+        if not PIL_AVAILABLE:
             return
         
+        self.app.preview_target = image_path
+        x_root, y_root = event.x_root, event.y_root
         try:
-            # Create toplevel window for preview
-            preview = tk.Toplevel(self.app.root)
-            preview.overrideredirect(True)  # No window decorations
-            preview.attributes('-topmost', True)
-            
-            # Load image at larger size
-            img = Image.open(image_path)
-            
-            # Scale to max 300px while maintaining aspect ratio
-            max_size = 300
-            aspect_ratio = img.width / img.height
-            
-            if img.width > img.height:
-                new_width = min(max_size, img.width)
-                new_height = int(new_width / aspect_ratio)
-            else:
-                new_height = min(max_size, img.height)
-                new_width = int(new_height * aspect_ratio)
-            
-            img_preview = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-            photo_preview = ImageTk.PhotoImage(img_preview)
-            
-            label = tk.Label(preview, image=photo_preview, bg=self.app.bg_dark, bd=2, relief=tk.RAISED)
-            label.image = photo_preview  # Keep reference
-            label.pack()
+            # Cached previews show immediately; others decode in the background
+            # and appear only if the pointer is still over this thumbnail
+            photo, request = self.app.preview_cache.request(
+                image_path, 300, lambda p: self.place_preview(image_path, p, x_root, y_root), stat)
+        except OSError:
+            return
+        if photo is not None:
+            self.place_preview(image_path, photo, x_root, y_root)
+    
+    def place_preview(self, image_path, photo, x_root, y_root):
+        if photo is None or self.app.preview_target != image_path:
+            return
+        try:
+            preview = self.app.get_preview_window()
+            preview.label.config(image=photo)
+            preview.label.image = photo  # Keep reference
             
             # Position to the right of cursor
-            x = event.x_root + 20
-            y = event.y_root - new_height // 2
-            preview.geometry(f"+{x}+{y}")
-            
-            self.app.preview_window = preview
-            
-        except Exception as e:
+            preview.geometry(f"+{x_root + 20}+{y_root - photo.height() // 2}")
+            preview.deiconify()
+            preview.lift()
+        except tk.TclError:
             pass
     
     def hide_large_preview(self):
+        self.app.preview_target = None
         if self.app.preview_window:
-            self.app.preview_window.destroy()
-            self.app.preview_window = None
+            try:
+                self.app.preview_window.withdraw()
+            except tk.TclError:
+                self.app.preview_window = None
     
     def add_play_button(self, row, audio_path_in_cmd):
-        if not AUDIO_AVAILABLE:
-            return
-        
         # Build full audio path
-        base_path = get_base_path()
         # audio_path_in_cmd is like "audio/sound.wav"
-        audio_path = os.path.join(base_path, audio_path_in_cmd)
+        entry = self.app.assets.resolve_audio(audio_path_in_cmd)
+        if not entry and not self.app.get_audio_player().available:
+            return
+        
+        box = tk.Frame(row, bg=self.app.bg_secondary)
+        box.pack(side=tk.LEFT, padx=5, before=row.label)
+        row.accessory = box
         
-        # Create play button
-        play_btn = tk.Button(row, text="▶", width=2, bg=self.app.bg_input, fg=self.app.fg_light,
-                            command=lambda: self.app.play_audio(audio_path, play_btn))
-        play_btn.pack(side=tk.LEFT, padx=5)
+        if entry:
+            audio_path, stat = entry.path, entry.stat
+        else:
+            audio_path, stat = os.path.join(get_base_path(), audio_path_in_cmd), None  # Missing; play_audio reports it
+        
+        if self.app.get_audio_player().available:
+            # Create play button
+            play_btn = tk.Button(box, text="▶", width=2, bg=self.app.bg_input, fg=self.app.fg_light,
+                                command=lambda: self.app.play_audio(audio_path, play_btn, stat))
+            play_btn.pack(side=tk.LEFT)
+            row.play_btn = play_btn
+        
+        if entry:
+            # Waveform of the clip; peaks are computed off the Tk thread and rows
+            # playing the same clip share one image
+            waveform = tk.Label(box, bg=self.app.bg_secondary, bd=0)
+            waveform.pack(side=tk.LEFT, padx=(5, 0))
+            try:
+                photo, request = self.app.waveform_cache.request(
+                    audio_path, self.app.WAVEFORM_HEIGHT,
+                    lambda p, r=row, w=waveform: self.apply_thumbnail(r, w, p), stat)
+            except OSError:
+                return
+            if photo is not None:
+                self.apply_thumbnail(row, waveform, photo)
+            row.thumb_request = request
 
     # -- Drag and Drop Logic --
     def start_drag(self, event, index):
@@ -955,54 +1942,93 @@ class DraggableListFrame(tk.Frame):
         x, y = self.canvas.winfo_pointerxy()
         widget_under_mouse = self.canvas.winfo_containing(x, y)
         
-        if not widget_under_mouse:
+        if not widget_under_mouse or self.drag_start_index is None:
             return
 
-        target_index = -1
-        rows = self.scrollable_frame.winfo_children()
+        target_index = self.index_at(y)
         
-        for i, row in enumerate(rows):
+        if target_index != -1 and target_index != self.drag_start_index:
+            self.move_item(self.drag_start_index, target_index)
+
+    def index_at(self, y_root):
+        """Return the index of the row under a screen y coordinate, or -1"""
+        if self.pool:
+            return self.pool.index_at(y_root)
+        
+        for i, row in enumerate(self.rows):
+            if not row.winfo_ismapped():
+                continue  # Filtered out by the search box
             row_y_root = row.winfo_rooty()
             row_h = row.winfo_height()
             
-            if row_y_root <= y <= row_y_root + row_h:
-                target_index = i
-                break
-        
-        if target_index != -1 and target_index != self.drag_start_index:
-            item = self.items.pop(self.drag_start_index)
-            self.items.insert(target_index, item)
-            self.refresh(self.items)
+            if row_y_root <= y_root <= row_y_root + row_h:
+                return i
+        return -1
 
 
 # [AI-NOTE] Voice Commands List Widget
 class VoiceCommandsListFrame(tk.Frame):
-    def __init__(self, parent, items, update_callback, app):
+    JOURNAL_NAME = "voice"  # Buffer name for App.journal_edit
+    VIRTUAL_THRESHOLD = 200  # Lists at least this long only keep Entry widgets for visible rows
+    ROW_HEIGHT = 34
+    # Phrase border colors for PhraseIndex issue kinds (first match wins)
+    ISSUE_COLORS = (("duplicate", "#ff4444"), ("conflict", "#ff4444"), ("shadowed", "#ffaa00"), ("shadows", "#ffaa00"))
+    
+    def __init__(self, parent, items, update_callback, app, virtual=None):
         super().__init__(parent, bg=app.bg_dark)
         self.items = items  # List of tuples: (text, filename)
+        self.search = ListSearch(lambda item: f"{item[0]}\n{item[1]}")  # Matches phrase or file
+        self.history = EditHistory(max_bytes=app.HISTORY_BYTES)  # Ctrl+Z / Ctrl+Y
+        self.phrases = PhraseIndex()  # Duplicate/conflict/prefix lookups over self.items
         self.update_callback = update_callback
         self.app = app
+        self.virtual = virtual  # True/False to force a mode, None to pick by list length
+        self.pool = None  # VirtualRowPool while in virtualized mode
+        self.rows = []  # Row widgets in item order (non-virtualized mode only)
+        self.drag_start_index = None
         
         # Scrollable Canvas Setup
         self.canvas = tk.Canvas(self, bg=app.bg_dark, highlightthickness=0)
         self.scrollbar = tk.Scrollbar(self, orient="vertical", command=self.canvas.yview, bg=app.bg_secondary)
         self.scrollable_frame = tk.Frame(self.canvas, bg=app.bg_dark)
 
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-        )
+        self.scrollable_frame.bind("<Configure>", self.on_frame_configure)
 
         self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        self.canvas.configure(yscrollcommand=self.on_canvas_scroll)
 
         self.canvas.pack(side="left", fill="both", expand=True)
         self.scrollbar.pack(side="right", fill="y")
         
         self.refresh(self.items)
 
+    def on_frame_configure(self, event):
+        # In virtualized mode the scroll region is owned by the row pool
+        if not self.pool:
+            self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+
+    def on_canvas_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self.app.journal_scroll(self.JOURNAL_NAME, first)
+        if self.pool:
+            self.pool.render()
+
+    def use_virtual(self, items):
+        if self.virtual is not None:
+            return self.virtual
+        return len(items) >= self.VIRTUAL_THRESHOLD
+
+    def needs_mode_switch(self):
+        return self.use_virtual(self.items) != (self.pool is not None)
+
     def refresh(self, items):
+        # Keep any in-progress edits from rows that are about to be rebuilt
+        self.commit_rows()
+        if items is not self.items:
+            self.history.clear()  # A different list: old steps no longer apply
         self.items = items
+        self.app.index_for_search(self.search, items)
+        self.phrases = PhraseIndex(items)
         
         # Stop any playing audio before destroying widgets
         if self.app.currently_playing:
@@ -1011,18 +2037,43 @@ class VoiceCommandsListFrame(tk.Frame):
         # Clear existing
         for widget in self.scrollable_frame.winfo_children():
             widget.destroy()
-            
-        # Rebuild
-        for idx, item in enumerate(self.items):
-            self.create_row(idx, item)
+        self.rows = []
+        
+        if self.use_virtual(self.items):
+            if not self.pool:
+                self.pool = VirtualRowPool(self.canvas, self.ROW_HEIGHT, self.make_row, self.bind_row)
+            self.detach_rows()
+            self.pool.set_count(len(self.items))
+        else:
+            if self.pool:
+                self.pool.destroy()
+                self.pool = None
+            # Rebuild
+            for idx, item in enumerate(self.items):
+                self.create_row(idx, item)
+        if self.search.query:
+            self.apply_filter()
             
         self.update_callback(self.items)
 
     def create_row(self, idx, item):
-        text_val, filename_val = item
-        
-        row = tk.Frame(self.scrollable_frame, bd=1, relief=tk.RAISED, bg=self.app.bg_secondary)
-        row.pack(fill=tk.X, pady=1, anchor="n")
+        row = self.make_row(self.scrollable_frame)
+        if self.search.query:
+            pass  # apply_filter() packs it if it matches
+        elif idx < len(self.rows):
+            row.pack(fill=tk.X, pady=1, anchor="n", before=self.rows[idx])
+        else:
+            row.pack(fill=tk.X, pady=1, anchor="n")
+        self.rows.insert(idx, row)
+        self.bind_row(row, idx)
+        return row
+
+    def make_row(self, parent):
+        """Build an empty row; bind_row fills the entries for a specific item"""
+        row = tk.Frame(parent, bd=1, relief=tk.RAISED, bg=self.app.bg_secondary)
+        row.index = None
+        row.bound = None  # Item index the entries were last filled from (virtualized mode)
+        row.issues = []  # PhraseIndex issues of the item shown
         
         # Configure column weights to match header
         row.columnconfigure(0, weight=0, minsize=65)  # Delete button column
@@ -1033,23 +2084,27 @@ class VoiceCommandsListFrame(tk.Frame):
         
         # Delete Button (column 0)
         del_btn = tk.Button(row, text="Delete", fg="#ff4444", bg=self.app.bg_input, 
-                           activebackground="#cc0000", command=lambda i=idx: self.delete_item(i))
+                           activebackground="#cc0000", command=lambda r=row: self.delete_item(self.row_index(r)))
         del_btn.grid(row=0, column=0, sticky="w", padx=2, pady=2)
         
         # Text field (column 1) - wider for longer text
-        text_entry = tk.Entry(row, width=50, bg=self.app.bg_input, fg=self.app.fg_light, insertbackground=self.app.fg_light)
-        text_entry.insert(0, text_val)
-        text_entry.grid(row=0, column=1, sticky="ew", padx=2, pady=2)
-        text_entry.bind("<FocusOut>", lambda e, i=idx, entry=text_entry: self.update_text(i, entry))
+        # Its border turns red/orange when the phrase clashes with another line
+        row.text_entry = tk.Entry(row, width=50, bg=self.app.bg_input, fg=self.app.fg_light, insertbackground=self.app.fg_light,
+                                 highlightthickness=1, highlightbackground=self.app.bg_secondary)
+        row.text_entry.grid(row=0, column=1, sticky="ew", padx=2, pady=2)
+        row.text_entry.bind("<FocusOut>", lambda e, r=row: self.update_text(self.row_index(r), r.text_entry))
+        row.text_entry.bind("<KeyRelease>", lambda e, r=row: self.edit_row(r))
+        row.text_entry.bind("<Enter>", lambda e, r=row: r.issues and self.app.show_issue_tooltip(e, r.issues))
+        row.text_entry.bind("<Leave>", lambda e: self.app.hide_issue_tooltip())
         
         # Filename field (column 2) - wider for longer filenames
-        filename_entry = tk.Entry(row, width=25, bg=self.app.bg_input, fg=self.app.fg_light, insertbackground=self.app.fg_light)
-        filename_entry.insert(0, filename_val)
-        filename_entry.grid(row=0, column=2, sticky="w", padx=2, pady=2)
-        filename_entry.bind("<FocusOut>", lambda e, i=idx, entry=filename_entry: self.update_filename(i, entry))
+        row.filename_entry = tk.Entry(row, width=25, bg=self.app.bg_input, fg=self.app.fg_light, insertbackground=self.app.fg_light)
+        row.filename_entry.grid(row=0, column=2, sticky="w", padx=2, pady=2)
+        row.filename_entry.bind("<FocusOut>", lambda e, r=row: self.update_filename(self.row_index(r), r.filename_entry))
+        row.filename_entry.bind("<KeyRelease>", lambda e, r=row: self.edit_row(r))
         
         # Browse button (column 3)
-        browse_btn = tk.Button(row, text="Browse", command=lambda i=idx, entry=filename_entry: self.browse_animation(i, entry),
+        browse_btn = tk.Button(row, text="Browse", command=lambda r=row: self.browse_animation(self.row_index(r), r.filename_entry),
                               bg=self.app.bg_secondary, fg=self.app.fg_light, activebackground=self.app.accent)
         browse_btn.grid(row=0, column=3, sticky="w", padx=2, pady=2)
         
@@ -1058,36 +2113,254 @@ class VoiceCommandsListFrame(tk.Frame):
         drag_label.grid(row=0, column=4, sticky="w", padx=2, pady=2)
         
         # Drag Events
-        drag_label.bind("<Button-1>", lambda e, i=idx: self.start_drag(e, i))
+        drag_label.bind("<Button-1>", lambda e, r=row: self.start_drag(e, self.row_index(r)))
         drag_label.bind("<B1-Motion>", self.do_drag)
         drag_label.bind("<ButtonRelease-1>", self.stop_drag)
+        return row
+
+    def bind_row(self, row, idx):
+        """Fill row's entries from items[idx], writing back what it showed before"""
+        if row.bound is not None:
+            # Row is being recycled as it scrolls out of view
+            self.commit_row(row)
+            if self.focus_get() in (row.text_entry, row.filename_entry):
+                self.canvas.focus_set()
+        
+        text_val, filename_val = self.items[idx]
+        row.text_entry.delete(0, tk.END)
+        row.text_entry.insert(0, text_val)
+        row.filename_entry.delete(0, tk.END)
+        row.filename_entry.insert(0, filename_val)
+        row.bound = idx if self.pool else None
+        self.show_issues(row, self.items[idx])
+
+    def set_query(self, query):
+        """Filter the list to items containing query (empty shows everything)"""
+        query = query.strip()
+        if query == self.search.query:
+            return
+        self.search.query = query
+        self.canvas.yview_moveto(0)
+        self.apply_filter()
+
+    def apply_filter(self):
+        """Show only matching rows, reusing the existing row widgets"""
+        view = self.search.view(self.items)
+        if self.pool:
+            self.pool.set_view(view)
+            return
+        shown = None if view is None else set(view)
+        for row in self.rows:
+            row.pack_forget()
+        for idx, row in enumerate(self.rows):
+            if shown is None or idx in shown:
+                row.pack(fill=tk.X, pady=1, anchor="n")
+
+    def set_item(self, idx, item, record=True):
+        """Replace items[idx], keeping the phrase and search indexes in step"""
+        if item == self.items[idx]:
+            return  # Nothing to undo, journal or mark unsaved
+        if record:
+            # Keystrokes on the same row within a second undo as one step
+            self.history.record(EDIT, idx, old=self.items[idx], new=item, merge=True)
+        self.app.list_edited(self, EDIT, idx, item=item)
+        self.phrases.replace(self.items[idx], item)
+        self.search.replace(idx, item)
+        self.items[idx] = item
+
+    def replace_item(self, index, item, record=True):
+        """Overwrite one item and redraw its row if it is on screen"""
+        self.commit_rows()
+        self.set_item(index, item, record)
+        if self.pool:
+            self.detach_rows()
+            self.pool.render()
+        else:
+            self.bind_row(self.rows[index], index)
+        self.refresh_issues()
+        self.update_callback(self.items)
+
+    def show_issues(self, row, item):
+        row.issues = self.phrases.issues(*item)
+        kinds = {kind for kind, _ in row.issues}
+        color = next((color for kind, color in self.ISSUE_COLORS if kind in kinds), self.app.bg_secondary)
+        row.text_entry.config(highlightbackground=color, highlightcolor=color if row.issues else self.app.accent)
+
+    def refresh_issues(self):
+        """Re-flag the rows on screen after an edit (other lines may now clash or not)"""
+        if self.pool:
+            rows = [(row, row.index) for row in self.pool.rows if row.index is not None]
+        else:
+            rows = [(row, idx) for idx, row in enumerate(self.rows)]
+        for row, idx in rows:
+            if idx < len(self.items):
+                self.show_issues(row, self.items[idx])
+
+    def edit_row(self, row):
+        """Write a row back as it is typed so clashes show up immediately"""
+        idx = self.row_index(row)
+        if not 0 <= idx < len(self.items):
+            return
+        edited = (row.text_entry.get(), row.filename_entry.get())
+        if edited != self.items[idx]:
+            self.set_item(idx, edited)
+            self.update_callback(self.items)
+            self.refresh_issues()
+
+    def commit_row(self, row):
+        """Write a virtualized row's entry contents back to the model"""
+        idx = row.bound
+        if idx is None or not 0 <= idx < len(self.items):
+            return False
+        edited = (row.text_entry.get(), row.filename_entry.get())
+        if edited == self.items[idx]:
+            return False
+        self.set_item(idx, edited)
+        return True
+
+    def commit_rows(self):
+        """Write every visible row back to the model (before saving or restructuring)"""
+        changed = False
+        if self.pool:
+            for row in self.pool.rows:
+                changed = self.commit_row(row) or changed
+        else:
+            for idx, row in enumerate(self.rows):
+                edited = (row.text_entry.get(), row.filename_entry.get())
+                if idx < len(self.items) and edited != self.items[idx]:
+                    self.set_item(idx, edited)
+                    changed = True
+        if changed:
+            self.update_callback(self.items)
+            self.refresh_issues()
+
+    def detach_rows(self):
+        """Forget which items pooled rows show; call after indices have shifted"""
+        if self.pool:
+            for row in self.pool.rows:
+                row.bound = None
+            self.pool.invalidate()
+
+    def row_index(self, row):
+        """Current item index shown by row, or -1 once the row is gone"""
+        if self.pool:
+            return row.index if row.index is not None else -1
+        try:
+            return self.rows.index(row)
+        except ValueError:
+            return -1
+
+    def index_at(self, y_root):
+        """Return the index of the row under a screen y coordinate, or -1"""
+        if self.pool:
+            return self.pool.index_at(y_root)
+        
+        for i, row in enumerate(self.rows):
+            if not row.winfo_ismapped():
+                continue  # Filtered out by the search box
+            row_y_root = row.winfo_rooty()
+            row_h = row.winfo_height()
+            
+            if row_y_root <= y_root <= row_y_root + row_h:
+                return i
+        return -1
+
+    # -- Incremental Edits --
+    # These touch only the affected row; refresh() is the fallback for bulk changes
+    def insert_item(self, index, item, record=True):
+        """Insert one item and build only its row"""
+        self.commit_rows()
+        self.items.insert(index, item)
+        self.search.insert(index, item)
+        self.phrases.add(*item)
+        if record:
+            self.history.record(INSERT, index, new=item)
+        self.app.list_edited(self, INSERT, index, item=item)
+        if self.needs_mode_switch():
+            self.refresh(self.items)
+            return
+        if self.pool:
+            self.detach_rows()
+            self.pool.set_count(len(self.items))
+        else:
+            self.create_row(index, item)
+        if self.search.query:
+            self.apply_filter()
+        self.refresh_issues()
+        self.update_callback(self.items)
+
+    def remove_item(self, index, record=True):
+        """Remove one item and destroy only its row"""
+        self.commit_rows()
+        item = self.items.pop(index)
+        self.phrases.remove(*item)
+        self.search.remove(index)
+        if record:
+            self.history.record(DELETE, index, old=item)
+        self.app.list_edited(self, DELETE, index)
+        if self.needs_mode_switch():
+            self.refresh(self.items)
+            return
+        if self.pool:
+            self.detach_rows()
+            self.pool.set_count(len(self.items))
+        else:
+            self.rows.pop(index).destroy()
+        if self.search.query:
+            self.apply_filter()
+        self.refresh_issues()
+        self.update_callback(self.items)
+
+    def move_item(self, src, dst, record=True):
+        """Move one item, repacking its existing row instead of rebuilding"""
+        self.commit_rows()
+        item = self.items.pop(src)
+        self.items.insert(dst, item)
+        self.search.move(src, dst)
+        if record:
+            self.history.record(MOVE, src, dst)
+        self.app.list_edited(self, MOVE, src, dst)
+        if self.pool:
+            self.detach_rows()
+            self.pool.render()
+        else:
+            row = self.rows.pop(src)
+            self.rows.insert(dst, row)
+            if self.search.query:
+                pass  # Repacked below
+            elif dst + 1 < len(self.rows):
+                row.pack_configure(before=self.rows[dst + 1])
+            elif dst > 0:
+                row.pack_configure(after=self.rows[dst - 1])
+        if self.search.query:
+            self.apply_filter()
+        self.update_callback(self.items)
 
     def update_text(self, index, entry):
         """Update text when entry loses focus"""
         if 0 <= index < len(self.items):
             new_text = entry.get()
             old_text, filename = self.items[index]
-            self.items[index] = (new_text, filename)
+            if new_text == old_text:
+                return  # Already written back by edit_row as it was typed
+            self.set_item(index, (new_text, filename))
             self.update_callback(self.items)
+            self.refresh_issues()
 
     def update_filename(self, index, entry):
         """Update filename when entry loses focus"""
         if 0 <= index < len(self.items):
             new_filename = entry.get()
             text, old_filename = self.items[index]
-            self.items[index] = (text, new_filename)
+            if new_filename == old_filename:
+                return
+            self.set_item(index, (text, new_filename))
             self.update_callback(self.items)
+            self.refresh_issues()
 
     def browse_animation(self, index, entry_widget):
         """Browse for .txt file in animations folder"""
-        base_path = get_base_path()
-        animations_dir = os.path.join(base_path, "animations")
-        
-        if not os.path.exists(animations_dir):
-            try:
-                os.makedirs(animations_dir)
-            except:
-                animations_dir = base_path
+        animations_dir = self.app.assets.ensure_folder("animations")
         
         filepath = filedialog.askopenfilename(
             initialdir=animations_dir, 
@@ -1102,13 +2375,13 @@ class VoiceCommandsListFrame(tk.Frame):
             # Update the item
             if 0 <= index < len(self.items):
                 text, _ = self.items[index]
-                self.items[index] = (text, filename)
+                self.set_item(index, (text, filename))
                 self.update_callback(self.items)
+                self.refresh_issues()
 
     def delete_item(self, index):
         if 0 <= index < len(self.items):
-            self.items.pop(index)
-            self.refresh(self.items)
+            self.remove_item(index)
 
     # -- Drag and Drop Logic --
     def start_drag(self, event, index):
@@ -1122,24 +2395,204 @@ class VoiceCommandsListFrame(tk.Frame):
         x, y = self.canvas.winfo_pointerxy()
         widget_under_mouse = self.canvas.winfo_containing(x, y)
         
-        if not widget_under_mouse:
+        if not widget_under_mouse or self.drag_start_index is None:
             return
 
-        target_index = -1
-        rows = self.scrollable_frame.winfo_children()
-        
-        for i, row in enumerate(rows):
-            row_y_root = row.winfo_rooty()
-            row_h = row.winfo_height()
-            
-            if row_y_root <= y <= row_y_root + row_h:
-                target_index = i
-                break
+        target_index = self.index_at(y)
         
         if target_index != -1 and target_index != self.drag_start_index:
-            item = self.items.pop(self.drag_start_index)
-            self.items.insert(target_index, item)
-            self.refresh(self.items)
+            self.move_item(self.drag_start_index, target_index)
+
+
+# [AI-NOTE] Preview window that plays the command list the way PAIcom would:
+# SHOW stacks frames on a canvas in the order they appear, HIDE/HIDE_ALL
+# remove them, PLAY_AUDIO goes through the app's AudioPlayer and WAITs are
+# kept by a DeadlineScheduler. Frames and clips are decoded on worker threads
+# ahead of the playhead, so a step only has to put a ready image on screen.
+class AnimationPlayer(tk.Toplevel):
+    SIZE = 400  # Canvas edge; frames are scaled to fit, never enlarged
+    LOOKAHEAD_MS = 2000  # Preload frames and clips this far ahead of the playhead
+    STARTUP_TIMEOUT_MS = 3000  # Start anyway if the first frames are still decoding
+    CACHE_ENTRIES = 256
+    CACHE_BYTES = 96 * 1024 * 1024
+    STATUS_MS = 100  # Status line refresh while playing
+    
+    def __init__(self, app):
+        super().__init__(app.root, bg=app.bg_dark)
+        self.app = app
+        self.title("Animation Preview")
+        self.resizable(False, False)
+        
+        self.frames = ThumbnailCache(max_entries=self.CACHE_ENTRIES, max_bytes=self.CACHE_BYTES,
+                                     root=app.root, workers=2, render=render_preview)
+        from concurrent.futures import ThreadPoolExecutor
+        self.audio_loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="preload-audio")
+        self.scheduler = DeadlineScheduler(app.root.after, app.root.after_cancel)
+        self.steps = []
+        self.duration_ms = 0
+        self.preload_position = 0  # Next step whose frame/clip hasn't been requested
+        self.requests = []  # Outstanding preload decodes
+        self.waiting = 0  # Preloads still decoding before playback starts
+        self.start_timer = None
+        self.status_timer = None
+        self.shown = {}  # Frame stem key -> (canvas item, PhotoImage), bottom to top
+        self.current_line = None
+        self.notes = []  # Missing assets and URLs that were not opened
+        self.played_audio = False
+        
+        self.canvas = tk.Canvas(self, width=self.SIZE, height=self.SIZE, bg=app.bg_secondary, highlightthickness=0)
+        self.canvas.pack(padx=10, pady=(10, 5))
+        
+        controls = tk.Frame(self, bg=app.bg_dark)
+        controls.pack(fill=tk.X, padx=10, pady=(0, 10))
+        tk.Button(controls, text="▶ Play", command=self.play, width=8,
+                  bg=app.bg_secondary, fg=app.fg_light, activebackground=app.accent).pack(side=tk.LEFT)
+        tk.Button(controls, text="■ Stop", command=self.stop, width=8,
+                  bg=app.bg_secondary, fg=app.fg_light, activebackground=app.accent).pack(side=tk.LEFT, padx=5)
+        self.status = tk.Label(controls, text="", bg=app.bg_dark, fg=app.fg_gray, font=("Arial", 9), anchor="w")
+        self.status.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        
+        self.protocol("WM_DELETE_WINDOW", self.destroy)
+        self.bind("<Destroy>", self.on_destroy)
+    
+    def load(self, commands):
+        """Set the script to play; it is a snapshot, so editing the list doesn't affect playback"""
+        self.stop()
+        self.steps, self.duration_ms = build_timeline(commands)
+        self.status.config(text=f"{len(self.steps)} steps, {self.duration_ms / 1000:.2f} s")
+    
+    def play(self):
+        self.stop()
+        self.clear_frames()
+        if not self.steps:
+            self.status.config(text="Nothing to play")
+            return
+        if self.app.currently_playing:
+            self.app.stop_audio()  # One clip at a time
+        self.notes = []
+        self.preload_position = 0
+        self.waiting = 0
+        self.preload(self.LOOKAHEAD_MS, self.on_preloaded)
+        if self.waiting:
+            self.status.config(text="Loading frames…")
+            self.start_timer = self.app.root.after(self.STARTUP_TIMEOUT_MS, self.begin)
+        else:
+            self.begin()
+    
+    def begin(self):
+        self.start_timer = None
+        self.scheduler.start(self.steps, self.duration_ms, self.run_step, self.finished)
+        if self.scheduler.running:
+            self.update_status()
+    
+    def stop(self):
+        self.scheduler.stop()
+        for timer in (self.start_timer, self.status_timer):
+            if timer is not None:
+                self.app.root.after_cancel(timer)
+        self.start_timer = self.status_timer = None
+        for request in self.requests:
+            request.cancel()
+        self.requests = []
+        if self.played_audio:
+            self.app.get_audio_player().stop()
+            self.played_audio = False
+    
+    def on_destroy(self, event):
+        if event.widget is self:
+            self.stop()
+            self.frames.shutdown()
+            self.audio_loader.shutdown(wait=False, cancel_futures=True)
+    
+    def preload(self, until_ms, callback=None):
+        """Start decoding frames and clips for every step up to until_ms"""
+        assets = self.app.assets
+        while self.preload_position < len(self.steps) and self.steps[self.preload_position].at_ms <= until_ms:
+            command = self.steps[self.preload_position].command
+            self.preload_position += 1
+            if command.op == Op.SHOW and PIL_AVAILABLE:
+                entry = assets.resolve_image(command.arg)
+                if entry is None:
+                    continue
+                photo, request = self.frames.request(entry.path, self.SIZE, callback or (lambda photo: None),
+                                                     entry.stat)
+                if request is not None:
+                    self.requests.append(request)
+                    if callback:
+                        self.waiting += 1
+            elif command.op == Op.PLAY_AUDIO:
+                entry = assets.resolve_audio(command.arg)
+                if entry is not None:
+                    self.audio_loader.submit(self.app.pcm_cache.get, entry.path, entry.stat)
+    
+    def on_preloaded(self, photo):
+        self.waiting -= 1  # A frame that failed to decode (photo None) counts as done too
+        if self.waiting == 0 and self.start_timer is not None:
+            self.app.root.after_cancel(self.start_timer)
+            self.begin()
+    
+    def run_step(self, step):
+        self.preload(step.at_ms + self.LOOKAHEAD_MS)
+        self.current_line = step.index + 1
+        command = step.command
+        if command.op == Op.HIDE_ALL:
+            self.clear_frames()
+        elif command.op == Op.SHOW:
+            self.show_frame(command.arg)
+        elif command.op == Op.HIDE:
+            shown = self.shown.pop(AssetIndex.stem_key("animations", command.arg), None)
+            if shown:
+                self.canvas.delete(shown[0])
+        elif command.op == Op.PLAY_AUDIO:
+            entry = self.app.assets.resolve_audio(command.arg)
+            if entry is None:
+                self.notes.append(f"missing {command.arg}")
+            elif self.app.get_audio_player().available:
+                self.app.get_audio_player().play(entry.path, lambda error: None, entry.stat)
+                self.played_audio = True
+        elif command.op == Op.OPEN_URL:
+            self.notes.append(f"would open {command.arg}")
+    
+    def show_frame(self, name):
+        entry = self.app.assets.resolve_image(name)
+        if entry is None:
+            self.notes.append(f"missing {name}")
+            return
+        if not PIL_AVAILABLE:
+            return
+        photo, request = self.frames.request(entry.path, self.SIZE, lambda photo: None, entry.stat)
+        if photo is None:
+            request.cancel()
+            photo = self.frames.get(entry.path, self.SIZE)  # Not preloaded in time: decode now
+            if photo is None:
+                self.notes.append(f"unreadable {name}")
+                return
+        key = AssetIndex.stem_key("animations", name)
+        shown = self.shown.pop(key, None)
+        if shown:
+            self.canvas.delete(shown[0])
+        item = self.canvas.create_image(self.SIZE // 2, self.SIZE // 2, image=photo)
+        self.shown[key] = (item, photo)  # Keep the PhotoImage alive while it is on the canvas
+    
+    def clear_frames(self):
+        self.canvas.delete("all")
+        self.shown.clear()
+    
+    def update_status(self):
+        self.status_timer = None
+        if not self.scheduler.running:
+            return
+        line = f", line {self.current_line}" if self.current_line else ""
+        self.status.config(text=f"{self.scheduler.elapsed_ms() / 1000:.2f} / {self.duration_ms / 1000:.2f} s{line}")
+        self.status_timer = self.app.root.after(self.STATUS_MS, self.update_status)
+    
+    def finished(self):
+        stats = self.scheduler.stats()
+        text = (f"Done: {stats['steps']} steps in {self.duration_ms / 1000:.2f} s, "
+                f"late max {stats['late_max_ms']} ms / mean {stats['late_mean_ms']} ms")
+        if self.notes:
+            text += f" ({len(self.notes)} note(s): {self.notes[0]})"
+        self.status.config(text=text)
 
 
 # [AI-NOTE] Phone-style Toggle Button Widget
@@ -1154,6 +2607,7 @@ class ToggleButton(tk.Frame):
         self.always_green = always_green
         self.invert_display = invert_display  # Invert visual display but keep file values
         self.state = None  # Will be 0 (on) or 1 (off) or None (error)
+        self.loaded = False  # Set once App.load_toggles has read the file
         
         # Create label
         tk.Label(self, text=label, bg=app.bg_dark, fg=app.fg_light, 
@@ -1169,15 +2623,14 @@ class ToggleButton(tk.Frame):
                                    font=("Arial", 9))
         self.state_label.pack(side=tk.LEFT, padx=5)
         
-        # Load state and draw
-        self.load_state()
+        # Drawn empty until the state has been loaded
         self.draw_toggle()
         
         # Bind click event
         self.canvas.bind("<Button-1>", self.toggle_click)
     
     def load_state(self):
-        """Load state from file"""
+        """Load state from file (no Tk calls, so it can run on a worker thread)"""
         try:
             # Ensure directory exists
             dir_path = os.path.dirname(self.file_path)
@@ -1187,8 +2640,7 @@ class ToggleButton(tk.Frame):
             # Check if file exists
             if not os.path.exists(self.file_path):
                 # Create file with default value 1 (OFF)
-                with open(self.file_path, "w") as f:
-                    f.write("1")
+                atomic_write(self.file_path, "1")
                 self.state = 1
             else:
                 # Read file
@@ -1203,18 +2655,37 @@ class ToggleButton(tk.Frame):
         except Exception as e:
             self.state = None
     
+    def state_loaded(self):
+        """Show the state load_state read; runs on the Tk thread"""
+        try:
+            if not self.winfo_exists():
+                return  # Start screen was left before the files were read
+        except tk.TclError:
+            return
+        self.loaded = True
+        self.draw_toggle()
+    
     def save_state(self):
-        """Save state to file"""
+        """Save state to file (in the background; rapid clicks write only the last state)"""
+        self.app.write_queue.submit(self.file_path, str(self.state), self.report_save_error)
+    
+    def report_save_error(self, error):
+        # Runs on the writer thread
         try:
-            with open(self.file_path, "w") as f:
-                f.write(str(self.state))
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to save toggle state: {e}")
+            self.app.root.after(0, lambda: messagebox.showerror("Error", f"Failed to save toggle state: {error}"))
+        except (RuntimeError, tk.TclError):
+            pass  # Window already closed
     
     def draw_toggle(self):
         """Draw the toggle switch"""
         self.canvas.delete("all")
         
+        if not self.loaded:
+            # Empty track until the file has been read
+            self.canvas.create_rectangle(2, 2, 48, 22, fill="#666666", outline="")
+            self.state_label.config(text="")
+            return
+        
         if self.state is None:
             # Error state - show question mark
             self.canvas.create_text(25, 12, text="?", font=("Arial", 16, "bold"),
@@ -1257,8 +2728,8 @@ class ToggleButton(tk.Frame):
     
     def toggle_click(self, event):
         """Handle toggle click"""
-        if self.state is None:
-            # Error state - don't allow clicking
+        if not self.loaded or self.state is None:
+            # Still loading, or error state - don't allow clicking
             return
         
         # Toggle state
@@ -1305,6 +2776,14 @@ class ToggleButton(tk.Frame):
 
 
 if __name__ == "__main__":
+    # --startup-report times a launch up to the first paint, then exits
+    # (status 1 if it took longer than FIRST_PAINT_TARGET_MS)
+    report = "--startup-report" in sys.argv[1:]
     root = tk.Tk()
-    app = App(root)
+    STARTUP.mark("tk")
+    app = App(root, resume=not report)
+    if report:
+        app.when_painted(app.startup_report)
     root.mainloop()
+    if report:
+        sys.exit(0 if STARTUP.report()["within_target"] else 1)
@@ -0,0 +1,74 @@
+"""Per-edit cost of the command list as it grows.
+
+Times single append/remove/move edits on a DraggableListFrame (forced into
+non-virtualized mode so every row is a real widget) against a full
+refresh(). Incremental edits should stay flat while refresh grows with the
+list length. Needs a display.
+
+    python benchmarks/bench_list_edits.py [sizes...]
+"""
+import os
+import sys
+import time
+import tkinter as tk
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PAIpal import App, DraggableListFrame  # noqa: E402
+from paipal_commands import parse  # noqa: E402
+
+REPEAT = 20
+
+
+def make_items(count):
+    pattern = [parse(line) for line in ("HIDE_ALL", "SHOW idle", "WAIT 100", "PLAY_AUDIO audio/beep.wav", "")]
+    return [pattern[i % len(pattern)] for i in range(count)]
+
+
+def time_edit(root, edit):
+    """Average seconds for one edit, including the resulting layout pass"""
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        edit()
+        root.update_idletasks()
+    return (time.perf_counter() - start) / REPEAT
+
+
+def bench(root, app, size):
+    items = make_items(size)
+    widget = DraggableListFrame(root, items, lambda new_items: None, app, virtual=False)
+    widget.pack(fill=tk.BOTH, expand=True)
+    root.update_idletasks()
+
+    def append_then_remove():
+        widget.append_item(parse("WAIT 50"))
+        widget.remove_item(len(widget.items) - 1)
+
+    def move_there_and_back():
+        widget.move_item(0, len(widget.items) - 1)
+        widget.move_item(len(widget.items) - 1, 0)
+
+    results = {
+        "append+remove": time_edit(root, append_then_remove),
+        "move x2": time_edit(root, move_there_and_back),
+        "refresh": time_edit(root, lambda: widget.refresh(widget.items)),
+    }
+    widget.destroy()
+    return results
+
+
+def main(argv):
+    sizes = [int(arg) for arg in argv] or [100, 500, 1000, 3000]
+    root = tk.Tk()
+    root.withdraw()
+    app = App(root, resume=False)
+
+    print(f"{'rows':>6} {'append+remove':>15} {'move x2':>10} {'refresh':>10}   (ms per edit)")
+    for size in sizes:
+        r = bench(root, app, size)
+        print(f"{size:>6} {r['append+remove'] * 1000:>15.2f} {r['move x2'] * 1000:>10.2f} {r['refresh'] * 1000:>10.2f}")
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
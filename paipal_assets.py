@@ -0,0 +1,360 @@
+# [AI-NOTE] In-memory index of the asset folders (animations/, audio/).
+# Each folder is listed with a single os.scandir pass, and names are mapped
+# both as-is and without their default extension (.png / .wav), so rows and
+# previews can resolve "SHOW idle" or "PLAY_AUDIO audio/beep.wav" without
+# probing the filesystem. Kept free of tkinter for the headless tools.
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+from paipal_paths import get_base_path
+
+# Folder -> extension that commands may leave off
+DEFAULT_EXTENSIONS = {
+    "animations": ".png",
+    "audio": ".wav",
+}
+IMAGE_EXTENSIONS = (".png", ".gif", ".jpg", ".jpeg", ".bmp")
+AUDIO_EXTENSIONS = (".wav",)
+
+
+class AssetEntry:
+    __slots__ = ("folder", "name", "path", "stat")
+
+    def __init__(self, folder, name, path, stat):
+        self.folder = folder
+        self.name = name  # File name inside the folder
+        self.path = path  # Absolute path
+        self.stat = stat  # os.stat_result captured during the scan
+
+    def __repr__(self):
+        return f"AssetEntry({self.folder!r}, {self.name!r})"
+
+
+class AssetIndex:
+    def __init__(self, base_path=None, folders=("animations", "audio")):
+        self.base_path = base_path or get_base_path()
+        self.folders = {folder: {} for folder in folders}  # folder -> {normalized name: AssetEntry}
+        self.scanned = set()  # Folders listed at least once
+
+    @staticmethod
+    def key(name):
+        # Match the filesystem: case-insensitive on Windows, exact elsewhere
+        return os.path.normcase(name)
+
+    @staticmethod
+    def stem_key(folder, name):
+        """Key that is the same for "idle" and "idle.png" (used to match commands to files)"""
+        ext = DEFAULT_EXTENSIONS.get(folder)
+        if ext and name.lower().endswith(ext):
+            name = name[:-len(ext)]
+        return os.path.normcase(name)
+
+    def folder_path(self, folder):
+        return os.path.join(self.base_path, folder)
+
+    def scan(self, folder=None):
+        """(Re)list one folder, or all of them, with one scandir pass each"""
+        for name in ([folder] if folder else list(self.folders)):
+            entries = {}
+            try:
+                with os.scandir(self.folder_path(name)) as it:
+                    for dir_entry in it:
+                        if dir_entry.is_file():
+                            entries[self.key(dir_entry.name)] = AssetEntry(
+                                name, dir_entry.name, dir_entry.path, dir_entry.stat())
+            except OSError:
+                pass  # Missing folder: nothing to index yet
+            self.folders[name] = entries
+            self.scanned.add(name)
+
+    def ensure_scanned(self, folder):
+        if folder not in self.scanned:
+            self.scan(folder)
+
+    def update(self, folder, name):
+        """Re-stat a single file after it was added, replaced or removed"""
+        self.ensure_scanned(folder)
+        path = os.path.join(self.folder_path(folder), name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self.folders[folder].pop(self.key(name), None)
+            return None
+        entry = AssetEntry(folder, name, path, stat)
+        self.folders[folder][self.key(name)] = entry
+        return entry
+
+    def lookup(self, folder, name):
+        """Find name in folder, with or without the folder's default extension"""
+        self.ensure_scanned(folder)
+        entries = self.folders[folder]
+        entry = entries.get(self.key(name))
+        if entry is None:
+            ext = DEFAULT_EXTENSIONS.get(folder)
+            if ext and not name.lower().endswith(ext):
+                entry = entries.get(self.key(name + ext))
+        return entry
+
+    def resolve_image(self, image_name):
+        """Entry for a SHOW/HIDE value such as "idle" or "idle.png" """
+        return self.lookup("animations", image_name)
+
+    def resolve_audio(self, audio_path_in_cmd):
+        """Entry for a PLAY_AUDIO value such as "audio/beep.wav" """
+        name = audio_path_in_cmd.replace("\\", "/")
+        if name.startswith("audio/"):
+            name = name[len("audio/"):]
+        if "/" in name:
+            return None  # Nested folders are not indexed
+        return self.lookup("audio", name)
+
+    def names(self, folder, ext=None):
+        """File names in folder, optionally filtered by extension"""
+        self.ensure_scanned(folder)
+        return [entry.name for entry in self.folders[folder].values()
+                if ext is None or entry.name.lower().endswith(ext)]
+
+    def ensure_folder(self, folder):
+        """Path to folder for browse dialogs, creating it if needed (base path on failure)"""
+        path = self.folder_path(folder)
+        if folder in self.folders and self.folders[folder]:
+            return path  # Has files, so it exists
+        try:
+            os.makedirs(path, exist_ok=True)
+            return path
+        except OSError:
+            return self.base_path
+
+
+# [AI-NOTE] Watches the asset folders and reports changed file names in batches.
+# Uses inotify on Linux and falls back to comparing scandir snapshots anywhere
+# else. Changes are coalesced until the folders have been quiet for `debounce`
+# seconds (or `max_delay` has passed), so copying in 1,000 frames produces one
+# callback instead of 1,000. The callback runs on the watcher thread.
+# A folder that doesn't exist yet is picked up by watching its parent (or by
+# polling just that folder). If the inotify queue overflows, every watched
+# folder is listed again and all of its files are reported as changed.
+class AssetWatcher:
+    # inotify(7) event bits
+    IN_MODIFY = 0x002
+    IN_ATTRIB = 0x004
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_FROM = 0x040
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_Q_OVERFLOW = 0x4000
+    IN_IGNORED = 0x8000  # Watch removed, e.g. the folder was deleted
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    WATCH_MASK = IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    PARENT_MASK = IN_CREATE | IN_MOVED_TO
+    EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self, folders, callback, debounce=0.3, max_delay=3.0, poll_interval=1.0):
+        self.folders = dict(folders)  # folder name -> absolute path
+        self.callback = callback  # callback({folder: set(file names)})
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.pending = {}  # folder -> set of changed names not yet reported
+        self.first_change = None
+        self.last_change = None
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.mode = None  # "inotify" or "poll" once started
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, name="asset-watcher", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def run(self):
+        fd = self.open_inotify()
+        if fd is None:
+            self.mode = "poll"
+            self.run_polling()
+        else:
+            self.mode = "inotify"
+            try:
+                self.run_inotify(fd)
+            finally:
+                os.close(fd)
+
+    # -- Batching --
+    def note(self, folder, name):
+        now = time.monotonic()
+        self.pending.setdefault(folder, set()).add(name)
+        if self.first_change is None:
+            self.first_change = now
+        self.last_change = now
+
+    def flush_due(self):
+        """Report pending changes once things have settled; returns seconds until next check"""
+        if self.first_change is None:
+            return None
+        now = time.monotonic()
+        if now - self.last_change >= self.debounce or now - self.first_change >= self.max_delay:
+            changes, self.pending = self.pending, {}
+            self.first_change = self.last_change = None
+            self.callback(changes)
+            return None
+        return min(self.debounce - (now - self.last_change), self.max_delay - (now - self.first_change))
+
+    # -- inotify backend --
+    def open_inotify(self):
+        if not sys.platform.startswith("linux"):
+            return None
+        import ctypes  # ctypes.util brings in subprocess; only the watcher thread needs it
+        import ctypes.util
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        except (OSError, AttributeError):
+            return None
+        if fd < 0:
+            return None
+        self.libc = libc
+        self.fd = fd
+        self.watches = {}  # watch descriptor -> folder name
+        self.parents = {}  # watch descriptor of a parent -> folders waiting to be created in it
+        self.polled = {}  # folder -> snapshot, for folders that can't be watched at all
+        self.known = {}  # folder -> names seen in it, to report removals after an overflow
+        for folder in self.folders:
+            self.watch_folder(folder)
+        return fd
+
+    def watch_folder(self, folder):
+        """Watch folder; if it is missing, watch its parent instead (or poll it). True if watched."""
+        path = self.folders[folder]
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), self.WATCH_MASK)
+        if wd >= 0:
+            self.watches[wd] = folder
+            self.known[folder] = self.list_names(path)
+            return True
+        self.known.setdefault(folder, set())
+        parent_wd = self.libc.inotify_add_watch(self.fd, os.fsencode(os.path.dirname(path)), self.PARENT_MASK)
+        if parent_wd < 0:
+            self.polled[folder] = self.snapshot(path)
+            return False
+        self.parents.setdefault(parent_wd, set()).add(folder)
+        if os.path.isdir(path):
+            return self.folder_created(parent_wd, folder)  # Created before the parent watch was in place
+        return False
+
+    def folder_created(self, parent_wd, folder):
+        """A watched-for folder appeared: watch it and report what it already holds"""
+        if not self.watch_folder(folder):
+            return False
+        waiting = self.parents.get(parent_wd, set())
+        waiting.discard(folder)
+        if not waiting:
+            self.parents.pop(parent_wd, None)
+            self.libc.inotify_rm_watch(self.fd, parent_wd)
+        for name in self.known[folder]:
+            self.note(folder, name)
+        return True
+
+    def rescan(self, folder):
+        """Report every file in folder, present or gone, after events were lost"""
+        names = self.list_names(self.folders[folder])
+        for name in names | self.known.get(folder, set()):
+            self.note(folder, name)
+        self.known[folder] = names
+
+    def handle_event(self, wd, mask, name):
+        if mask & self.IN_Q_OVERFLOW:
+            for folder in list(self.watches.values()):
+                self.rescan(folder)
+            for parent_wd, waiting in list(self.parents.items()):
+                for folder in list(waiting):
+                    if os.path.isdir(self.folders[folder]):
+                        self.folder_created(parent_wd, folder)
+            return
+        folder = self.watches.get(wd)
+        if folder is not None:
+            if mask & self.IN_IGNORED:
+                # Folder deleted or moved away: its files are gone; wait for it to come back
+                del self.watches[wd]
+                for old in self.known.pop(folder, set()):
+                    self.note(folder, old)
+                self.watch_folder(folder)
+            elif name:
+                if mask & (self.IN_DELETE | self.IN_MOVED_FROM):
+                    self.known[folder].discard(name)
+                else:
+                    self.known[folder].add(name)
+                self.note(folder, name)
+        elif wd in self.parents and name:
+            for waiting in list(self.parents[wd]):
+                if os.path.basename(self.folders[waiting]) == name:
+                    self.folder_created(wd, waiting)
+
+    def run_inotify(self, fd):
+        timeout = None
+        next_poll = time.monotonic() + self.poll_interval
+        while not self.stop_event.is_set():
+            # Wake at least twice a second to notice stop()
+            ready, _, _ = select.select([fd], [], [], min(timeout, 0.5) if timeout is not None else 0.5)
+            if ready:
+                try:
+                    data = os.read(fd, 64 * 1024)
+                except BlockingIOError:
+                    data = b""
+                offset = 0
+                while offset + self.EVENT_HEADER.size <= len(data):
+                    wd, mask, cookie, length = self.EVENT_HEADER.unpack_from(data, offset)
+                    offset += self.EVENT_HEADER.size
+                    name = data[offset:offset + length].rstrip(b"\0")
+                    offset += length
+                    self.handle_event(wd, mask, os.fsdecode(name))
+            if self.polled and time.monotonic() >= next_poll:
+                next_poll = time.monotonic() + self.poll_interval
+                self.poll_folders(self.polled)
+                for folder in list(self.polled):
+                    if os.path.isdir(self.folders[folder]) and self.watch_folder(folder):
+                        del self.polled[folder]
+            timeout = self.flush_due()
+
+    # -- Polling backend --
+    @staticmethod
+    def list_names(path):
+        try:
+            with os.scandir(path) as it:
+                return {entry.name for entry in it if entry.is_file()}
+        except OSError:
+            return set()
+
+    def snapshot(self, path):
+        files = {}
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    if entry.is_file():
+                        stat = entry.stat()
+                        files[entry.name] = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            pass
+        return files
+
+    def run_polling(self):
+        snapshots = {folder: self.snapshot(path) for folder, path in self.folders.items()}
+        while not self.stop_event.wait(self.debounce if self.first_change is not None else self.poll_interval):
+            self.poll_folders(snapshots)
+            self.flush_due()
+
+    def poll_folders(self, snapshots):
+        """Note files whose (mtime, size) differ from snapshots, and update them"""
+        for folder in snapshots:
+            old, new = snapshots[folder], self.snapshot(self.folders[folder])
+            for name in old.keys() | new.keys():
+                if old.get(name) != new.get(name):
+                    self.note(folder, name)
+            snapshots[folder] = new
@@ -0,0 +1,251 @@
+# [AI-NOTE] Sprite atlases for the frames animation scripts SHOW.
+# Every animations/*.txt script is parsed, and the frames it shows are packed
+# into one atlas group per script (split into pages at max_size). Identical
+# frames are stored once: a frame is placed in the first script (by name)
+# that shows it, and atlas.json maps every frame name to its page and
+# sub-rectangle. Each group records a signature of its members' content hashes
+# and the packing settings, so a rebuild only repacks groups whose frames
+# changed. Hashing and packing run in a process pool. Kept free of tkinter.
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from paipal_assets import IMAGE_EXTENSIONS, AssetIndex
+from paipal_commands import Op, parse_lines
+from paipal_paths import get_base_path
+from paipal_storage import atomic_write
+from paipal_thumbs import PIL_AVAILABLE, file_digest, save_png
+
+try:
+    from PIL import Image
+except ImportError:
+    pass  # PIL_AVAILABLE is False; build_atlases refuses to run
+
+ATLAS_VERSION = 1
+INDEX_NAME = "atlas.json"
+
+
+def hash_frame(args):
+    """Worker: (path, mtime_ns, size, sha1), reusing a recorded hash while mtime and size match"""
+    path, record = args
+    try:
+        stat = os.stat(path)
+        if record and record[0] == stat.st_mtime_ns and record[1] == stat.st_size:
+            return path, stat.st_mtime_ns, stat.st_size, record[2]
+        return path, stat.st_mtime_ns, stat.st_size, file_digest(path)
+    except OSError:
+        return path, None, None, None
+
+
+def shelf_pack(sizes, max_size, padding):
+    """Place (w, h) boxes on shelves, tallest first, with padding between them.
+
+    Returns [(page, x, y)] in input order and [(width, height)] per page.
+    Pages never exceed max_size as long as no box does.
+    """
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+    placements = [None] * len(sizes)
+    pages = []
+    page = -1
+    x = y = shelf_height = page_width = 0  # x: right edge of the shelf's last box, 0 if empty
+    for i in order:
+        w, h = sizes[i]
+        left = x + padding if x else 0
+        if page < 0 or left + w > max_size:
+            # New shelf, on a new page if this one is full
+            top = y + shelf_height + padding
+            if page < 0 or top + h > max_size:
+                if page >= 0:
+                    pages[page] = (page_width, y + shelf_height)
+                page += 1
+                pages.append((0, 0))
+                top = page_width = 0
+            y, left, shelf_height = top, 0, 0
+        placements[i] = (page, left, y)
+        x = left + w
+        shelf_height = max(shelf_height, h)
+        page_width = max(page_width, x)
+    if page >= 0:
+        pages[page] = (page_width, y + shelf_height)
+    return placements, pages
+
+
+def pack_group(args):
+    """Worker: (group, {digest: [page file, x, y, w, h]}, [page files]), or (group, None, error)"""
+    group, frames, out_dir, max_size, padding = args
+    images = []
+    try:
+        for digest, path in frames:
+            with Image.open(path) as img:
+                if img.width > max_size or img.height > max_size:
+                    return group, None, f"{os.path.basename(path)} is larger than {max_size}px"
+                images.append((digest, img.convert("RGBA")))
+    except (OSError, ValueError) as e:
+        return group, None, str(e)
+    placements, pages = shelf_pack([img.size for _, img in images], max_size, padding)
+    sheets = [Image.new("RGBA", size, (0, 0, 0, 0)) for size in pages]
+    rects = {}
+    for (digest, img), (page, x, y) in zip(images, placements):
+        sheets[page].paste(img, (x, y))
+        rects[digest] = [page_name(group, page), x, y, img.width, img.height]
+    files = []
+    for page, sheet in enumerate(sheets):
+        name = page_name(group, page)
+        save_png(sheet, os.path.join(out_dir, name))
+        files.append(name)
+    return group, rects, files
+
+
+def frame_key(name):
+    """Name a script uses for a frame file: "idle" for idle.png, the full name otherwise"""
+    return name[:-4] if name.lower().endswith(".png") else name
+
+
+def page_name(group, page):
+    return f"{group}-{page}.png"
+
+
+def group_signature(frames, max_size, padding):
+    digest = hashlib.sha1(f"{ATLAS_VERSION}:{max_size}:{padding}".encode())
+    for frame_digest, _ in frames:
+        digest.update(frame_digest.encode())
+    return digest.hexdigest()
+
+
+def collect_frames(assets):
+    """{script stem: [AssetEntry]} for the frames each script SHOWs, plus sorted missing frame names"""
+    scripts = {}
+    missing = set()
+    for entry in sorted(assets.folders["animations"].values(), key=lambda e: e.name.lower()):
+        if not entry.name.lower().endswith(".txt"):
+            continue
+        try:
+            with open(entry.path, "r") as f:
+                commands = parse_lines(f.read())
+        except (OSError, UnicodeDecodeError):
+            continue
+        frames = {}
+        for command in commands:
+            if command.op != Op.SHOW:
+                continue
+            frame = assets.resolve_image(command.arg)
+            if frame is None or not frame.name.lower().endswith(IMAGE_EXTENSIONS):
+                missing.add(command.arg)
+            else:
+                frames.setdefault(frame.path, frame)
+        if frames:
+            scripts[os.path.splitext(entry.name)[0]] = list(frames.values())
+    return scripts, sorted(missing)
+
+
+def load_index(path):
+    try:
+        with open(path, "r") as f:
+            index = json.load(f)
+        if index.get("version") == ATLAS_VERSION:
+            return index
+    except (OSError, ValueError):
+        pass
+    return {"version": ATLAS_VERSION, "frames": {}, "groups": {}, "sources": {}}
+
+
+def build_atlases(base_path=None, out_dir=None, max_size=2048, padding=1, workers=None, force=False):
+    """Pack every SHOWn frame into atlases under out_dir; returns a summary"""
+    if not PIL_AVAILABLE:
+        raise RuntimeError("Pillow is required to build atlases")
+    start = time.perf_counter()
+    base_path = base_path or get_base_path()
+    out_dir = out_dir or os.path.join(base_path, "atlases")
+    os.makedirs(out_dir, exist_ok=True)
+    index_path = os.path.join(out_dir, INDEX_NAME)
+    old = load_index(index_path)
+
+    assets = AssetIndex(base_path, folders=("animations",))
+    assets.scan()
+    scripts, missing = collect_frames(assets)
+
+    paths = sorted({frame.path for frames in scripts.values() for frame in frames})
+    jobs = [(path, old["sources"].get(path)) for path in paths]
+    chunksize = max(1, len(jobs) // ((workers or os.cpu_count() or 1) * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        hashed = list(pool.map(hash_frame, jobs, chunksize=chunksize)) if jobs else []
+        sources = {path: [mtime_ns, size, digest] for path, mtime_ns, size, digest in hashed if digest}
+
+        # A frame lives in the first script that shows it; others point at that copy
+        placed = set()
+        groups = {}  # script stem -> [(digest, path)]
+        names = {}  # frame name -> digest
+        for script in sorted(scripts, key=str.lower):
+            members = []
+            for frame in scripts[script]:
+                record = sources.get(frame.path)
+                if record is None:
+                    continue
+                digest = record[2]
+                names[frame_key(frame.name)] = digest
+                if digest not in placed:
+                    placed.add(digest)
+                    members.append((digest, frame.path))
+            if members:
+                groups[script] = sorted(members)
+
+        todo = []
+        kept = {}
+        for group, members in groups.items():
+            signature = group_signature(members, max_size, padding)
+            previous = old["groups"].get(group)
+            if (not force and previous and previous["signature"] == signature
+                    and all(os.path.exists(os.path.join(out_dir, name)) for name in previous["pages"])):
+                kept[group] = previous
+            else:
+                todo.append((group, members, out_dir, max_size, padding))
+        rebuilt = {}
+        failed = []
+        for group, rects, result in pool.map(pack_group, todo):
+            if rects is None:
+                failed.append({"group": group, "error": result})
+                continue
+            rebuilt[group] = {"signature": group_signature(groups[group], max_size, padding),
+                              "pages": result, "rects": rects}
+
+    new_groups = dict(kept, **rebuilt)
+    rects = {}
+    for info in new_groups.values():
+        rects.update(info["rects"])
+    frames = {}
+    for name, digest in sorted(names.items()):
+        if digest not in rects:
+            continue  # Its group failed to pack
+        page, x, y, w, h = rects[digest]
+        frames[name] = {"atlas": page, "x": x, "y": y, "w": w, "h": h}
+
+    # Pages of groups that were dropped or shrank
+    current_pages = {name for info in new_groups.values() for name in info["pages"]}
+    removed = 0
+    for info in old["groups"].values():
+        for name in info["pages"]:
+            if name not in current_pages:
+                try:
+                    os.remove(os.path.join(out_dir, name))
+                    removed += 1
+                except OSError:
+                    pass
+
+    index = {"version": ATLAS_VERSION, "max_size": max_size, "padding": padding,
+             "frames": frames, "groups": new_groups, "sources": sources}
+    atomic_write(index_path, json.dumps(index, indent=1))
+    return {
+        "scripts": len(scripts),
+        "frames": len(frames),
+        "unique": len(placed),
+        "atlases": len(current_pages),
+        "rebuilt": sorted(rebuilt),
+        "reused": len(kept),
+        "removed": removed,
+        "missing": missing,
+        "failed": failed,
+        "index": index_path,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
@@ -0,0 +1,489 @@
+# [AI-NOTE] Audio preview playback and WAV metadata shared by the editor.
+# Kept free of tkinter: completion callbacks run on a worker thread and the
+# GUI marshals them back with root.after. winsound, numpy and wave are
+# imported on first use, so importing this module stays cheap at startup.
+import importlib.util
+import mmap
+from abc import ABC, abstractmethod
+import os
+import shutil
+import struct
+import subprocess
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+# Checked without importing them: numpy alone was about half of the editor's import time
+WINSOUND_AVAILABLE = importlib.util.find_spec("winsound") is not None
+NUMPY_AVAILABLE = importlib.util.find_spec("numpy") is not None
+
+
+class WavError(ValueError):
+    """Not a PCM WAV file (wave.Error is converted to this, so callers need not import wave)"""
+
+
+class WavInfo:
+    __slots__ = ("nframes", "rate", "channels", "sampwidth")
+
+    def __init__(self, nframes, rate, channels, sampwidth):
+        self.nframes = nframes
+        self.rate = rate
+        self.channels = channels
+        self.sampwidth = sampwidth  # Bytes per sample
+
+    @property
+    def duration(self):
+        """Length in seconds"""
+        return self.nframes / float(self.rate) if self.rate else 0.0
+
+
+def read_wav_info(path):
+    import wave
+    try:
+        with wave.open(path, "rb") as wav_file:
+            return WavInfo(wav_file.getnframes(), wav_file.getframerate(),
+                           wav_file.getnchannels(), wav_file.getsampwidth())
+    except wave.Error as e:
+        raise WavError(str(e)) from e
+
+
+# [AI-NOTE] WAV header cache keyed by path, mtime and size, so repeated
+# previews (and duration lookups) never reopen an unchanged file.
+class WavInfoCache:
+    def __init__(self):
+        self.entries = {}  # path -> (mtime_ns, size, WavInfo or None if unreadable)
+        self.lock = threading.Lock()
+
+    def get(self, path, stat=None):
+        """WavInfo for path, or None if it is missing or not a readable WAV"""
+        try:
+            stat = stat or os.stat(path)
+        except OSError:
+            return None
+        entry = self.entries.get(path)
+        if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            return entry[2]
+        try:
+            info = read_wav_info(path)
+        except (OSError, EOFError, WavError):
+            info = None
+        with self.lock:
+            self.entries[path] = (stat.st_mtime_ns, stat.st_size, info)
+        return info
+
+    def duration(self, path, stat=None):
+        info = self.get(path, stat)
+        return info.duration if info else None
+
+
+# [AI-NOTE] A WAV file held in memory: the whole file image (bytes, or a
+# read-only mmap for large files) plus where its PCM frames start. Backends
+# play straight from it, so replaying a cached clip never touches the disk.
+class PcmClip:
+    __slots__ = ("path", "info", "data", "offset", "length", "mapped")
+
+    def __init__(self, path, info, data, offset, length, mapped):
+        self.path = path
+        self.info = info  # WavInfo
+        self.data = data  # Whole file image (RIFF header included, for SND_MEMORY)
+        self.offset = offset  # Start of the data chunk
+        self.length = length  # Bytes of PCM frames
+        self.mapped = mapped  # True if data is an mmap rather than bytes
+
+    def frames(self):
+        """Zero-copy view of the raw PCM frames"""
+        return memoryview(self.data)[self.offset:self.offset + self.length]
+
+    @property
+    def nbytes(self):
+        return len(self.data)
+
+
+def parse_wav(buf):
+    """Return (WavInfo, data offset, data length) for an in-memory RIFF/WAVE image"""
+    if len(buf) < 12 or buf[0:4] != b"RIFF" or buf[8:12] != b"WAVE":
+        raise WavError("not a RIFF/WAVE file")
+    fmt = None
+    pos = 12
+    while pos + 8 <= len(buf):
+        chunk_id = bytes(buf[pos:pos + 4])
+        (chunk_size,) = struct.unpack_from("<I", buf, pos + 4)
+        body = pos + 8
+        if chunk_id == b"fmt ":
+            fmt = struct.unpack_from("<HHIIHH", buf, body)
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise WavError("data chunk before fmt chunk")
+            audio_format, channels, rate, _byte_rate, block_align, bits = fmt
+            if audio_format not in (1, 0xFFFE):  # PCM / WAVE_FORMAT_EXTENSIBLE
+                raise WavError(f"unsupported WAV format {audio_format}")
+            length = min(chunk_size, len(buf) - body)
+            length -= length % block_align if block_align else 0
+            info = WavInfo(length // block_align if block_align else 0, rate, channels, (bits + 7) // 8)
+            return info, body, length
+        pos = body + chunk_size + (chunk_size & 1)  # Chunks are word aligned
+    raise WavError("no data chunk")
+
+
+def load_clip(path, mmap_threshold):
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size and size >= mmap_threshold:  # An empty file can't be mapped
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            mapped = True
+        else:
+            data = f.read()
+            mapped = False
+    info, offset, length = parse_wav(data)
+    return PcmClip(path, info, data, offset, length, mapped)
+
+
+# [AI-NOTE] LRU cache of PcmClips under a byte budget, keyed by path, mtime and
+# size. Files at or above mmap_threshold are memory-mapped instead of read,
+# so a long voice line costs address space rather than a copy. Evicted clips
+# are only dereferenced (never closed) because one may still be playing.
+class PcmCache:
+    def __init__(self, max_bytes=64 * 1024 * 1024, mmap_threshold=4 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.mmap_threshold = mmap_threshold
+        self.entries = OrderedDict()  # (path, mtime_ns, size) -> PcmClip, oldest first
+        self.latest = {}  # path -> newest key
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()  # Clips are loaded on the audio thread
+
+    def get(self, path, stat=None):
+        """PcmClip for path; pass stat (e.g. from the asset index) to skip os.stat"""
+        stat = stat or os.stat(path)
+        key = (path, stat.st_mtime_ns, stat.st_size)
+        with self.lock:
+            clip = self.entries.get(key)
+            if clip is not None:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return clip
+            self.misses += 1
+        
+        clip = load_clip(path, self.mmap_threshold)
+        with self.lock:
+            superseded = self.latest.get(path)
+            if superseded is not None and superseded in self.entries:
+                self.total_bytes -= self.entries.pop(superseded).nbytes
+            self.latest[path] = key
+            self.entries[key] = clip
+            self.total_bytes += clip.nbytes
+            while len(self.entries) > 1 and self.total_bytes > self.max_bytes:
+                oldest, old_clip = self.entries.popitem(last=False)
+                self.total_bytes -= old_clip.nbytes
+                if self.latest.get(oldest[0]) == oldest:
+                    del self.latest[oldest[0]]
+                self.evictions += 1
+        return clip
+
+    def stats(self):
+        return {
+            "entries": len(self.entries),
+            "bytes": self.total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+# [AI-NOTE] Waveform peaks for the mini-thumbnails on PLAY_AUDIO rows.
+# The WAV is memory-mapped and at most max_samples frames are looked at
+# (evenly strided), so a 5-minute clip costs the same as a 5-second one.
+# With numpy the per-bucket maxima are one vectorized reduceat; without it
+# memoryview casts keep the loop in C via the max()/min() builtins.
+def compute_peaks(path, buckets, max_samples=1 << 18):
+    """Peak amplitude (0.0-1.0) of each of `buckets` equal slices of the clip"""
+    with open(path, "rb") as f:
+        if not os.fstat(f.fileno()).st_size:
+            return [0.0] * buckets  # Empty file (mmap refuses it): a flat line
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        info, offset, length = parse_wav(data)
+        frames = memoryview(data)[offset:offset + length]
+        try:
+            if NUMPY_AVAILABLE:
+                return peaks_numpy(frames, info, buckets, max_samples)
+            return peaks_stdlib(frames, info, buckets, max_samples)
+        finally:
+            frames.release()
+    finally:
+        data.close()
+
+
+def peaks_numpy(frames, info, buckets, max_samples):
+    import numpy as np
+    channels, width = info.channels, info.sampwidth
+    stride = max(1, info.nframes // max_samples)
+    if width == 3:
+        raw = np.frombuffer(frames, np.uint8).reshape(-1, channels, 3)[::stride]
+        samples = (raw[..., 0].astype(np.int32) | (raw[..., 1].astype(np.int32) << 8)
+                   | (raw[..., 2].astype(np.int8).astype(np.int32) << 16))
+    else:
+        dtype = {1: np.uint8, 2: np.int16, 4: np.int32}[width]
+        samples = np.frombuffer(frames, dtype).reshape(-1, channels)[::stride].astype(np.int64)
+        if width == 1:
+            samples -= 128  # 8-bit WAV is unsigned
+    full_scale = float(1 << (width * 8 - 1))
+    amplitude = np.abs(samples).max(axis=1)
+    if len(amplitude) == 0:
+        return [0.0] * buckets
+    edges = (np.arange(buckets) * len(amplitude)) // buckets
+    peaks = np.maximum.reduceat(amplitude, edges) / full_scale
+    return np.minimum(peaks, 1.0).tolist()
+
+
+def peaks_stdlib(frames, info, buckets, max_samples):
+    # First channel only; for 24-bit just the high byte of each sample
+    channels, width = info.channels, info.sampwidth
+    stride = max(1, info.nframes // max_samples)
+    if width == 3:
+        samples = frames.cast("b")[2::3 * channels * stride]
+        full_scale, bias = 128.0, 0
+    else:
+        samples = frames.cast({1: "B", 2: "h", 4: "i"}[width])[::channels * stride]
+        full_scale, bias = float(1 << (width * 8 - 1)), (128 if width == 1 else 0)
+    count = len(samples)
+    if count == 0:
+        return [0.0] * buckets
+    peaks = []
+    for bucket in range(buckets):
+        segment = samples[bucket * count // buckets:max(bucket * count // buckets + 1, (bucket + 1) * count // buckets)]
+        peak = max(max(segment) - bias, bias - min(segment))
+        peaks.append(min(peak / full_scale, 1.0))
+    return peaks
+
+
+# [AI-NOTE] Peaks per (path, mtime, size, buckets); safe to use from worker threads
+class PeakCache:
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, path, buckets, stat=None):
+        stat = stat or os.stat(path)
+        key = (path, stat.st_mtime_ns, stat.st_size, buckets)
+        with self.lock:
+            peaks = self.entries.get(key)
+            if peaks is not None:
+                self.entries.move_to_end(key)
+                return peaks
+        peaks = compute_peaks(path, buckets)
+        with self.lock:
+            self.entries[key] = peaks
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return peaks
+
+
+# [AI-NOTE] Audio backends. A backend plays one PcmClip synchronously: play()
+# blocks until the clip has finished or stop_event is set (AudioPlayer sets
+# it and then calls stop() from another thread to interrupt the output), and
+# calls on_started() as soon as audio is handed to the output. AudioPlayer
+# runs it on a worker thread, so backends stay simple.
+class AudioBackend(ABC):
+    name = "none"
+    available = False
+
+    @abstractmethod
+    def play(self, clip, on_started, stop_event):
+        """Play clip to the end or until stop_event is set"""
+
+    def stop(self):
+        pass
+
+
+class WinsoundBackend(AudioBackend):
+    name = "winsound"
+    available = WINSOUND_AVAILABLE
+
+    def play(self, clip, on_started, stop_event):
+        if stop_event.is_set():
+            return
+        on_started()
+        # Plays the cached file image; returns when the clip really ends, or when
+        # stop() plays a NULL sound (SND_MEMORY can't be combined with SND_ASYNC)
+        import winsound
+        winsound.PlaySound(clip.data, winsound.SND_MEMORY | winsound.SND_NODEFAULT)
+
+    def stop(self):
+        import winsound
+        winsound.PlaySound(None, 0)
+
+
+# [AI-NOTE] Streams raw PCM frames to a local sink process (aplay from
+# ALSA, or pacat/paplay for PulseAudio and PipeWire). The clip ends when
+# the sink exits after draining stdin; stop() kills the sink immediately.
+class PipeBackend(AudioBackend):
+    name = "pipe"
+    CHUNK_FRAMES = 2048
+    # sample width in bytes -> (aplay format, pacat format)
+    FORMATS = {1: ("U8", "u8"), 2: ("S16_LE", "s16le"), 3: ("S24_3LE", "s24le"), 4: ("S32_LE", "s32le")}
+
+    def __init__(self, sink=None):
+        self.sink = sink or self.find_sink()  # Player binary, found when the backend is built
+        self.available = self.sink is not None
+        self.lock = threading.Lock()
+        self.current = None  # Popen of the sink for the clip being played
+
+    @staticmethod
+    def find_sink():
+        for program in ("pacat", "paplay", "aplay"):
+            path = shutil.which(program)
+            if path:
+                return path
+        return None
+
+    def sink_command(self, rate, channels, sampwidth):
+        aplay_format, pulse_format = self.FORMATS[sampwidth]
+        if os.path.basename(self.sink).startswith("aplay"):
+            return [self.sink, "-q", "-t", "raw", "-f", aplay_format, "-r", str(rate), "-c", str(channels), "-"]
+        return [self.sink, "--raw", f"--format={pulse_format}", f"--rate={rate}", f"--channels={channels}"]
+
+    def play(self, clip, on_started, stop_event):
+        info = clip.info
+        if info.sampwidth not in self.FORMATS:
+            raise ValueError(f"Unsupported sample width: {info.sampwidth * 8} bits")
+        proc = subprocess.Popen(
+            self.sink_command(info.rate, info.channels, info.sampwidth),
+            stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        with self.lock:
+            self.current = proc
+        frames = clip.frames()
+        chunk = self.CHUNK_FRAMES * info.channels * info.sampwidth
+        try:
+            for start in range(0, len(frames), chunk):
+                if stop_event.is_set():
+                    break
+                proc.stdin.write(frames[start:start + chunk])
+                if start == 0:
+                    proc.stdin.flush()
+                    on_started()
+            if not stop_event.is_set():
+                proc.stdin.close()  # Sink plays out its buffer and exits
+                proc.wait()
+        except (BrokenPipeError, OSError):
+            if not stop_event.is_set():
+                raise
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            with self.lock:
+                if self.current is proc:
+                    self.current = None
+
+    def stop(self):
+        with self.lock:
+            proc = self.current
+        if proc and proc.poll() is None:
+            proc.kill()
+
+
+# [AI-NOTE] Sink that plays nothing but records what it was asked to play.
+# A clip "lasts" its real duration times `speed` (0 = ends immediately), so
+# tests and profiling runs can exercise the preview path without hardware.
+class NullBackend(AudioBackend):
+    name = "null"
+    available = True
+
+    def __init__(self, speed=0.0):
+        self.speed = speed
+        self.played = []  # Paths in the order they were played
+
+    def play(self, clip, on_started, stop_event):
+        self.played.append(clip.path)
+        on_started()
+        stop_event.wait(clip.info.duration * self.speed)
+
+
+BACKENDS = {
+    "winsound": WinsoundBackend,
+    "pipe": PipeBackend,
+    "null": NullBackend,
+}
+
+
+def get_audio_backend(name=None):
+    """Backend from PAIPAL_AUDIO_BACKEND if set, otherwise the platform default"""
+    name = name or os.environ.get("PAIPAL_AUDIO_BACKEND")
+    if name:
+        return BACKENDS[name]()
+    if sys.platform == "win32":
+        return WinsoundBackend()
+    return PipeBackend()
+
+
+# [AI-NOTE] Plays one clip at a time on a worker thread. The backend call
+# returns when the clip really ends (or is stopped), so on_done fires at the
+# actual end of playback with no polling. Each play() gets a generation
+# number; stop() and newer plays bump it, so a clip that was interrupted
+# never reports completion.
+#
+# last_start_latency: seconds from play() until the backend started output
+# last_stop_latency: seconds from stop() until the backend call returned
+class AudioPlayer:
+    def __init__(self, backend=None, pcm_cache=None):
+        self.backend = backend or get_audio_backend()
+        self.pcm_cache = pcm_cache or PcmCache()
+        self.lock = threading.Lock()
+        self.generation = 0
+        self.stop_event = threading.Event()  # Set to interrupt the current clip
+        self.stopped_generation = None
+        self.stop_time = None
+        self.last_start_latency = None
+        self.last_stop_latency = None
+
+    @property
+    def available(self):
+        return self.backend.available
+
+    def play(self, path, on_done, stat=None):
+        """Start path; on_done(error) runs on the worker thread when it finishes.
+        
+        error is None for a clip that played to the end, or the exception
+        that stopped it from playing. The clip comes from the PCM cache, so
+        with stat supplied a replay doesn't touch the disk at all.
+        """
+        self.stop()
+        with self.lock:
+            self.generation += 1
+            generation = self.generation
+            self.stop_event = stop_event = threading.Event()
+        requested = time.perf_counter()
+        thread = threading.Thread(target=self.run, args=(path, stat, generation, stop_event, requested, on_done),
+                                  name="audio-preview", daemon=True)
+        thread.start()
+
+    def run(self, path, stat, generation, stop_event, requested, on_done):
+        def on_started():
+            self.last_start_latency = time.perf_counter() - requested
+        
+        error = None
+        try:
+            clip = self.pcm_cache.get(path, stat)
+            self.backend.play(clip, on_started, stop_event)
+        except Exception as e:
+            error = e
+        with self.lock:
+            current = generation == self.generation
+            if generation == self.stopped_generation:
+                self.last_stop_latency = time.perf_counter() - self.stop_time
+        if current:
+            on_done(error)
+
+    def stop(self):
+        """Stop the current clip without reporting completion"""
+        with self.lock:
+            self.stopped_generation = self.generation
+            self.stop_time = time.perf_counter()
+            self.generation += 1
+            self.stop_event.set()
+        self.backend.stop()
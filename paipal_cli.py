@@ -0,0 +1,130 @@
+# [AI-NOTE] Headless entry point for PAIpal maintenance tasks.
+# Never imports tkinter, so it runs on build machines without a display.
+#
+#   python paipal_cli.py prewarm [--folder DIR] [--height N] [--workers N]
+#   python paipal_cli.py validate [--folder DIR] [--workers N]
+#   python paipal_cli.py normalize [--folder DIR] [--workers N]
+#   python paipal_cli.py xref [--base DIR] [--workers N] [--watch]
+#   python paipal_cli.py timing [--base DIR] [--folder DIR] [--min-gap MS] [--workers N]
+#   python paipal_cli.py atlas [--base DIR] [--out DIR] [--max-size N] [--padding N] [--workers N] [--force]
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+
+def cmd_prewarm(args):
+    from paipal_thumbs import prewarm
+    summary = prewarm(args.folder, height=args.height, workers=args.workers)
+    print(json.dumps(summary, indent=2))
+    return 1 if summary["failed"] else 0
+
+
+def cmd_check(args):
+    from paipal_commands import check_tree
+    from paipal_paths import get_base_path
+    folder = args.folder or os.path.join(get_base_path(), "animations")
+    summary = check_tree(folder, fix=args.command == "normalize", workers=args.workers)
+    print(json.dumps(summary, indent=2))
+    if args.command == "normalize":
+        for result in summary["problems"]:
+            if result["errors"]:
+                print(f"not normalized, {len(result['errors'])} line(s) need fixing by hand: {result['path']}",
+                      file=sys.stderr)
+    return 1 if summary["invalid"] else 0
+
+
+def cmd_xref(args):
+    from paipal_refs import VOICE_FOLDER, build_report
+    graph, report = build_report(args.base, workers=args.workers)
+    print(json.dumps(report, indent=2))
+    if not args.watch:
+        return 1 if report["broken"] else 0
+
+    # Keep the graph current from file events and print one line per batch
+    from paipal_assets import AssetWatcher
+    folders = {folder: graph.assets.folder_path(folder) for folder in (*graph.assets.folders, VOICE_FOLDER)}
+
+    def on_changes(changes):
+        start = time.perf_counter()
+        graph.apply_changes(changes)
+        report = graph.report()
+        report["seconds"] = round(time.perf_counter() - start, 3)
+        print(json.dumps(report), flush=True)
+
+    watcher = AssetWatcher(folders, on_changes)
+    watcher.start()
+    try:
+        while watcher.thread.is_alive():
+            watcher.thread.join(1.0)
+    except KeyboardInterrupt:
+        watcher.stop()
+    return 0
+
+
+def cmd_timing(args):
+    from paipal_timing import analyze_tree
+    summary = analyze_tree(args.base, args.folder, min_gap_ms=args.min_gap, workers=args.workers)
+    print(json.dumps(summary, indent=2))
+    return 1 if summary["with_overlaps"] or summary["with_missing_audio"] else 0
+
+
+def cmd_atlas(args):
+    from paipal_atlas import build_atlases
+    summary = build_atlases(args.base, args.out, max_size=args.max_size, padding=args.padding,
+                            workers=args.workers, force=args.force)
+    print(json.dumps(summary, indent=2))
+    return 1 if summary["failed"] else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="paipal_cli", description="Headless PAIpal tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("prewarm", help="build the thumbnail cache for an animations folder")
+    p.add_argument("--folder", help="image folder (default: animations/ next to PAIpal)")
+    p.add_argument("--height", type=int, default=20, help="thumbnail height in pixels (default: 20)")
+    p.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    p.set_defaults(func=cmd_prewarm)
+
+    p = sub.add_parser("xref", help="report broken asset references and unused assets")
+    p.add_argument("--base", help="PAIpal folder holding animations/, audio/, custom-commands/ (default: next to PAIpal)")
+    p.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    p.add_argument("--watch", action="store_true", help="keep running and report again whenever files change")
+    p.set_defaults(func=cmd_xref)
+
+    p = sub.add_parser("timing", help="report runtime, silent gaps and overlapping audio per script")
+    p.add_argument("--base", help="PAIpal folder holding animations/ and audio/ (default: next to PAIpal)")
+    p.add_argument("--folder", help="folder to scan recursively (default: animations/ in the base folder)")
+    p.add_argument("--min-gap", type=int, default=100, help="shortest silence between clips to report, in ms (default: 100)")
+    p.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    p.set_defaults(func=cmd_timing)
+
+    p = sub.add_parser("atlas", help="pack the frames animation scripts SHOW into sprite atlases")
+    p.add_argument("--base", help="PAIpal folder holding animations/ (default: next to PAIpal)")
+    p.add_argument("--out", help="output folder (default: atlases/ in the base folder)")
+    p.add_argument("--max-size", type=int, default=2048, help="atlas page edge in pixels (default: 2048)")
+    p.add_argument("--padding", type=int, default=1, help="transparent pixels between frames (default: 1)")
+    p.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    p.add_argument("--force", action="store_true", help="repack every atlas even if its frames are unchanged")
+    p.set_defaults(func=cmd_atlas)
+
+    for name, help_text in (("validate", "check every command file under a folder"),
+                            ("normalize", "rewrite command files using the editor's rules")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("--folder", help="folder to scan recursively (default: animations/ next to PAIpal)")
+        p.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+        p.set_defaults(func=cmd_check)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,234 @@
+# [AI-NOTE] Parsed command model shared by the editor and the headless tools.
+# An animation file is parsed once into Command records (opcode + argument);
+# rows, validation and batch tooling work on those instead of re-splitting
+# the text. Kept free of tkinter so paipal_cli.py and worker processes can
+# import it.
+import os
+import sys
+import time
+from enum import IntEnum
+
+from paipal_storage import atomic_write
+
+
+class Op(IntEnum):
+    BLANK = 0  # Empty line, only used to organize the file
+    HIDE_ALL = 1
+    SHOW = 2
+    HIDE = 3
+    WAIT = 4
+    PLAY_AUDIO = 5
+    OPEN_URL = 6
+    RAW = 7  # Line that is not a well-formed command; kept verbatim
+
+
+class Command:
+    """One line of an animation file. Treat as immutable: parse_lines shares
+    instances between identical lines."""
+    __slots__ = ("op", "arg", "text")
+
+    def __init__(self, op, arg="", text=None):
+        self.op = op
+        self.arg = arg  # Command argument, or the whole line for Op.RAW
+        self.text = text  # Line as read when it has stray spacing, so it saves unchanged
+
+    def __eq__(self, other):
+        return (isinstance(other, Command) and self.op == other.op and self.arg == other.arg
+                and self.text == other.text)
+
+    def __hash__(self):
+        return hash((self.op, self.arg, self.text))
+
+    def __repr__(self):
+        return f"Command({self.op.name}, {self.arg!r})"
+
+    def __str__(self):
+        return serialize(self)
+
+
+# Keyword -> (opcode, takes an argument); the single table parse/serialize use
+KEYWORDS = {
+    "HIDE_ALL": (Op.HIDE_ALL, False),
+    "SHOW": (Op.SHOW, True),
+    "HIDE": (Op.HIDE, True),
+    "WAIT": (Op.WAIT, True),
+    "PLAY_AUDIO": (Op.PLAY_AUDIO, True),
+    "OPEN_URL": (Op.OPEN_URL, True),
+}
+NAMES = {op: name for name, (op, _) in KEYWORDS.items()}
+
+BLANK = Command(Op.BLANK)
+
+
+def parse(line):
+    """Parse one line into a Command; serialize() gives back the same text"""
+    line = line.rstrip("\r\n")
+    if not line:
+        return BLANK
+    keyword, space, arg = line.partition(" ")
+    spec = KEYWORDS.get(keyword)
+    if spec is not None:
+        op, takes_arg = spec
+        value = arg.strip()  # "SHOW idle " still shows idle
+        if not takes_arg and not value:
+            return Command(op, "", line if space else None)
+        if takes_arg and value:
+            # WAIT 100 / SHOW idle repeat a lot
+            return Command(op, sys.intern(value), line if value != arg else None)
+    return Command(Op.RAW, line)
+
+
+def parse_lines(text):
+    """Parse file contents; identical lines share one Command"""
+    if not text:
+        return []
+    seen = {}
+    commands = []
+    for line in text.split("\n"):
+        command = seen.get(line)
+        if command is None:
+            command = seen[line] = parse(line)
+        commands.append(command)
+    return commands
+
+
+def serialize(command):
+    if command.text is not None:
+        return command.text
+    if command.op == Op.BLANK:
+        return ""
+    if command.op == Op.RAW:
+        return command.arg
+    if command.arg:
+        return f"{NAMES[command.op]} {command.arg}"
+    return NAMES[command.op]
+
+
+def format_lines(commands):
+    return "\n".join(serialize(command) for command in commands)
+
+
+def normalize(op, value=""):
+    """Build a Command from user input, applying the editor's rules.
+
+    Raises ValueError with a user-facing message if the value is not valid
+    for op.
+    """
+    value = value.strip()
+    if op in (Op.BLANK, Op.HIDE_ALL):
+        return BLANK if op == Op.BLANK else Command(op)
+    if op == Op.WAIT:
+        if not value.isdigit():
+            raise ValueError("WAIT requires an integer value.")
+    elif op == Op.OPEN_URL:
+        if not value:
+            raise ValueError("URL cannot be empty.")
+    elif op == Op.PLAY_AUDIO:
+        if not value:
+            raise ValueError("Filename cannot be empty.")
+        if not value.lower().endswith(".wav"):
+            value += ".wav"
+        if not value.startswith("audio/"):
+            value = f"audio/{value}"
+    elif op in (Op.SHOW, Op.HIDE):
+        # Values are frame names, with or without the .png extension
+        if value.lower().endswith(".png"):
+            value = value[:-4]
+        if not value:
+            raise ValueError("Frame name cannot be empty.")
+    else:
+        raise ValueError(f"Cannot build a {op.name} command.")
+    return Command(op, sys.intern(value))
+
+
+def normalize_command(command):
+    """Canonical form of a parsed command; raises ValueError if it cannot be repaired"""
+    if command.op == Op.BLANK:
+        return command
+    if command.op == Op.RAW:
+        # Salvage stray spacing such as " SHOW idle" (parse already reads "SHOW idle ")
+        keyword, _, value = command.arg.strip().partition(" ")
+        spec = KEYWORDS.get(keyword)
+        if spec is None:
+            raise ValueError(f"Unknown command {keyword!r}.")
+        op, takes_arg = spec
+        if not takes_arg and value.strip():
+            raise ValueError(f"{keyword} takes no value.")
+        return normalize(op, value)
+    return normalize(command.op, command.arg)
+
+
+# [AI-NOTE] Batch checking of animation files for paipal_cli validate/normalize.
+# Each worker process parses whole files and sends back only the problems,
+# so the parent stays cheap even for trees with tens of thousands of files.
+def check_file(args):
+    """Worker: validate one file and optionally rewrite it in normalized form"""
+    path, fix = args
+    result = {"path": path, "errors": [], "changes": 0, "written": False}
+    try:
+        with open(path, "r") as f:
+            text = f.read()
+        fixed = []
+        for number, command in enumerate(parse_lines(text), 1):
+            try:
+                canonical = normalize_command(command)
+            except ValueError as e:
+                result["errors"].append({"line": number, "text": serialize(command), "error": str(e)})
+                canonical = command
+            if canonical != command:
+                result["changes"] += 1
+            fixed.append(canonical)
+        if fix and result["changes"] and not result["errors"]:
+            # A partly fixed file would still fail validate, so leave it as it was
+            result["written"] = atomic_write(path, format_lines(fixed))
+    except (OSError, UnicodeDecodeError) as e:
+        result["errors"].append({"line": None, "text": None, "error": str(e)})
+    return result
+
+
+def find_command_files(folder):
+    """Every .txt file under folder"""
+    paths = []
+    for directory, _, names in os.walk(folder):
+        paths.extend(os.path.join(directory, name) for name in names if name.lower().endswith(".txt"))
+    return paths
+
+
+def check_tree(folder, fix=False, workers=None):
+    """Validate (and with fix=True normalize) every command file under folder"""
+    from concurrent.futures import ProcessPoolExecutor  # multiprocessing is slow to import; the editor never needs it
+    start = time.perf_counter()
+    jobs = [(path, fix) for path in find_command_files(folder)]
+    summary = {"files": len(jobs), "ok": 0, "invalid": 0, "normalizable": 0, "normalized": 0, "problems": []}
+    if jobs:
+        chunksize = max(1, len(jobs) // ((workers or os.cpu_count() or 1) * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for result in pool.map(check_file, jobs, chunksize=chunksize):
+                if result["errors"]:
+                    summary["invalid"] += 1
+                elif not result["changes"]:
+                    summary["ok"] += 1
+                if result["written"]:
+                    summary["normalized"] += 1
+                elif result["changes"]:
+                    summary["normalizable"] += 1
+                if result["errors"] or result["changes"]:
+                    summary["problems"].append(result)
+    summary["seconds"] = round(time.perf_counter() - start, 3)
+    return summary
+
+
+# [AI-NOTE] Voice command lines: "text (filename.txt)"
+def parse_voice_line(line):
+    """(text, filename) for a line of commands.txt, or None for a blank line"""
+    line = line.strip()
+    if not line:
+        return None
+    if "(" in line and line.endswith(")"):
+        last_paren = line.rfind("(")
+        return (line[:last_paren].strip(), line[last_paren + 1:-1].strip())
+    return (line, "")  # Malformed line, keep it with an empty filename
+
+
+def format_voice_line(text, filename):
+    return f"{text} ({filename})"
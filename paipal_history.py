@@ -0,0 +1,134 @@
+# [AI-NOTE] Undo/redo for the editor lists as a log of small operations.
+# Each entry records one insert, delete, move or edit (index plus the item(s)
+# involved) instead of a copy of the list, so undoing costs the same as the
+# original edit. Edits to the same row in quick succession are merged, so a
+# typed phrase undoes as one step. The log is capped by an estimated byte
+# size and drops its oldest entries first. Kept free of tkinter.
+import itertools
+import sys
+import time
+from collections import deque
+
+INSERT = "insert"
+DELETE = "delete"
+MOVE = "move"
+EDIT = "edit"
+
+# Shared across histories so the editor can undo whichever list changed last
+_sequence = itertools.count(1)
+
+
+def estimate_size(item):
+    """Rough bytes held by one list item (tuples count their parts)"""
+    size = sys.getsizeof(item)
+    if isinstance(item, tuple):
+        size += sum(sys.getsizeof(part) for part in item)
+    return size
+
+
+class Operation:
+    __slots__ = ("kind", "index", "target", "old", "new", "seq", "stamp", "size")
+
+    def __init__(self, kind, index, target=None, old=None, new=None):
+        self.kind = kind
+        self.index = index  # Position the operation applies to (source for MOVE)
+        self.target = target  # Destination for MOVE
+        self.old = old  # Item removed or replaced
+        self.new = new  # Item inserted or written
+        self.seq = next(_sequence)
+        self.stamp = time.monotonic()
+        self.size = 0
+
+    def __repr__(self):
+        return f"Operation({self.kind}, {self.index}, {self.target}, {self.old!r}, {self.new!r})"
+
+
+class EditHistory:
+    OVERHEAD = 120  # Operation object plus deque slot
+
+    def __init__(self, max_bytes=2 * 1024 * 1024, merge_window=1.0):
+        self.max_bytes = max_bytes
+        self.merge_window = merge_window  # Seconds between keystrokes that still merge
+        self.undo_stack = deque()
+        self.redo_stack = []
+        self.total_bytes = 0
+
+    def measure(self, op):
+        op.size = self.OVERHEAD
+        for item in (op.old, op.new):
+            if item is not None:
+                op.size += estimate_size(item)
+        return op.size
+
+    def record(self, kind, index, target=None, old=None, new=None, merge=False):
+        """Log an operation the list has just performed"""
+        top = self.undo_stack[-1] if self.undo_stack else None
+        if (merge and kind == EDIT and top is not None and top.kind == EDIT and top.index == index
+                and not self.redo_stack and time.monotonic() - top.stamp <= self.merge_window):
+            # Another keystroke on the same row: keep the original old value
+            self.total_bytes -= top.size
+            if new == top.old:
+                # Typed back to where it started, so there is nothing to undo
+                self.undo_stack.pop()
+                return
+            top.new = new
+            top.stamp = time.monotonic()
+            self.total_bytes += self.measure(top)
+            return
+        if kind == EDIT and old == new:
+            return  # An undo step that changes nothing would look like a dead Ctrl+Z
+
+        for dropped in self.redo_stack:
+            self.total_bytes -= dropped.size
+        self.redo_stack.clear()
+        op = Operation(kind, index, target, old, new)
+        self.total_bytes += self.measure(op)
+        self.undo_stack.append(op)
+        while self.total_bytes > self.max_bytes and len(self.undo_stack) > 1:
+            self.total_bytes -= self.undo_stack.popleft().size
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.total_bytes = 0
+
+    def last_seq(self, stack):
+        return stack[-1].seq if stack else 0
+
+    def undo(self, target):
+        """Revert the newest operation on target; returns False if there is none"""
+        if not self.undo_stack:
+            return False
+        op = self.undo_stack.pop()
+        self.redo_stack.append(op)
+        self.apply(op, target, reverse=True)
+        return True
+
+    def redo(self, target):
+        if not self.redo_stack:
+            return False
+        op = self.redo_stack.pop()
+        self.undo_stack.append(op)
+        self.apply(op, target, reverse=False)
+        return True
+
+    @staticmethod
+    def apply(op, target, reverse):
+        """Replay op (or its inverse) through the list's non-recording edit methods"""
+        if op.kind == INSERT:
+            if reverse:
+                target.remove_item(op.index, record=False)
+            else:
+                target.insert_item(op.index, op.new, record=False)
+        elif op.kind == DELETE:
+            if reverse:
+                target.insert_item(op.index, op.old, record=False)
+            else:
+                target.remove_item(op.index, record=False)
+        elif op.kind == MOVE:
+            if reverse:
+                target.move_item(op.target, op.index, record=False)
+            else:
+                target.move_item(op.index, op.target, record=False)
+        elif op.kind == EDIT:
+            target.replace_item(op.index, op.old if reverse else op.new, record=False)
@@ -0,0 +1,179 @@
+# [AI-NOTE] Append-only edit journal for crash recovery and session resume.
+# Every list edit appends one small JSON line ({"op": "insert", "buf": ...});
+# fsync happens in batches (the editor calls sync() a moment after a burst of
+# edits), so an edit never waits for the disk. A buffer opened from disk is
+# recorded by path and content hash only; replay re-reads the file and applies
+# the logged edits on top, and drops the buffer if the file changed meanwhile.
+# compact() rewrites the log as one snapshot of the current state, keeping it
+# (and replay) short no matter how long the session ran. A torn last line from
+# a crash is ignored. Kept free of tkinter.
+import json
+import os
+
+from paipal_history import DELETE, EDIT, INSERT, MOVE
+from paipal_paths import get_cache_dir
+from paipal_storage import atomic_write
+
+JOURNAL_VERSION = 1
+
+
+class Buffer:
+    """Replayed state of one editor list"""
+    __slots__ = ("path", "digest", "items", "dirty", "exact", "scroll")
+
+    def __init__(self, path=None, digest=None, items=None, dirty=False, exact=True, scroll=0.0):
+        self.path = path  # File the buffer was opened from or saved to, None for a new file
+        self.digest = digest  # content_digest of that file when it was opened or saved
+        self.items = items  # Journal-encoded items, None if they could not be recovered
+        self.dirty = dirty  # Edited since it was opened or saved
+        self.exact = exact  # Re-reading path gives back items (False if saving dropped lines)
+        self.scroll = scroll  # First visible fraction of the list
+
+    @property
+    def stored(self):
+        """Whether the journal has to keep the items because the file can't reproduce them"""
+        return self.dirty or not self.exact or not self.path
+
+    def record(self, name, items=None):
+        """The "open" line for this buffer; items are included when given"""
+        record = {"op": "open", "buf": name, "path": self.path, "digest": self.digest,
+                  "dirty": self.dirty, "exact": self.exact, "scroll": self.scroll}
+        if items is not None:
+            record["items"] = items
+        return record
+
+
+class EditJournal:
+    COMPACT_RECORDS = 5000  # Appends after which the owner should call compact()
+
+    def __init__(self, path=None):
+        self.path = path or get_cache_dir("session.jsonl")
+        self.file = None  # Append handle, opened by compact()
+        self.records = 0  # Lines in the journal file
+        self.unsynced = 0  # Lines written since the last fsync
+
+    @property
+    def needs_compaction(self):
+        return self.records >= self.COMPACT_RECORDS
+
+    def replay(self, load):
+        """({name: Buffer}, session) rebuilt from the journal on disk.
+
+        load(name, path, digest) returns a file's journal-encoded items as it
+        was opened, or None if its content no longer matches digest.
+        session holds the last "session" record (screen and panels).
+        """
+        buffers = {}
+        session = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                lines = f.read().split("\n")
+        except (OSError, UnicodeDecodeError):
+            return buffers, session
+        for line in lines:
+            try:
+                record = json.loads(line)
+                op = record["op"]
+            except (ValueError, TypeError, KeyError):
+                continue  # Blank or torn line
+            if op == "version":
+                if record.get("version") != JOURNAL_VERSION:
+                    return {}, {}
+            elif op == "session":
+                session = record
+            elif op == "open":
+                items = record.get("items")
+                if items is None and record.get("path"):
+                    items = load(record["buf"], record["path"], record.get("digest"))
+                buffers[record["buf"]] = Buffer(record.get("path"), record.get("digest"), items,
+                                                record.get("dirty", False), record.get("exact", True),
+                                                record.get("scroll", 0.0))
+            else:
+                buffer = buffers.get(record.get("buf"))
+                if buffer is None:
+                    continue
+                if buffer.items is None and op == "saved" and record.get("exact", True):
+                    # The file as saved is a new base, even if the one it was opened from is gone
+                    buffer.items = load(record["buf"], record.get("path"), record.get("digest"))
+                if buffer.items is None:
+                    continue  # Edits to a buffer that could not be recovered
+                self.apply(buffer, op, record)
+        return buffers, session
+
+    @staticmethod
+    def apply(buffer, op, record):
+        items = buffer.items
+        try:
+            if op == INSERT:
+                items.insert(record["i"], record["item"])
+            elif op == DELETE:
+                items.pop(record["i"])
+            elif op == MOVE:
+                items.insert(record["j"], items.pop(record["i"]))
+            elif op == EDIT:
+                items[record["i"]] = record["item"]
+            elif op == "saved":
+                buffer.path = record["path"]
+                buffer.digest = record["digest"]
+                buffer.dirty = False
+                buffer.exact = record.get("exact", True)
+                return
+            elif op == "scroll":
+                buffer.scroll = record["y"]
+                return
+            else:
+                return
+        except (IndexError, KeyError, TypeError):
+            buffer.items = None  # The log no longer fits this buffer; don't guess
+            return
+        buffer.dirty = True
+
+    def append(self, record):
+        """Log one record; it reaches the disk at the next sync()"""
+        if self.file is None:
+            return
+        try:
+            self.file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        except (OSError, ValueError):
+            self.close()  # Journaling is best-effort; editing carries on without it
+            return
+        self.records += 1
+        self.unsynced += 1
+
+    def sync(self):
+        if self.file is None or not self.unsynced:
+            return
+        try:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.unsynced = 0
+        except (OSError, ValueError):
+            self.close()
+
+    def compact(self, buffers, session):
+        """Replace the journal with a snapshot: items are stored only for buffers
+        that can't be re-read from disk (edited or never saved)"""
+        self.close()
+        lines = [{"op": "version", "version": JOURNAL_VERSION}, dict(session, op="session")]
+        for name, buffer in buffers.items():
+            lines.append(buffer.record(name, buffer.items if buffer.stored else None))
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            atomic_write(self.path, "".join(json.dumps(line, separators=(",", ":")) + "\n" for line in lines),
+                         skip_unchanged=False)
+            self.file = open(self.path, "a", encoding="utf-8")
+        except OSError:
+            self.file = None
+            return
+        self.records = len(lines)
+        self.unsynced = 0
+
+    def close(self):
+        if self.file is not None:
+            try:
+                self.file.flush()
+                os.fsync(self.file.fileno())
+                self.file.close()
+            except (OSError, ValueError):
+                pass
+            self.file = None
@@ -0,0 +1,20 @@
+# [AI-NOTE] Path helpers shared by the GUI and the headless tools.
+# Kept free of tkinter so paipal_cli.py and worker processes can import it.
+import os
+import sys
+
+# [AI-NOTE] Helper to get executable path for browse dialogs and working directories
+def get_base_path():
+    if getattr(sys, 'frozen', False):
+        return os.path.dirname(sys.executable)  # Folder where .exe is placed
+    return os.path.dirname(os.path.abspath(__file__))
+
+# [AI-NOTE] Helper to get bundled resource path (for icon, etc.)
+def get_resource_path():
+    if getattr(sys, 'frozen', False):
+        return sys._MEIPASS  # PyInstaller temp folder for bundled files
+    return os.path.dirname(os.path.abspath(__file__))
+
+# [AI-NOTE] Hidden folder next to the app for rebuildable caches (safe to delete)
+def get_cache_dir(*parts):
+    return os.path.join(get_base_path(), ".paipal-cache", *parts)
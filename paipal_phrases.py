@@ -0,0 +1,108 @@
+# [AI-NOTE] Index over voice command phrases for spotting lines that clash.
+# Phrases are compared as lower-cased word tuples. A hash map from phrase to
+# target files finds duplicates and conflicting targets, and a word trie
+# finds phrases that start with another whole phrase (the shorter one is
+# heard first). Every check walks only the words of one phrase, so it costs
+# the same for 100 lines as for 100,000. Kept free of tkinter.
+import os
+
+
+def phrase_key(text):
+    return tuple(text.lower().split())
+
+
+def file_key(filename):
+    return os.path.normcase(filename.strip())
+
+
+class TrieNode:
+    __slots__ = ("children", "ends", "passing")
+
+    def __init__(self):
+        self.children = {}  # word -> TrieNode
+        self.ends = 0  # Lines whose phrase ends here
+        self.passing = 0  # Lines whose phrase ends here or further down
+
+
+class PhraseIndex:
+    def __init__(self, entries=()):
+        self.targets = {}  # phrase key -> {file key: number of lines}
+        self.root = TrieNode()
+        self.count = 0  # Indexed lines (blank phrases excluded)
+        for text, filename in entries:
+            self.add(text, filename)
+
+    def add(self, text, filename):
+        words = phrase_key(text)
+        if not words:
+            return  # Blank phrases are not matched against anything
+        self.count += 1
+        files = self.targets.setdefault(words, {})
+        target = file_key(filename)
+        files[target] = files.get(target, 0) + 1
+        node = self.root
+        for word in words:
+            node = node.children.setdefault(word, TrieNode())
+            node.passing += 1
+        node.ends += 1
+
+    def remove(self, text, filename):
+        words = phrase_key(text)
+        files = self.targets.get(words)
+        target = file_key(filename)
+        if not words or not files or target not in files:
+            return
+        self.count -= 1
+        files[target] -= 1
+        if not files[target]:
+            del files[target]
+            if not files:
+                del self.targets[words]
+        node = self.root
+        for word in words:
+            child = node.children[word]
+            child.passing -= 1
+            if not child.passing:
+                del node.children[word]  # Prune the now-empty branch
+                return
+            node = child
+        node.ends -= 1
+
+    def replace(self, old, new):
+        """Swap one (text, filename) line for its edited version"""
+        if old != new:
+            self.remove(*old)
+            self.add(*new)
+
+    def issues(self, text, filename):
+        """[(kind, message)] for a line that is already in the index.
+
+        kind is "duplicate", "conflict", "shadowed" (a shorter phrase is a
+        prefix of this one) or "shadows" (this phrase is a prefix of others).
+        """
+        words = phrase_key(text)
+        files = self.targets.get(words)
+        if not files:
+            return []
+        found = []
+        if files.get(file_key(filename), 0) > 1:
+            found.append(("duplicate", "The same phrase and file appear on another line."))
+        if len(files) > 1:
+            others = sorted(name for name in files if name != file_key(filename))
+            found.append(("conflict", f"This phrase also runs {', '.join(others)}."))
+        node = self.root
+        shadowed_by = None
+        for depth, word in enumerate(words[:-1], 1):
+            node = node.children[word]
+            if node.ends and shadowed_by is None:
+                shadowed_by = " ".join(words[:depth])
+        if shadowed_by is not None:
+            found.append(("shadowed", f"The shorter phrase \"{shadowed_by}\" matches first."))
+        node = node.children[words[-1]]
+        longer = node.passing - node.ends
+        if longer:
+            found.append(("shadows", f"Starts {longer} longer phrase(s), which it may cut off."))
+        return found
+
+    def __len__(self):
+        return self.count
@@ -0,0 +1,120 @@
+# [AI-NOTE] Timeline and scheduler for the editor's animation preview.
+# A script is flattened into steps with absolute start times (WAITs only move
+# the clock forward). DeadlineScheduler fires each step against its deadline
+# measured from the start of playback rather than chaining after(WAIT) calls,
+# so a late timer callback delays one step instead of every step after it.
+# It wakes a couple of milliseconds early and finishes with short polls,
+# which keeps steps within a few ms of their deadline on Tk's ms timers.
+# Kept free of tkinter: after/cancel are passed in (root.after/after_cancel).
+import time
+
+from paipal_commands import Op
+
+# Opcodes the player acts on; BLANK/RAW lines take no time and do nothing
+PLAYED_OPS = (Op.HIDE_ALL, Op.SHOW, Op.HIDE, Op.PLAY_AUDIO, Op.OPEN_URL)
+
+
+class Step:
+    __slots__ = ("at_ms", "index", "command")
+
+    def __init__(self, at_ms, index, command):
+        self.at_ms = at_ms  # Start time from the beginning of the script
+        self.index = index  # Line in the command list
+        self.command = command
+
+
+def build_timeline(commands):
+    """([Step], duration_ms) for a command list"""
+    steps = []
+    at_ms = 0
+    for index, command in enumerate(commands):
+        if command.op == Op.WAIT:
+            try:
+                at_ms += max(0, int(command.arg))
+            except ValueError:
+                pass  # Malformed WAIT; validate reports it
+        elif command.op in PLAYED_OPS:
+            steps.append(Step(at_ms, index, command))
+    return steps, at_ms
+
+
+class DeadlineScheduler:
+    EARLY = 0.002  # Seconds to wake before a deadline, then poll up to it
+
+    def __init__(self, after, cancel, clock=time.perf_counter):
+        self.after = after  # after(ms, callback) -> timer id
+        self.cancel = cancel  # cancel(timer id)
+        self.clock = clock
+        self.timer = None
+        self.steps = []
+        self.duration_ms = 0
+        self.position = 0  # Next step to fire
+        self.start_time = None
+        self.on_step = None
+        self.on_finish = None
+        self.late_max = 0.0  # Worst lateness of a fired step, in seconds
+        self.late_total = 0.0
+        self.fired = 0
+
+    @property
+    def running(self):
+        return self.start_time is not None
+
+    def start(self, steps, duration_ms, on_step, on_finish=None):
+        """Fire on_step(step) at each step's time; on_finish() once duration_ms has passed"""
+        self.stop()
+        self.steps = steps
+        self.duration_ms = duration_ms
+        self.on_step = on_step
+        self.on_finish = on_finish
+        self.position = 0
+        self.late_max = self.late_total = 0.0
+        self.fired = 0
+        self.start_time = self.clock()
+        self.tick()
+
+    def stop(self):
+        if self.timer is not None:
+            self.cancel(self.timer)
+            self.timer = None
+        self.start_time = None
+
+    def elapsed_ms(self):
+        return (self.clock() - self.start_time) * 1000 if self.running else 0.0
+
+    def deadline(self, at_ms):
+        return self.start_time + at_ms / 1000
+
+    def tick(self):
+        self.timer = None
+        while self.position < len(self.steps):
+            step = self.steps[self.position]
+            late = self.clock() - self.deadline(step.at_ms)
+            if late < 0:
+                self.schedule(self.deadline(step.at_ms))
+                return
+            self.late_max = max(self.late_max, late)
+            self.late_total += late
+            self.fired += 1
+            self.position += 1
+            self.on_step(step)
+            if not self.running:
+                return  # on_step stopped playback
+        end = self.deadline(self.duration_ms)
+        if self.clock() < end:
+            self.schedule(end)  # Trailing WAIT
+            return
+        self.start_time = None
+        if self.on_finish:
+            self.on_finish()
+
+    def schedule(self, deadline):
+        remaining = deadline - self.clock()
+        self.timer = self.after(max(0, int((remaining - self.EARLY) * 1000)), self.tick)
+
+    def stats(self):
+        return {
+            "steps": self.fired,
+            "late_max_ms": round(self.late_max * 1000, 2),
+            "late_mean_ms": round(self.late_total * 1000 / self.fired, 2) if self.fired else 0.0,
+        }
@@ -0,0 +1,225 @@
+# [AI-NOTE] Cross-reference graph between command files and assets.
+# Sources are the animations/*.txt command files and custom-commands/commands.txt;
+# targets are frames (SHOW/HIDE), clips (PLAY_AUDIO) and the .txt files voice
+# commands run. Targets are keyed like AssetIndex.stem_key, so "SHOW idle" and
+# animations/idle.png meet on the same key without probing the filesystem.
+# Forward and reverse edges are both kept, so a changed file only touches the
+# targets it mentions, and the broken/orphan sets are maintained as edges come
+# and go instead of being recomputed. Kept free of tkinter for paipal_cli.py.
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from paipal_assets import AUDIO_EXTENSIONS, IMAGE_EXTENSIONS, AssetIndex
+from paipal_commands import Op, parse_lines, parse_voice_line
+from paipal_paths import get_base_path
+
+VOICE_FOLDER = "custom-commands"
+VOICE_FILE = "commands.txt"
+
+# Folder -> extensions of files that count as orphaned when nothing uses them
+ASSET_EXTENSIONS = {
+    "animations": IMAGE_EXTENSIONS,
+    "audio": AUDIO_EXTENSIONS,
+}
+
+# Below this many command files the process pool costs more than it saves
+PARALLEL_THRESHOLD = 64
+
+
+def command_refs(text):
+    """[(target, line)] for the frames and clips a command file uses"""
+    refs = []
+    for number, command in enumerate(parse_lines(text), 1):
+        if command.op in (Op.SHOW, Op.HIDE):
+            refs.append((("animations", AssetIndex.stem_key("animations", command.arg)), number))
+        elif command.op == Op.PLAY_AUDIO:
+            name = command.arg.replace("\\", "/")
+            if name.startswith("audio/"):
+                name = name[len("audio/"):]
+            refs.append((("audio", AssetIndex.stem_key("audio", name)), number))
+    return refs
+
+
+def voice_refs(text):
+    """[(target, line)] for the command files voice commands run"""
+    refs = []
+    for number, line in enumerate(text.split("\n"), 1):
+        entry = parse_voice_line(line)
+        if entry and entry[1]:
+            refs.append((("animations", os.path.normcase(entry[1])), number))
+    return refs
+
+
+def read_refs(args):
+    """Worker: (source, refs) for one file, or (source, None) if it can't be read"""
+    source, path, voice = args
+    try:
+        with open(path, "r") as f:
+            text = f.read()
+    except (OSError, UnicodeDecodeError):
+        return source, None
+    return source, (voice_refs(text) if voice else command_refs(text))
+
+
+class ReferenceGraph:
+    def __init__(self, base_path=None):
+        self.base_path = base_path or get_base_path()
+        self.assets = AssetIndex(self.base_path)
+        self.sources = set()  # Command files (and the voice file) currently on disk
+        self.forward = {}  # source -> {target: [line numbers]}
+        self.users = {}  # target -> set of sources referencing it
+        self.present = {}  # target -> set of file names on disk with that key
+        self.broken = set()  # Targets that are referenced but missing
+        self.orphans = set()  # Targets of assets nothing references
+        self.unreadable = set()  # Sources that could not be read
+
+    @staticmethod
+    def source_name(folder, name):
+        return f"{folder}/{name}"
+
+    def source_path(self, source):
+        return os.path.join(self.base_path, *source.split("/"))
+
+    def build(self, workers=None):
+        """Scan the asset folders and every source once"""
+        for table in (self.sources, self.forward, self.users, self.present, self.broken, self.orphans,
+                      self.unreadable):
+            table.clear()
+        self.assets.scan()
+        jobs = []
+        for folder, entries in self.assets.folders.items():
+            for entry in entries.values():
+                self.add_present(folder, entry.name)
+                if folder == "animations" and entry.name.lower().endswith(".txt"):
+                    jobs.append((self.source_name(folder, entry.name), entry.path, False))
+        voice_source = self.source_name(VOICE_FOLDER, VOICE_FILE)
+        if os.path.isfile(self.source_path(voice_source)):
+            jobs.append((voice_source, self.source_path(voice_source), True))
+
+        if len(jobs) >= PARALLEL_THRESHOLD and workers != 1:
+            chunksize = max(1, len(jobs) // ((workers or os.cpu_count() or 1) * 4))
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(read_refs, jobs, chunksize=chunksize))
+        else:
+            results = [read_refs(job) for job in jobs]
+        for source, refs in results:
+            self.sources.add(source)
+            self.set_refs(source, refs)
+        for target in self.present.keys() | self.users.keys():
+            self.refresh(target)
+
+    def add_present(self, folder, name):
+        target = (folder, AssetIndex.stem_key(folder, name))
+        self.present.setdefault(target, set()).add(name)
+        return target
+
+    def set_refs(self, source, refs):
+        """Replace a source's outgoing edges; returns the targets whose status may change"""
+        touched = set(self.forward.pop(source, {}))
+        for target in touched:
+            users = self.users.get(target)
+            if users:
+                users.discard(source)
+                if not users:
+                    del self.users[target]
+        self.unreadable.discard(source)
+        if refs is None:
+            self.unreadable.add(source)
+            return touched
+        edges = {}
+        for target, line in refs:
+            edges.setdefault(target, []).append(line)
+            self.users.setdefault(target, set()).add(source)
+        if edges:
+            self.forward[source] = edges
+        touched.update(edges)
+        return touched
+
+    def refresh(self, target):
+        """Recompute whether target is broken or orphaned"""
+        used = target in self.users
+        names = self.present.get(target)
+        if used and not names:
+            self.broken.add(target)
+        else:
+            self.broken.discard(target)
+        extensions = ASSET_EXTENSIONS.get(target[0], ())
+        if names and not used and any(name.lower().endswith(extensions) for name in names):
+            self.orphans.add(target)
+        else:
+            self.orphans.discard(target)
+
+    def update(self, folder, name):
+        """Account for one file that was added, changed or removed"""
+        touched = set()
+        if folder == VOICE_FOLDER:
+            if os.path.normcase(name) != os.path.normcase(VOICE_FILE):
+                return
+            source = self.source_name(folder, VOICE_FILE)
+            path = self.source_path(source)
+            if os.path.exists(path):
+                self.sources.add(source)
+                touched |= self.set_refs(source, read_refs((source, path, True))[1])
+            else:
+                self.sources.discard(source)
+                touched |= self.set_refs(source, [])
+        else:
+            entry = self.assets.update(folder, name)
+            target = (folder, AssetIndex.stem_key(folder, name))
+            names = self.present.get(target, set())
+            names.discard(name)
+            if entry is not None:
+                names.add(entry.name)
+            if names:
+                self.present[target] = names
+            else:
+                self.present.pop(target, None)
+            touched.add(target)
+            if folder == "animations" and name.lower().endswith(".txt"):
+                source = self.source_name(folder, name)
+                if entry:
+                    self.sources.add(source)
+                    touched |= self.set_refs(source, read_refs((source, entry.path, False))[1])
+                else:
+                    self.sources.discard(source)
+                    touched |= self.set_refs(source, [])
+        for target in touched:
+            self.refresh(target)
+
+    def apply_changes(self, changes):
+        """Apply an AssetWatcher batch ({folder: set of names})"""
+        for folder, names in changes.items():
+            for name in names:
+                self.update(folder, name)
+
+    def broken_references(self):
+        broken = []
+        for target in sorted(self.broken):
+            for source in sorted(self.users[target]):
+                for line in self.forward[source][target]:
+                    broken.append({"source": source, "line": line, "target": f"{target[0]}/{target[1]}"})
+        return broken
+
+    def orphaned_assets(self):
+        return sorted(self.source_name(target[0], name)
+                      for target in self.orphans for name in self.present[target])
+
+    def report(self):
+        return {
+            "sources": len(self.sources),
+            "assets": sum(len(names) for names in self.present.values()),
+            "references": sum(len(lines) for edges in self.forward.values() for lines in edges.values()),
+            "broken": self.broken_references(),
+            "orphans": self.orphaned_assets(),
+            "unreadable": sorted(self.unreadable),
+        }
+
+
+def build_report(base_path=None, workers=None):
+    start = time.perf_counter()
+    graph = ReferenceGraph(base_path)
+    graph.build(workers)
+    report = graph.report()
+    report["seconds"] = round(time.perf_counter() - start, 3)
+    return graph, report
@@ -0,0 +1,221 @@
+# [AI-NOTE] Incremental substring search over the editor lists.
+# Each list item gets a stable id so the index survives inserts, deletes and
+# moves. Trigram postings point at *distinct* lower-cased texts (command
+# files repeat "WAIT 100" thousands of times), and each text maps to the ids
+# showing it. A keystroke that extends the previous query only re-checks the
+# previous matches; other queries intersect the trigram postings. Item
+# positions are cached until the next structural edit, so a narrow query never
+# walks the whole list. The index is built off the Tk thread when a list is
+# loaded (prepare/make_index/install); edits made meanwhile are queued and
+# replayed onto it, and a search before it is ready scans the list. Kept free
+# of tkinter.
+from itertools import compress, repeat
+from operator import contains
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SearchIndex:
+    def __init__(self):
+        self.texts = {}  # id -> lower-cased text
+        self.ids = {}  # lower-cased text -> set of ids
+        self.grams = {}  # trigram -> set of lower-cased texts
+        self.last_query = ""
+        self.last_texts = None  # Texts matching last_query, kept current across edits
+
+    def add(self, item_id, text):
+        text = text.lower()
+        self.texts[item_id] = text
+        ids = self.ids.get(text)
+        if ids is None:
+            ids = self.ids[text] = set()
+            for gram in trigrams(text):
+                self.grams.setdefault(gram, set()).add(text)
+            if self.last_texts is not None and self.last_query in text:
+                self.last_texts.add(text)
+        ids.add(item_id)
+
+    def remove(self, item_id):
+        text = self.texts.pop(item_id, None)
+        if text is None:
+            return
+        ids = self.ids[text]
+        ids.discard(item_id)
+        if not ids:
+            del self.ids[text]
+            for gram in trigrams(text):
+                texts = self.grams[gram]
+                texts.discard(text)
+                if not texts:
+                    del self.grams[gram]
+            if self.last_texts is not None:
+                self.last_texts.discard(text)
+
+    def update(self, item_id, text):
+        if self.texts.get(item_id) != text.lower():
+            self.remove(item_id)
+            self.add(item_id, text)
+
+    @staticmethod
+    def containing(texts, query):
+        # compress/map keep the substring test loop in C
+        texts = list(texts)
+        return set(compress(texts, map(contains, texts, repeat(query))))
+
+    def matching_texts(self, query):
+        query = query.lower()
+        if self.last_texts is not None and self.last_query and query.startswith(self.last_query):
+            # Typing one more character: only the previous matches can still match
+            texts = self.containing(self.last_texts, query)
+        elif len(query) >= 3:
+            postings = sorted((self.grams.get(gram, ()) for gram in trigrams(query)), key=len)
+            texts = set(postings[0])
+            for other in postings[1:]:
+                if not texts:
+                    break
+                texts &= other
+            texts = self.containing(texts, query)
+        else:
+            texts = self.containing(self.ids, query)  # Too short for trigrams
+        self.last_query, self.last_texts = query, texts
+        return texts
+
+    def search(self, query):
+        """Set of ids whose text contains query (case-insensitive)"""
+        found = set()
+        for text in self.matching_texts(query):
+            found |= self.ids[text]
+        return found
+
+    def count_exceeds(self, texts, limit):
+        """Whether texts are shown by more than limit items"""
+        if len(texts) > limit:
+            return True  # Every text has at least one item
+        total = 0
+        for text in texts:
+            total += len(self.ids[text])
+            if total > limit:
+                return True
+        return False
+
+
+class ListSearch:
+    """Keeps a SearchIndex in step with a list and turns matches into positions"""
+
+    # Above this share of the list, matches are collected in list order instead of sorted
+    DENSE_FRACTION = 0.125
+
+    def __init__(self, key):
+        self.key = key  # key(item) -> searchable text
+        self.index = None  # SearchIndex, once install() has run
+        self.backlog = None  # Edits made while the index is being built
+        self.generation = 0  # Bumped by reset(), so a stale build is not installed
+        self.ids = []  # Item id per list position
+        self.texts = []  # Lower-cased text per list position
+        self.next_id = 0
+        self.positions = None  # id -> position, rebuilt lazily after structural edits
+        self.query = ""
+
+    def reset(self, items=None):
+        """Forget the index; with items, rebuild it right away"""
+        self.generation += 1
+        self.index = None
+        self.backlog = None
+        self.ids = []
+        self.texts = []
+        self.positions = None
+        if items is not None:
+            self.build(items)
+
+    def build(self, items):
+        self.index = SearchIndex()
+        self.ids = [self.new_id(item) for item in items]
+        self.texts = [self.index.texts[item_id] for item_id in self.ids]
+        self.positions = None
+
+    def prepare(self, items):
+        """Start a background build: (generation, snapshot) to pass to make_index and install"""
+        self.reset()
+        self.backlog = []
+        return self.generation, list(items)
+
+    def make_index(self, snapshot):
+        """Build the index for prepare()'s snapshot (safe off the Tk thread)"""
+        index = SearchIndex()
+        for item_id, item in enumerate(snapshot):
+            index.add(item_id, self.key(item))
+        return index, [index.texts[item_id] for item_id in range(len(snapshot))]
+
+    def install(self, generation, built):
+        """Adopt a make_index result unless the list was reset since prepare()"""
+        if generation != self.generation or self.backlog is None:
+            return False
+        backlog = self.backlog
+        self.index, self.texts = built
+        self.ids = list(range(len(self.texts)))
+        self.next_id = len(self.ids)
+        self.positions = None
+        self.backlog = None
+        for edit, args in backlog:
+            edit(*args)
+        return True
+
+    def new_id(self, item):
+        item_id = self.next_id
+        self.next_id += 1
+        self.index.add(item_id, self.key(item))
+        return item_id
+
+    # Edits are queued during a build and ignored when there is no index
+    def insert(self, position, item):
+        if self.backlog is not None:
+            self.backlog.append((self.insert, (position, item)))
+        elif self.index is not None:
+            item_id = self.new_id(item)
+            self.ids.insert(position, item_id)
+            self.texts.insert(position, self.index.texts[item_id])
+            self.positions = None
+
+    def remove(self, position):
+        if self.backlog is not None:
+            self.backlog.append((self.remove, (position,)))
+        elif self.index is not None:
+            self.index.remove(self.ids.pop(position))
+            self.texts.pop(position)
+            self.positions = None
+
+    def move(self, src, dst):
+        if self.backlog is not None:
+            self.backlog.append((self.move, (src, dst)))
+        elif self.index is not None:
+            self.ids.insert(dst, self.ids.pop(src))
+            self.texts.insert(dst, self.texts.pop(src))
+            self.positions = None
+
+    def replace(self, position, item):
+        if self.backlog is not None:
+            self.backlog.append((self.replace, (position, item)))
+        elif self.index is not None:
+            self.index.update(self.ids[position], self.key(item))
+            self.texts[position] = self.index.texts[self.ids[position]]
+
+    def view(self, items):
+        """Sorted positions of items matching the current query, or None when not filtering"""
+        if not self.query:
+            return None
+        if self.index is None:
+            # Still being built: one pass over the list
+            query = self.query.lower()
+            return [position for position, item in enumerate(items) if query in self.key(item).lower()]
+        texts = self.index.matching_texts(self.query)
+        if self.index.count_exceeds(texts, len(self.ids) * self.DENSE_FRACTION):
+            # Broad query: one ordered pass beats sorting most of the list
+            if len(texts) == len(self.index.ids):
+                return list(range(len(self.ids)))  # Everything matches
+            return list(compress(range(len(self.texts)), map(texts.__contains__, self.texts)))
+        if self.positions is None:
+            self.positions = {item_id: position for position, item_id in enumerate(self.ids)}
+        ids = self.index.ids
+        return sorted(self.positions[item_id] for text in texts for item_id in ids[text])
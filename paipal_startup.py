@@ -0,0 +1,45 @@
+# [AI-NOTE] Startup phase timing for PAIpal.py --startup-report.
+# PAIpal.py imports this module first, so the clock starts before the rest of
+# its imports; App marks each phase as it completes and the last mark is the
+# first paint of the start screen. Time spent before PAIpal.py runs (the
+# interpreter, or the PyInstaller bootloader unpacking the .exe) is not
+# included. report() compares the total with FIRST_PAINT_TARGET_MS so eager
+# work creeping back into startup shows up as a regression. Kept free of tkinter.
+import sys
+import time
+
+# Budget from PAIpal.py starting to the start screen being drawn
+FIRST_PAINT_TARGET_MS = 400
+
+
+class StartupTimer:
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.start = clock()
+        self.last = self.start
+        self.phases = []  # [(name, seconds)] in the order they finished
+
+    def mark(self, name):
+        """End the current phase and call it name"""
+        now = self.clock()
+        self.phases.append((name, now - self.last))
+        self.last = now
+
+    def elapsed_ms(self):
+        """Time from the start to the last mark"""
+        return (self.last - self.start) * 1000
+
+    def report(self, target_ms=FIRST_PAINT_TARGET_MS):
+        total_ms = self.elapsed_ms()
+        return {
+            "phases": [{"phase": name, "ms": round(seconds * 1000, 1)} for name, seconds in self.phases],
+            "first_paint_ms": round(total_ms, 1),
+            "target_ms": target_ms,
+            "within_target": total_ms <= target_ms,
+            "frozen": bool(getattr(sys, "frozen", False)),
+            "python": sys.version.split()[0],
+            "platform": sys.platform,
+        }
+
+
+STARTUP = StartupTimer()  # Started when PAIpal.py imports this module
@@ -0,0 +1,144 @@
+# [AI-NOTE] Crash-safe saves shared by the editor and the headless tools.
+# Content goes to a temp file next to the target, is fsynced, then renamed
+# over it, so PAIcom and file watchers only ever see the old or the new file.
+# A save whose content hash matches what is already on disk is skipped and
+# leaves the file untouched. WriteQueue does the same off the Tk thread and
+# collapses queued saves: only the newest content for a path is written.
+# Kept free of tkinter.
+import hashlib
+import os
+import threading
+
+# path -> (mtime_ns, size, sha1) of the file as this process last wrote or read it
+_known = {}
+_known_lock = threading.Lock()
+
+
+def content_digest(text):
+    return hashlib.sha1(text.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def disk_digest(path):
+    """sha1 of path's text as open(path, "r") reads it, or None if it can't be read"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    with _known_lock:
+        known = _known.get(path)
+    if known and known[0] == stat.st_mtime_ns and known[1] == stat.st_size:
+        return known[2]  # Nobody touched it since: no need to read it again
+    try:
+        with open(path, "r") as f:
+            digest = content_digest(f.read())
+    except (OSError, UnicodeDecodeError):
+        return None
+    with _known_lock:
+        _known[path] = (stat.st_mtime_ns, stat.st_size, digest)
+    return digest
+
+
+def sync_directory(directory):
+    """Make a rename durable; directories can't be opened for fsync on Windows"""
+    if os.name == "nt":
+        return
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path, text, skip_unchanged=True):
+    """Replace path with text (text mode, like open(path, "w")).
+
+    Returns False if the file already held exactly this content and was left
+    alone. Raises OSError if the write fails; the old file is then intact.
+    """
+    digest = content_digest(text)
+    if skip_unchanged and disk_digest(path) == digest:
+        return False
+    directory = os.path.dirname(os.path.abspath(path))
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_path, "w") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.chmod(temp_path, os.stat(path).st_mode & 0o7777)  # Keep the target's permissions
+        except OSError:
+            pass
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    sync_directory(directory)
+    stat = os.stat(path)
+    with _known_lock:
+        _known[path] = (stat.st_mtime_ns, stat.st_size, digest)
+    return True
+
+
+class WriteQueue:
+    """Background atomic_write where a newer save for a path replaces a queued one"""
+
+    def __init__(self):
+        self.pending = {}  # path -> (text, on_error), newest wins
+        self.busy = False
+        self.cond = threading.Condition()
+        self.thread = None
+
+    def submit(self, path, text, on_error=None):
+        """Queue a save; on_error(exc) runs on the writer thread if it fails"""
+        with self.cond:
+            self.pending[path] = (text, on_error)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name="writer", daemon=True)
+                self.thread.start()
+            self.cond.notify_all()
+
+    def write(self, path, text):
+        """Save now on the calling thread, superseding anything queued for path"""
+        with self.cond:
+            self.pending.pop(path, None)
+            while self.busy:
+                self.cond.wait()  # Never race the writer thread on the same file
+            self.busy = True
+        try:
+            return atomic_write(path, text)
+        finally:
+            with self.cond:
+                self.busy = False
+                self.cond.notify_all()
+
+    def run(self):
+        while True:
+            with self.cond:
+                while not self.pending or self.busy:
+                    self.cond.wait()
+                path = next(iter(self.pending))
+                text, on_error = self.pending.pop(path)
+                self.busy = True
+            try:
+                atomic_write(path, text)
+            except OSError as e:
+                if on_error:
+                    on_error(e)
+            finally:
+                with self.cond:
+                    self.busy = False
+                    self.cond.notify_all()
+
+    def flush(self, timeout=None):
+        """Wait until every queued save is on disk; False if timeout ran out first"""
+        with self.cond:
+            return self.cond.wait_for(lambda: not self.pending and not self.busy, timeout)
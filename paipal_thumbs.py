@@ -0,0 +1,202 @@
+# [AI-NOTE] Persistent thumbnail store for the animations folder.
+# Thumbnails are content-addressed: each one is saved as <sha1>-<height>.png,
+# and index.json maps a source path to the (mtime, size, sha1) it had when it
+# was last hashed. An unchanged file costs one stat; a touched file is hashed
+# again and only re-rendered if its content actually changed. Pillow and
+# the index are loaded on first use, not when the editor starts.
+import hashlib
+import importlib.util
+import json
+import os
+import threading
+import time
+
+from paipal_assets import IMAGE_EXTENSIONS
+from paipal_paths import get_base_path, get_cache_dir
+from paipal_storage import atomic_write
+
+PIL_AVAILABLE = importlib.util.find_spec("PIL") is not None
+
+INDEX_VERSION = 1
+
+
+def file_digest(path):
+    """sha1 of a file's contents"""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def scale_image(img, width, height):
+    """Resize an opened image, letting Pillow skip work it doesn't need.
+    
+    draft() makes JPEG decode at 1/2-1/8 scale straight from the file and
+    reduce() does a cheap integer box shrink, so the final LANCZOS pass
+    only works on an image about the size of the result.
+    """
+    from PIL import Image
+    img.draft("RGB", (width, height))  # No-op for formats without scaled decoding (PNG)
+    factor = min(img.width // width, img.height // height)
+    if factor >= 2:
+        img = img.reduce(factor)
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA")
+    return img.resize((width, height), Image.Resampling.LANCZOS)
+
+
+def render_thumbnail(path, height):
+    """Decode path and scale it to height, keeping the aspect ratio"""
+    from PIL import Image
+    with Image.open(path) as img:
+        aspect_ratio = img.width / img.height
+        width = max(1, int(height * aspect_ratio))
+        return scale_image(img, width, height)
+
+
+def render_preview(path, max_size):
+    """Decode path scaled to fit a max_size box (never enlarged)"""
+    from PIL import Image
+    with Image.open(path) as img:
+        aspect_ratio = img.width / img.height
+        if img.width > img.height:
+            width = min(max_size, img.width)
+            height = int(width / aspect_ratio)
+        else:
+            height = min(max_size, img.height)
+            width = int(height * aspect_ratio)
+        return scale_image(img, max(1, width), max(1, height))
+
+
+def save_png(img, path):
+    """Write a PNG via a temp file so readers never see a partial thumbnail"""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    img.save(tmp_path, format="PNG")
+    os.replace(tmp_path, path)
+
+
+class ThumbnailStore:
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or get_cache_dir("thumbs")
+        self.index_path = os.path.join(self.cache_dir, "index.json")
+        self.records = None  # source path -> [mtime_ns, size, sha1], read by the first lookup
+        self.dirty = False
+        self.lock = threading.Lock()  # The GUI decodes thumbnails on worker threads
+
+    @property
+    def index(self):
+        if self.records is None:
+            self.load_index()
+        return self.records
+
+    def load_index(self):
+        files = {}
+        try:
+            with open(self.index_path, "r") as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION:
+                files = data.get("files", {})
+        except (OSError, ValueError):
+            pass
+        with self.lock:
+            if self.records is None:  # Another worker may have loaded it meanwhile
+                self.records = files
+
+    def flush(self):
+        """Persist the index if anything changed since the last flush"""
+        if not self.dirty:
+            return
+        with self.lock:
+            files = dict(self.records)
+            self.dirty = False
+        os.makedirs(self.cache_dir, exist_ok=True)
+        atomic_write(self.index_path, json.dumps({"version": INDEX_VERSION, "files": files}))
+
+    def thumb_path(self, digest, height):
+        return os.path.join(self.cache_dir, f"{digest}-{height}.png")
+
+    def digest_for(self, path, stat=None):
+        """Content hash for path, reusing the indexed one while mtime and size match"""
+        stat = stat or os.stat(path)
+        record = self.index.get(path)
+        if record and record[0] == stat.st_mtime_ns and record[1] == stat.st_size:
+            return record[2]
+        digest = file_digest(path)
+        self.record(path, stat.st_mtime_ns, stat.st_size, digest)
+        return digest
+
+    def record(self, path, mtime_ns, size, digest):
+        index = self.index
+        with self.lock:
+            index[path] = [mtime_ns, size, digest]
+            self.dirty = True
+
+    def load(self, path, height, stat=None):
+        """Return the thumbnail for path as a PIL image, rendering and storing it on a miss"""
+        from PIL import Image
+        thumb_path = self.thumb_path(self.digest_for(path, stat), height)
+        try:
+            with Image.open(thumb_path) as img:
+                img.load()
+                return img
+        except (OSError, ValueError):
+            pass
+        img = render_thumbnail(path, height)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            save_png(img, thumb_path)
+        except OSError:
+            pass  # Read-only install: still return the freshly rendered thumbnail
+        return img
+
+
+def prewarm_one(args):
+    """Worker: make sure one source image has a stored thumbnail"""
+    path, height, cache_dir, record = args
+    try:
+        stat = os.stat(path)
+        if record and record[0] == stat.st_mtime_ns and record[1] == stat.st_size:
+            digest = record[2]
+        else:
+            digest = file_digest(path)
+        thumb_path = os.path.join(cache_dir, f"{digest}-{height}.png")
+        if os.path.exists(thumb_path):
+            return path, stat.st_mtime_ns, stat.st_size, digest, "reused"
+        save_png(render_thumbnail(path, height), thumb_path)
+        return path, stat.st_mtime_ns, stat.st_size, digest, "created"
+    except Exception as e:
+        return path, None, None, None, f"failed: {e}"
+
+
+def prewarm(folder=None, height=20, workers=None, store=None):
+    """Fill the store for every image in folder using a process pool"""
+    from concurrent.futures import ProcessPoolExecutor
+    if not PIL_AVAILABLE:
+        raise RuntimeError("Pillow is required to build thumbnails")
+    # The editor looks thumbnails up by absolute path, so index them that way
+    folder = os.path.abspath(folder or os.path.join(get_base_path(), "animations"))
+    store = store or ThumbnailStore()
+    os.makedirs(store.cache_dir, exist_ok=True)
+    start = time.perf_counter()
+
+    jobs = []
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                jobs.append((entry.path, height, store.cache_dir, store.index.get(entry.path)))
+
+    summary = {"files": len(jobs), "created": 0, "reused": 0, "failed": []}
+    if jobs:
+        chunksize = max(1, len(jobs) // ((workers or os.cpu_count() or 1) * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for path, mtime_ns, size, digest, outcome in pool.map(prewarm_one, jobs, chunksize=chunksize):
+                if digest is None:
+                    summary["failed"].append({"path": path, "error": outcome[len("failed: "):]})
+                    continue
+                store.record(path, mtime_ns, size, digest)
+                summary[outcome] += 1
+        store.flush()
+
+    summary["seconds"] = round(time.perf_counter() - start, 3)
+    return summary
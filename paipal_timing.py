@@ -0,0 +1,244 @@
+# [AI-NOTE] Static timing analysis of animation scripts.
+# WAITs are summed to get each line's start time, and PLAY_AUDIO clips are
+# laid over that timeline using lengths from WAV headers. The report gives
+# the runtime, when the audio ends, silent gaps between clips and clips that
+# start while an earlier one is still playing (winsound cuts the earlier one
+# off). Lines live in blocks that keep their WAIT total and the offsets of
+# their clips, so an edit touches one block and a report visits each block
+# once plus each clip once. Clip lengths are looked up once per argument.
+# Kept free of tkinter; analyze_tree runs the same model over a whole folder.
+import os
+import time
+
+from paipal_assets import AssetIndex
+from paipal_audio import WavInfoCache
+from paipal_commands import Op, find_command_files, parse_lines
+from paipal_history import DELETE, EDIT, INSERT, MOVE
+from paipal_paths import get_base_path
+
+MIN_GAP_MS = 100  # Shorter silences between clips are not reported
+
+
+def line_timing(command):
+    """(WAIT ms, PLAY_AUDIO argument or None) for one command"""
+    if command.op == Op.WAIT:
+        try:
+            return max(0, int(command.arg)), None
+        except ValueError:
+            return 0, None  # Malformed WAIT; validate reports it
+    if command.op == Op.PLAY_AUDIO:
+        return 0, command.arg
+    return 0, None
+
+
+def clip_length_ms(assets, wav_info, arg):
+    """Length of a PLAY_AUDIO argument's clip, or None if it is missing or unreadable"""
+    entry = assets.resolve_audio(arg)
+    if entry is None:
+        return None
+    seconds = wav_info.duration(entry.path, entry.stat)
+    return None if seconds is None else round(seconds * 1000)
+
+
+class Block:
+    __slots__ = ("lines", "wait", "clips", "events")
+
+    def __init__(self, lines):
+        self.lines = lines  # [(wait ms, clip argument or None)]
+        self.wait = sum(wait for wait, _ in lines)
+        self.clips = sum(1 for _, clip in lines if clip is not None)
+        self.events = None  # [(ms into the block, offset, clip)], rebuilt after an edit
+
+    def clip_events(self):
+        if self.events is None:
+            self.events = []
+            at = 0
+            for offset, (wait, clip) in enumerate(self.lines):
+                if clip is not None:
+                    self.events.append((at, offset, clip))
+                at += wait
+        return self.events
+
+
+class TimingModel:
+    BLOCK = 256  # Lines per block; blocks split at twice this
+
+    def __init__(self, clip_ms, min_gap_ms=MIN_GAP_MS):
+        self.clip_ms = clip_ms  # clip_ms(argument) -> length in ms, or None
+        self.min_gap_ms = min_gap_ms
+        self.lengths = {}  # Clip argument -> ms (or None), until forget_clips()
+        self.blocks = []
+        self.count = 0
+        self.cached = None  # Last report, dropped by any change
+
+    def reset(self, commands):
+        lines = [line_timing(command) for command in commands]
+        self.blocks = [Block(lines[i:i + self.BLOCK]) for i in range(0, len(lines), self.BLOCK)]
+        self.count = len(lines)
+        self.cached = None
+
+    def forget_clips(self):
+        """Look clip lengths up again (audio files changed)"""
+        self.lengths.clear()
+        self.cached = None
+
+    def locate(self, index):
+        """(block, offset) of line index; index == count gives the end of the last block"""
+        for number, block in enumerate(self.blocks):
+            if index < len(block.lines):
+                return number, index
+            index -= len(block.lines)
+        return len(self.blocks) - 1, len(self.blocks[-1].lines)
+
+    def insert_line(self, index, line):
+        if not self.blocks:
+            self.blocks.append(Block([]))
+        number, offset = self.locate(index)
+        block = self.blocks[number]
+        block.lines.insert(offset, line)
+        block.events = None
+        block.wait += line[0]
+        block.clips += line[1] is not None
+        if len(block.lines) > 2 * self.BLOCK:
+            half = len(block.lines) // 2
+            self.blocks[number:number + 1] = [Block(block.lines[:half]), Block(block.lines[half:])]
+        self.count += 1
+        self.cached = None
+
+    def remove_line(self, index):
+        number, offset = self.locate(index)
+        block = self.blocks[number]
+        line = block.lines.pop(offset)
+        block.events = None
+        block.wait -= line[0]
+        block.clips -= line[1] is not None
+        if not block.lines:
+            del self.blocks[number]
+        self.count -= 1
+        self.cached = None
+        return line
+
+    def apply(self, op, index, target=None, item=None):
+        """Follow one list edit (the same kinds EditHistory records)"""
+        if op == INSERT:
+            self.insert_line(index, line_timing(item))
+        elif op == DELETE:
+            self.remove_line(index)
+        elif op == MOVE:
+            self.insert_line(target, self.remove_line(index))
+        elif op == EDIT:
+            self.remove_line(index)
+            self.insert_line(index, line_timing(item))
+
+    def length(self, clip):
+        if clip not in self.lengths:
+            self.lengths[clip] = self.clip_ms(clip)
+        return self.lengths[clip]
+
+    def report(self):
+        """Runtime, audio end, gaps, overlaps and missing clips (times in ms, lines 1-based)"""
+        if self.cached is not None:
+            return self.cached
+        clips = []  # (start, end, line, argument), in line order, which is also start order
+        missing = []
+        at = 0
+        line = 0
+        for block in self.blocks:
+            if block.clips:
+                for offset_ms, offset, clip in block.clip_events():
+                    start = at + offset_ms
+                    length = self.length(clip)
+                    if length is None:
+                        missing.append({"line": line + offset + 1, "clip": clip})
+                    else:
+                        clips.append((start, start + length, line + offset + 1, clip))
+            at += block.wait
+            line += len(block.lines)
+
+        gaps = []
+        overlaps = []
+        end = end_line = None  # Latest end of any clip so far, and its line
+        for start, stop, line, clip in clips:
+            if end is not None:
+                if start < end:
+                    overlaps.append({"line": line, "clip": clip, "at_ms": start,
+                                     "overlap_ms": end - start, "with_line": end_line})
+                elif start - end >= self.min_gap_ms:
+                    gaps.append({"line": line, "from_ms": end, "to_ms": start, "ms": start - end})
+            if end is None or stop > end:
+                end, end_line = stop, line
+        self.cached = {
+            "lines": self.count,
+            "duration_ms": at,
+            "audio_end_ms": end or 0,
+            "clips": len(clips),
+            "gaps": gaps,
+            "overlaps": overlaps,
+            "missing": missing,
+        }
+        return self.cached
+
+
+def describe(report, limit=8):
+    """[(kind, message)] for a report's findings, at most limit of them"""
+    found = []
+    for overlap in report["overlaps"]:
+        found.append(("overlap", f"Line {overlap['line']}: {overlap['clip']} starts "
+                                 f"{overlap['overlap_ms']} ms before line {overlap['with_line']}'s audio ends."))
+    for entry in report["missing"]:
+        found.append(("missing", f"Line {entry['line']}: {entry['clip']} is missing or not a readable WAV."))
+    for gap in report["gaps"]:
+        found.append(("gap", f"{gap['ms'] / 1000:.2f} s of silence before line {gap['line']}."))
+    if len(found) > limit:
+        found = found[:limit] + [("more", f"…and {len(found) - limit} more.")]
+    return found
+
+
+# [AI-NOTE] Batch mode for paipal_cli timing. Each worker process scans
+# audio/ once and keeps its WAV header cache across the files it analyzes.
+_resolvers = {}
+
+
+def clip_resolver(base_path):
+    resolver = _resolvers.get(base_path)
+    if resolver is None:
+        assets = AssetIndex(base_path, folders=("audio",))
+        assets.scan()
+        wav_info = WavInfoCache()
+        resolver = _resolvers[base_path] = lambda arg: clip_length_ms(assets, wav_info, arg)
+    return resolver
+
+
+def analyze_file(args):
+    """Worker: timing report for one script"""
+    path, base_path, min_gap_ms = args
+    try:
+        with open(path, "r") as f:
+            commands = parse_lines(f.read())
+    except (OSError, UnicodeDecodeError) as e:
+        return {"path": path, "error": str(e)}
+    model = TimingModel(clip_resolver(base_path), min_gap_ms)
+    model.reset(commands)
+    return dict(model.report(), path=path)
+
+
+def analyze_tree(base_path=None, folder=None, min_gap_ms=MIN_GAP_MS, workers=None):
+    """Timing reports for every command file under folder (default: animations/)"""
+    from concurrent.futures import ProcessPoolExecutor
+    start = time.perf_counter()
+    base_path = base_path or get_base_path()
+    folder = folder or os.path.join(base_path, "animations")
+    jobs = [(path, base_path, min_gap_ms) for path in sorted(find_command_files(folder))]
+    scripts = []
+    if jobs:
+        chunksize = max(1, len(jobs) // ((workers or os.cpu_count() or 1) * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            scripts = list(pool.map(analyze_file, jobs, chunksize=chunksize))
+    return {
+        "files": len(scripts),
+        "with_overlaps": sum(1 for script in scripts if script.get("overlaps")),
+        "with_missing_audio": sum(1 for script in scripts if script.get("missing")),
+        "unreadable": sum(1 for script in scripts if "error" in script),
+        "scripts": scripts,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
@@ -0,0 +1,28 @@
+import random
+
+from paipal_atlas import shelf_pack
+
+
+def test_frame_of_max_size_fits_one_page():
+    placements, pages = shelf_pack([(2048, 2048), (10, 10)], 2048, 1)
+    assert pages == [(2048, 2048), (10, 10)]
+    assert placements == [(0, 0, 0), (1, 0, 0)]
+
+
+def test_pages_stay_within_max_size_and_boxes_keep_padding():
+    rng = random.Random(3)
+    max_size, padding = 256, 2
+    sizes = [(rng.randint(1, max_size), rng.randint(1, max_size // 4)) for _ in range(300)]
+    placements, pages = shelf_pack(sizes, max_size, padding)
+    for width, height in pages:
+        assert width <= max_size and height <= max_size
+    boxes = {}
+    for (w, h), (page, x, y) in zip(sizes, placements):
+        assert x + w <= pages[page][0] and y + h <= pages[page][1]
+        boxes.setdefault(page, []).append((x, y, w, h))
+    for page_boxes in boxes.values():
+        for i, (x1, y1, w1, h1) in enumerate(page_boxes):
+            for x2, y2, w2, h2 in page_boxes[i + 1:]:
+                apart = (x1 + w1 + padding <= x2 or x2 + w2 + padding <= x1
+                         or y1 + h1 + padding <= y2 or y2 + h2 + padding <= y1)
+                assert apart
@@ -0,0 +1,80 @@
+import threading
+import time
+import wave
+
+from paipal_audio import AudioPlayer, NullBackend
+
+
+def write_wav(path, seconds, rate=8000):
+    with wave.open(str(path), "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(rate)
+        wav_file.writeframes(b"\0\0" * int(seconds * rate))
+    return str(path)
+
+
+class Done:
+    def __init__(self):
+        self.event = threading.Event()
+        self.errors = []
+        self.at = None
+
+    def __call__(self, error):
+        self.at = time.perf_counter()
+        self.errors.append(error)
+        self.event.set()
+
+
+def test_completion_fires_at_clip_end(tmp_path):
+    clip = write_wav(tmp_path / "hi.wav", 0.3)
+    backend = NullBackend(speed=1.0)
+    player = AudioPlayer(backend)
+    done = Done()
+    start = time.perf_counter()
+    player.play(clip, done)
+    assert done.event.wait(5)
+    assert done.errors == [None]
+    assert done.at - start >= 0.29
+    assert backend.played == [clip]
+    assert player.last_start_latency is not None
+
+
+def test_stop_suppresses_on_done(tmp_path):
+    clip = write_wav(tmp_path / "long.wav", 5.0)
+    player = AudioPlayer(NullBackend(speed=1.0))
+    done = Done()
+    player.play(clip, done)
+    time.sleep(0.1)
+    player.stop()
+    deadline = time.perf_counter() + 2
+    while player.last_stop_latency is None and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    assert player.last_stop_latency is not None  # The backend call returned early
+    assert player.last_stop_latency < 1.0
+    assert not done.event.wait(0.2)
+
+
+def test_newer_play_supersedes_older(tmp_path):
+    first = write_wav(tmp_path / "first.wav", 5.0)
+    second = write_wav(tmp_path / "second.wav", 0.1)
+    backend = NullBackend(speed=1.0)
+    player = AudioPlayer(backend)
+    first_done, second_done = Done(), Done()
+    player.play(first, first_done)
+    time.sleep(0.05)
+    player.play(second, second_done)
+    assert second_done.event.wait(5)
+    assert second_done.errors == [None]
+    assert not first_done.event.wait(0.2)
+    assert backend.played == [first, second]
+
+
+def test_unreadable_clip_reports_its_error(tmp_path):
+    broken = tmp_path / "broken.wav"
+    broken.write_bytes(b"not a wav file")
+    player = AudioPlayer(NullBackend())
+    done = Done()
+    player.play(str(broken), done)
+    assert done.event.wait(5)
+    assert done.errors[0] is not None
@@ -0,0 +1,142 @@
+import random
+
+import paipal_history
+from paipal_history import DELETE, EDIT, INSERT, MOVE, EditHistory
+
+
+class ListTarget:
+    """Plain list with the edit methods EditHistory replays through"""
+
+    def __init__(self, items, history=None):
+        self.items = list(items)
+        self.history = history or EditHistory()
+
+    def insert_item(self, index, item, record=True):
+        self.items.insert(index, item)
+        if record:
+            self.history.record(INSERT, index, new=item)
+
+    def remove_item(self, index, record=True):
+        item = self.items.pop(index)
+        if record:
+            self.history.record(DELETE, index, old=item)
+
+    def move_item(self, src, dst, record=True):
+        self.items.insert(dst, self.items.pop(src))
+        if record:
+            self.history.record(MOVE, src, dst)
+
+    def replace_item(self, index, item, record=True, merge=False):
+        old = self.items[index]
+        self.items[index] = item
+        if record:
+            self.history.record(EDIT, index, old=old, new=item, merge=merge)
+
+
+def random_edit(rng, target):
+    action = rng.random()
+    if action < 0.3 or not target.items:
+        target.insert_item(rng.randint(0, len(target.items)), f"line {rng.randrange(1000)}")
+    elif action < 0.5:
+        target.remove_item(rng.randrange(len(target.items)))
+    elif action < 0.7:
+        target.move_item(rng.randrange(len(target.items)), rng.randrange(len(target.items)))
+    else:
+        index = rng.randrange(len(target.items))
+        target.replace_item(index, target.items[index] + "!")  # Always a real change
+
+
+def test_undo_and_redo_replay_every_state():
+    rng = random.Random(1)
+    target = ListTarget(["a", "b", "c"], EditHistory(merge_window=0))
+    states = [list(target.items)]
+    for _ in range(200):
+        random_edit(rng, target)
+        states.append(list(target.items))
+    for state in reversed(states[:-1]):
+        assert target.history.undo(target)
+        assert target.items == state
+    assert not target.history.undo(target)
+    for state in states[1:]:
+        assert target.history.redo(target)
+        assert target.items == state
+    assert not target.history.redo(target)
+
+
+def test_new_edit_clears_redo():
+    target = ListTarget(["a", "b"])
+    target.insert_item(0, "x")
+    target.history.undo(target)
+    target.remove_item(1)
+    assert target.history.redo_stack == []
+    assert target.history.total_bytes == sum(op.size for op in target.history.undo_stack)
+    assert not target.history.redo(target)
+    assert target.items == ["a"]
+
+
+def test_edits_within_merge_window_undo_together(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(paipal_history.time, "monotonic", lambda: now[0])
+    target = ListTarget(["hi"], EditHistory(merge_window=1.0))
+    for text in ("hi t", "hi th", "hi there"):
+        now[0] += 0.5
+        target.replace_item(0, text, merge=True)
+    now[0] += 2.0  # Past the window: starts a new step
+    target.replace_item(0, "hi there!", merge=True)
+    assert len(target.history.undo_stack) == 2
+    target.history.undo(target)
+    assert target.items == ["hi there"]
+    target.history.undo(target)
+    assert target.items == ["hi"]
+
+
+def test_edits_that_change_nothing_are_not_recorded():
+    target = ListTarget(["a"])
+    target.replace_item(0, "a")
+    assert not target.history.undo_stack
+    target.replace_item(0, "ab", merge=True)
+    target.replace_item(0, "a", merge=True)  # Typed back to the original text
+    assert not target.history.undo_stack
+    assert target.history.total_bytes == 0
+
+
+def test_byte_cap_drops_oldest_steps():
+    history = EditHistory(max_bytes=2000, merge_window=0)
+    target = ListTarget([], history)
+    for i in range(100):
+        target.insert_item(i, f"line {i}")
+    assert history.total_bytes <= history.max_bytes
+    assert history.total_bytes == sum(op.size for op in history.undo_stack)
+    kept = len(history.undo_stack)
+    assert 0 < kept < 100
+    while history.undo(target):
+        pass
+    assert target.items == [f"line {i}" for i in range(100 - kept)]
+
+
+def test_sequence_numbers_order_steps_across_lists():
+    # App.undo picks the list with the newest undo step, App.redo the oldest redo step
+    first, second = ListTarget([]), ListTarget([])
+    first.insert_item(0, "a")
+    second.insert_item(0, "b")
+    first.insert_item(1, "c")
+    lists = [first, second]
+    order = []
+    while True:
+        ready = [t for t in lists if t.history.undo_stack]
+        if not ready:
+            break
+        target = max(ready, key=lambda t: t.history.last_seq(t.history.undo_stack))
+        target.history.undo(target)
+        order.append(target)
+    assert order == [first, second, first]
+    order = []
+    while True:
+        ready = [t for t in lists if t.history.redo_stack]
+        if not ready:
+            break
+        target = min(ready, key=lambda t: t.history.last_seq(t.history.redo_stack))
+        target.history.redo(target)
+        order.append(target)
+    assert order == [first, second, first]
+    assert first.items == ["a", "c"] and second.items == ["b"]
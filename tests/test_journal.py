@@ -0,0 +1,34 @@
+from paipal_journal import EditJournal
+from paipal_storage import content_digest
+
+
+def write(path, lines):
+    text = "\n".join(lines)
+    path.write_text(text)
+    return content_digest(text)
+
+
+def load(name, path, digest):
+    with open(path, "r") as f:
+        text = f.read()
+    return text.split("\n") if content_digest(text) == digest else None
+
+
+def test_edit_after_save_survives_replay(tmp_path):
+    script = tmp_path / "idle.txt"
+    journal = EditJournal(str(tmp_path / "session.jsonl"))
+    journal.compact({}, {})
+
+    opened = write(script, ["SHOW idle", "WAIT 100"])
+    journal.append({"op": "open", "buf": "commands", "path": str(script), "digest": opened})
+    journal.append({"op": "insert", "buf": "commands", "i": 2, "item": "WAIT 200"})
+    saved = write(script, ["SHOW idle", "WAIT 100", "WAIT 200"])
+    journal.append({"op": "saved", "buf": "commands", "path": str(script), "digest": saved, "exact": True})
+    journal.append({"op": "insert", "buf": "commands", "i": 0, "item": "HIDE a"})
+    journal.close()
+
+    buffers, _ = EditJournal(str(tmp_path / "session.jsonl")).replay(load)
+    buffer = buffers["commands"]
+    assert buffer.items == ["HIDE a", "SHOW idle", "WAIT 100", "WAIT 200"]
+    assert buffer.dirty
+    assert buffer.digest == saved
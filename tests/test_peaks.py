@@ -0,0 +1,64 @@
+import random
+import wave
+
+import pytest
+
+from paipal_audio import PcmCache, PeakCache, compute_peaks, parse_wav, peaks_numpy, peaks_stdlib
+
+
+def sample_bytes(rng, width, count):
+    if width == 1:
+        return bytes(rng.randrange(256) for _ in range(count))
+    top = 1 << (width * 8 - 1)
+    values = [rng.randrange(-top, top) for _ in range(count)]
+    values[rng.randrange(count)] = -top  # Full-scale negative sample
+    return b"".join(value.to_bytes(width, "little", signed=True) for value in values)
+
+
+def write_wav(path, width, frames, rate=8000):
+    with wave.open(str(path), "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(width)
+        wav_file.setframerate(rate)
+        wav_file.writeframes(frames)
+    return str(path)
+
+
+@pytest.mark.parametrize("width", [1, 2, 3, 4])
+def test_numpy_and_stdlib_peaks_agree(tmp_path, width):
+    pytest.importorskip("numpy")
+    rng = random.Random(width)
+    # Quiet and loud stretches, so buckets differ from each other
+    frames = b"".join(sample_bytes(rng, width, 997) if loud else bytes(997 * width)
+                      for loud in (True, False, True, True, False))
+    path = write_wav(tmp_path / f"{width}.wav", width, frames)
+    with open(path, "rb") as f:
+        data = f.read()
+    info, offset, length = parse_wav(data)
+    view = memoryview(data)[offset:offset + length]
+    for max_samples in (1 << 18, 1000):  # Every frame, and strided
+        expected = peaks_numpy(view, info, 37, max_samples)
+        got = peaks_stdlib(view, info, 37, max_samples)
+        # The stdlib path reads only the high byte of 24-bit samples
+        tolerance = 1 / 128 if width == 3 else 1e-9
+        assert got == pytest.approx(expected, abs=tolerance)
+    assert max(peaks_numpy(view, info, 37, 1 << 18)) == 1.0
+
+
+def test_empty_file_gives_flat_peaks(tmp_path):
+    path = tmp_path / "empty.wav"
+    path.write_bytes(b"")
+    assert compute_peaks(str(path), 8) == [0.0] * 8
+    assert PeakCache().get(str(path), 8) == [0.0] * 8
+
+
+def test_wav_without_frames_gives_flat_peaks(tmp_path):
+    path = write_wav(tmp_path / "silent.wav", 2, b"")
+    assert compute_peaks(path, 8) == [0.0] * 8
+
+
+def test_empty_file_is_read_not_mapped(tmp_path):
+    path = tmp_path / "empty.wav"
+    path.write_bytes(b"")
+    with pytest.raises(ValueError, match="RIFF"):  # A WavError, not mmap's "cannot mmap an empty file"
+        PcmCache(mmap_threshold=0).get(str(path))
@@ -0,0 +1,63 @@
+import random
+
+from paipal_phrases import PhraseIndex
+
+WORDS = ["hey", "pal", "open", "the", "door", "Lights", "on"]
+
+
+def random_line(rng):
+    text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 3)))
+    return text, rng.choice(["a.txt", "b.txt", " A.txt"])
+
+
+def trie(node):
+    return (node.ends, node.passing, {word: trie(child) for word, child in node.children.items()})
+
+
+def assert_same(index, lines):
+    fresh = PhraseIndex(lines)
+    assert index.targets == fresh.targets
+    assert trie(index.root) == trie(fresh.root)
+    assert len(index) == len(fresh)
+    for line in lines:
+        assert index.issues(*line) == fresh.issues(*line)
+
+
+def test_edits_match_a_rebuild():
+    rng = random.Random(7)
+    lines = [random_line(rng) for _ in range(40)]
+    index = PhraseIndex(lines)
+    for _ in range(500):
+        action = rng.random()
+        if action < 0.3 and lines:
+            index.remove(*lines.pop(rng.randrange(len(lines))))
+        elif action < 0.6:
+            line = random_line(rng)
+            lines.insert(rng.randint(0, len(lines)), line)
+            index.add(*line)
+        elif lines:
+            position = rng.randrange(len(lines))
+            line = random_line(rng)
+            index.replace(lines[position], line)
+            lines[position] = line
+        assert_same(index, lines)
+
+
+def test_duplicates_and_conflicts_clear_after_delete():
+    index = PhraseIndex([("Open the door", "a.txt"), ("open the  door", " a.txt"), ("open the door", "b.txt")])
+    kinds = {kind for kind, _ in index.issues("open the door", "a.txt")}
+    assert kinds == {"duplicate", "conflict"}
+    index.remove("open the door", "b.txt")
+    assert [kind for kind, _ in index.issues("open the door", "a.txt")] == ["duplicate"]
+    index.remove("Open the door", "a.txt")
+    assert index.issues("open the door", "a.txt") == []
+
+
+def test_prefix_clears_after_shorter_phrase_is_deleted():
+    index = PhraseIndex([("hey pal", "a.txt"), ("hey pal open the door", "b.txt")])
+    assert [kind for kind, _ in index.issues("hey pal open the door", "b.txt")] == ["shadowed"]
+    assert [kind for kind, _ in index.issues("hey pal", "a.txt")] == ["shadows"]
+    index.remove("hey pal", "a.txt")
+    assert index.issues("hey pal open the door", "b.txt") == []
+    index.remove("hey pal open the door", "b.txt")
+    assert index.root.children == {}
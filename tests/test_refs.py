@@ -0,0 +1,78 @@
+from paipal_refs import ReferenceGraph, build_report
+
+
+def make_tree(base):
+    for folder in ("animations", "audio", "custom-commands"):
+        (base / folder).mkdir()
+    (base / "animations" / "idle.png").write_bytes(b"")
+    (base / "animations" / "unused.png").write_bytes(b"")
+    (base / "audio" / "hi.wav").write_bytes(b"")
+    (base / "animations" / "wave.txt").write_text("SHOW idle\nWAIT 100\nSHOW blink\nPLAY_AUDIO audio/hi.wav")
+    (base / "custom-commands" / "commands.txt").write_text("wave (wave.txt)\ndance (dance.txt)")
+
+
+def build(base):
+    graph = ReferenceGraph(str(base))
+    graph.build(workers=1)
+    return graph
+
+
+def targets(report):
+    return sorted((ref["source"], ref["line"], ref["target"]) for ref in report["broken"])
+
+
+def test_missing_targets_and_orphans(tmp_path):
+    make_tree(tmp_path)
+    report = build(tmp_path).report()
+    assert targets(report) == [("animations/wave.txt", 3, "animations/blink"),
+                               ("custom-commands/commands.txt", 2, "animations/dance.txt")]
+    assert report["orphans"] == ["animations/unused.png"]
+    assert report["unreadable"] == []
+
+
+def test_incremental_updates_match_a_rebuild(tmp_path):
+    make_tree(tmp_path)
+    graph = build(tmp_path)
+
+    (tmp_path / "animations" / "blink.png").write_bytes(b"")
+    (tmp_path / "animations" / "wave.txt").write_text("SHOW idle\nSHOW unused\nPLAY_AUDIO bye.wav")
+    (tmp_path / "animations" / "dance.txt").write_text("SHOW idle")
+    (tmp_path / "audio" / "hi.wav").unlink()
+    (tmp_path / "custom-commands" / "commands.txt").write_text("dance (dance.txt)")
+    graph.apply_changes({"animations": {"blink.png", "wave.txt", "dance.txt"}, "audio": {"hi.wav"},
+                         "custom-commands": {"commands.txt"}})
+    report = graph.report()
+    assert report == build(tmp_path).report()
+    assert targets(report) == [("animations/wave.txt", 3, "audio/bye")]
+    assert report["orphans"] == ["animations/blink.png"]
+
+    (tmp_path / "animations" / "wave.txt").unlink()
+    graph.apply_changes({"animations": {"wave.txt"}})
+    assert graph.report() == build(tmp_path).report()
+    assert graph.report()["broken"] == []
+
+
+def test_script_that_references_itself(tmp_path):
+    # Command files are targets as well as sources, so a script can point at
+    # itself; the graph keeps it as one edge rather than following it
+    make_tree(tmp_path)
+    (tmp_path / "animations" / "loop.txt").write_text("SHOW loop.txt\nSHOW idle")
+    graph = build(tmp_path)
+    assert graph.forward["animations/loop.txt"][("animations", "loop.txt")] == [1]
+    assert ("animations", "loop.txt") not in graph.broken
+
+    (tmp_path / "animations" / "loop.txt").unlink()
+    graph.apply_changes({"animations": {"loop.txt"}})
+    assert "animations/loop.txt" not in graph.forward
+    assert ("animations", "loop.txt") not in graph.users
+    assert graph.report() == build(tmp_path).report()
+
+
+def test_build_report_over_a_process_pool(tmp_path):
+    make_tree(tmp_path)
+    for i in range(70):  # Past PARALLEL_THRESHOLD
+        (tmp_path / "animations" / f"s{i}.txt").write_text(f"SHOW idle\nSHOW f{i}")
+    _, report = build_report(str(tmp_path), workers=2)
+    report.pop("seconds")
+    assert report == build(tmp_path).report()
+    assert len(report["broken"]) == 72
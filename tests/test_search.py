@@ -0,0 +1,76 @@
+import random
+
+from paipal_search import ListSearch, SearchIndex
+
+TEXTS = ["WAIT 100", "WAIT 200", "SHOW idle", "SHOW Idle_2", "HIDE idle", "PLAY_AUDIO audio/hi.wav", "ab", ""]
+
+
+def assert_same(index, items):
+    fresh = SearchIndex()
+    for item_id, text in items.items():
+        fresh.add(item_id, text)
+    assert index.texts == fresh.texts
+    assert index.ids == fresh.ids
+    assert index.grams == fresh.grams
+
+
+def test_edits_match_a_rebuild():
+    rng = random.Random(11)
+    index = SearchIndex()
+    items = {}
+    for step in range(600):
+        action = rng.random()
+        if action < 0.4:
+            items[step] = rng.choice(TEXTS)
+            index.add(step, items[step])
+        elif action < 0.7 and items:
+            item_id = rng.choice(list(items))
+            del items[item_id]
+            index.remove(item_id)
+        elif items:
+            item_id = rng.choice(list(items))
+            items[item_id] = rng.choice(TEXTS)
+            index.update(item_id, items[item_id])
+        query = rng.choice(["", "i", "wait", "idle", "show i", "AUD", "zzz"])
+        expected = {item_id for item_id, text in items.items() if query.lower() in text.lower()}
+        assert index.search(query) == expected
+        assert_same(index, items)
+
+
+def test_list_edits_during_build_match_a_scan():
+    rng = random.Random(5)
+    items = [rng.choice(TEXTS) for _ in range(200)]
+    search = ListSearch(lambda item: item)
+    generation, snapshot = search.prepare(items)
+    built = search.make_index(snapshot)
+    for _ in range(300):
+        if rng.random() < 0.5 and items:
+            position = rng.randrange(len(items))
+            items.pop(position)
+            search.remove(position)
+        elif rng.random() < 0.5 and items:
+            position = rng.randrange(len(items))
+            items[position] = rng.choice(TEXTS)
+            search.replace(position, items[position])
+        elif items:
+            src, dst = rng.randrange(len(items)), rng.randrange(len(items))
+            items.insert(dst, items.pop(src))
+            search.move(src, dst)
+        item = rng.choice(TEXTS)
+        position = rng.randint(0, len(items))
+        items.insert(position, item)
+        search.insert(position, item)
+    assert search.install(generation, built)
+    for query in ["idle", "wait 1", "a", "SHOW"]:
+        search.query = query
+        assert search.view(items) == [i for i, item in enumerate(items) if query.lower() in item.lower()]
+
+
+def test_stale_build_is_not_installed():
+    search = ListSearch(lambda item: item)
+    generation, snapshot = search.prepare(["SHOW idle"])
+    built = search.make_index(snapshot)
+    search.reset(["WAIT 100"])
+    assert not search.install(generation, built)
+    search.query = "wait"
+    assert search.view(["WAIT 100"]) == [0]
@@ -0,0 +1,80 @@
+import os
+import stat
+import threading
+
+import pytest
+
+import paipal_storage
+from paipal_storage import WriteQueue, atomic_write
+
+
+def leftovers(directory):
+    return [name for name in os.listdir(directory) if name.endswith(".tmp")]
+
+
+def test_atomic_write_replaces_file_and_skips_unchanged(tmp_path):
+    path = str(tmp_path / "toggle.txt")
+    with open(path, "w") as f:
+        f.write("false")
+    os.chmod(path, 0o640)
+    assert atomic_write(path, "true")
+    with open(path) as f:
+        assert f.read() == "true"
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o640
+    assert leftovers(tmp_path) == []
+
+    before = os.stat(path).st_mtime_ns
+    assert not atomic_write(path, "true")
+    assert os.stat(path).st_mtime_ns == before
+
+    with open(path, "w") as f:
+        f.write("edited elsewhere")
+    assert atomic_write(path, "true")
+    with open(path) as f:
+        assert f.read() == "true"
+
+
+def test_failed_replace_keeps_old_file(tmp_path, monkeypatch):
+    path = str(tmp_path / "commands.txt")
+    atomic_write(path, "old")
+
+    def fail(src, dst):
+        raise OSError("disk full")
+    monkeypatch.setattr(paipal_storage.os, "replace", fail)
+    with pytest.raises(OSError):
+        atomic_write(path, "new")
+    with open(path) as f:
+        assert f.read() == "old"
+    assert leftovers(tmp_path) == []
+
+
+def test_queue_writes_only_the_newest_content(tmp_path):
+    path = str(tmp_path / "state.txt")
+    queue = WriteQueue()
+    for value in range(50):
+        queue.submit(path, str(value))
+    assert queue.flush(5)
+    with open(path) as f:
+        assert f.read() == "49"
+    assert leftovers(tmp_path) == []
+
+
+def test_queue_reports_errors_through_callback(tmp_path):
+    errors = []
+    called = threading.Event()
+
+    def on_error(error):
+        errors.append(error)
+        called.set()
+    queue = WriteQueue()
+    queue.submit(str(tmp_path / "missing" / "state.txt"), "true", on_error)
+    assert called.wait(5)
+    assert isinstance(errors[0], OSError)
+    assert queue.flush(5)
+
+    path = str(tmp_path / "state.txt")
+    queue.submit(path, "true", on_error)  # The writer thread keeps going after a failure
+    assert queue.flush(5)
+    with open(path) as f:
+        assert f.read() == "true"
+    assert len(errors) == 1
@@ -0,0 +1,94 @@
+import random
+
+from paipal_commands import parse
+from paipal_history import DELETE, EDIT, INSERT, MOVE
+from paipal_timing import TimingModel
+
+CLIPS = {"audio/a.wav": 300, "audio/b.wav": 1200, "audio/c.wav": None}
+LINES = ["WAIT 100", "WAIT 250", "WAIT 0", "SHOW idle", "HIDE_ALL", "WAIT x",
+         "PLAY_AUDIO audio/a.wav", "PLAY_AUDIO audio/b.wav", "PLAY_AUDIO audio/c.wav"]
+
+
+def recompute(commands, block):
+    model = TimingModel(CLIPS.get, min_gap_ms=50)
+    model.BLOCK = block
+    model.reset(commands)
+    return model.report()
+
+
+def check_blocks(model):
+    for block in model.blocks:
+        assert block.lines
+        assert block.wait == sum(wait for wait, _ in block.lines)
+        assert block.clips == sum(1 for _, clip in block.lines if clip is not None)
+        assert len(block.lines) <= 2 * model.BLOCK
+    assert model.count == sum(len(block.lines) for block in model.blocks)
+
+
+def run_random_edits(block, size, steps, seed):
+    rng = random.Random(seed)
+    commands = [parse(rng.choice(LINES)) for _ in range(size)]
+    model = TimingModel(CLIPS.get, min_gap_ms=50)
+    model.BLOCK = block
+    model.reset(commands)
+    for _ in range(steps):
+        action = rng.random()
+        if action < 0.35 or not commands:
+            index = rng.randint(0, len(commands))
+            item = parse(rng.choice(LINES))
+            commands.insert(index, item)
+            model.apply(INSERT, index, item=item)
+        elif action < 0.6:
+            index = rng.randrange(len(commands))
+            commands.pop(index)
+            model.apply(DELETE, index)
+        elif action < 0.8:
+            src, dst = rng.randrange(len(commands)), rng.randrange(len(commands))
+            commands.insert(dst, commands.pop(src))
+            model.apply(MOVE, src, dst)
+        else:
+            index = rng.randrange(len(commands))
+            commands[index] = parse(rng.choice(LINES))
+            model.apply(EDIT, index, item=commands[index])
+        check_blocks(model)
+        assert model.report() == recompute(commands, block)
+
+
+def test_small_blocks_split_and_empty_under_random_edits():
+    run_random_edits(block=4, size=10, steps=1500, seed=2)
+
+
+def test_edits_around_the_default_block_boundary():
+    rng = random.Random(9)
+    commands = [parse(rng.choice(LINES)) for _ in range(600)]
+    model = TimingModel(CLIPS.get, min_gap_ms=50)
+    model.reset(commands)
+    assert [len(block.lines) for block in model.blocks] == [256, 256, 88]
+    for index in (255, 256, 257, 511, 512, 0, len(commands)):
+        item = parse("PLAY_AUDIO audio/b.wav")
+        commands.insert(index, item)
+        model.apply(INSERT, index, item=item)
+        assert model.report() == recompute(commands, TimingModel.BLOCK)
+    for src, dst in ((10, 300), (300, 10), (255, 256), (256, 255), (599, 0)):
+        commands.insert(dst, commands.pop(src))
+        model.apply(MOVE, src, dst)
+        assert model.report() == recompute(commands, TimingModel.BLOCK)
+    for index in (256, 255, 0, -1):
+        index %= len(commands)
+        commands[index] = parse("WAIT 1000")
+        model.apply(EDIT, index, item=commands[index])
+        commands.pop(index)
+        model.apply(DELETE, index)
+        assert model.report() == recompute(commands, TimingModel.BLOCK)
+    check_blocks(model)
+
+
+def test_empty_script_grows_again():
+    model = TimingModel(CLIPS.get)
+    model.reset([parse("WAIT 100")])
+    model.apply(DELETE, 0)
+    assert model.report()["duration_ms"] == 0
+    model.apply(INSERT, 0, item=parse("PLAY_AUDIO audio/a.wav"))
+    model.apply(INSERT, 0, item=parse("WAIT 40"))
+    report = model.report()
+    assert report["duration_ms"] == 40 and report["audio_end_ms"] == 340